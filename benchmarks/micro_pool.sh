@@ -0,0 +1,11 @@
+#!/bin/sh
+# Compare Pool, which spawns a greenlet per task, with WorkerPool,
+# which reuses a fixed set of worker greenlets, for many tiny tasks.
+set -e -x
+PYTHON=${PYTHON:=python}
+for cls in Pool WorkerPool; do
+    $PYTHON -mtimeit -r 6 -s"from gevent.pool import $cls; p = $cls(10)" 'p.spawn(abs, -1).get()'
+    $PYTHON -mtimeit -r 6 -s"from gevent.pool import $cls; from gevent.hub import xrange; p = $cls(10)" 'for _ in xrange(1000): p.spawn(abs, -1)' 'p.join()'
+    $PYTHON -mtimeit -r 6 -s"from gevent.pool import $cls; from gevent.hub import xrange; p = $cls(100)" 'p.map(abs, xrange(1000))'
+    $PYTHON -mtimeit -r 6 -s"from gevent.pool import $cls; from gevent.hub import xrange; p = $cls(100)" 'for _ in p.imap_unordered(abs, xrange(1000)): pass'
+done
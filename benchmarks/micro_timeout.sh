@@ -0,0 +1,12 @@
+#!/bin/sh
+# Compare per-watcher loop timers with the hub's timing wheel
+# (GEVENT_TIMER_RESOLUTION) for starting and cancelling timeouts,
+# both alone and with 100,000 other timeouts pending.
+set -e -x
+PYTHON=${PYTHON:=python}
+WHEEL=${WHEEL:=0.01}
+for res in "" $WHEEL; do
+    GEVENT_TIMER_RESOLUTION=$res $PYTHON -mtimeit -r 6 -s'from gevent import Timeout' 'Timeout.start_new(10).cancel()'
+    GEVENT_TIMER_RESOLUTION=$res $PYTHON -mtimeit -r 6 -s'from gevent import Timeout; from gevent.hub import xrange' -s'pending = [Timeout.start_new(60 + i % 600) for i in xrange(100000)]' 'Timeout.start_new(10).cancel()'
+    GEVENT_TIMER_RESOLUTION=$res $PYTHON -mtimeit -r 6 -s'from gevent import sleep' 'sleep(0.0001)'
+done
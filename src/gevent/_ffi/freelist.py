@@ -0,0 +1,77 @@
+"""
+Bounded freelists used by the CFFI loops to recycle native watcher
+structures and callback objects.
+"""
+from __future__ import absolute_import, print_function
+
+__all__ = [
+    'FreeList',
+]
+
+
+class FreeList(object):
+    """
+    A bounded stack of objects that can be reused, with counters of
+    how often it could satisfy a request.
+    """
+
+    __slots__ = ('items', 'capacity', 'hits', 'misses', 'dropped')
+
+    def __init__(self, capacity):
+        self.items = []
+        self.capacity = capacity
+        #: Requests satisfied from the list.
+        self.hits = 0
+        #: Requests that found the list empty.
+        self.misses = 0
+        #: Objects offered to the list when it was already full.
+        self.dropped = 0
+
+    def get(self):
+        """
+        Return a recycled object, or None if there isn't one.
+        """
+        items = self.items
+        if items:
+            self.hits += 1
+            return items.pop()
+        self.misses += 1
+        return None
+
+    def put(self, item):
+        """
+        Keep *item* for reuse if there's room. Returns whether it was
+        kept.
+        """
+        items = self.items
+        if len(items) < self.capacity:
+            items.append(item)
+            return True
+        self.dropped += 1
+        return False
+
+    def clear(self):
+        del self.items[:]
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of requests satisfied from the list, or 0.0 if
+        there haven't been any.
+        """
+        requests = self.hits + self.misses
+        return self.hits / float(requests) if requests else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self.items),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'dropped': self.dropped,
+            'hit_rate': self.hit_rate,
+        }
+
+    def __repr__(self):
+        return '<%s at 0x%x size=%d/%d hit_rate=%.3f>' % (
+            self.__class__.__name__, id(self), len(self.items), self.capacity, self.hit_rate)
@@ -6,6 +6,8 @@ from __future__ import absolute_import, print_function
 import sys
 import os
 import traceback
+from collections import deque
+from timeit import default_timer
 from weakref import ref as WeakRef
 
 from gevent._ffi import _dbg
@@ -13,6 +15,14 @@ from gevent._ffi import GEVENT_DEBUG
 from gevent._ffi import TRACE
 from gevent._ffi import CRITICAL
 from gevent._ffi.callback import callback
+from gevent._ffi.callback import _NOARGS
+from gevent._ffi.freelist import FreeList
+from gevent._compat import PYPY
+
+# Used to tell whether anything but the loop still refers to a
+# callback that has run, so it can be recycled. PyPy has no reference
+# counts (and cheaper allocation).
+_getrefcount = None if PYPY else getattr(sys, 'getrefcount', None)
 
 __all__ = [
     'AbstractLoop',
@@ -263,6 +273,35 @@ class AbstractLoop(object):
 
     error_handler = None
 
+    #: The most callbacks scheduled with :meth:`run_callback` that
+    #: will be run in one iteration of the loop. Any remaining
+    #: callbacks wait until the loop has polled for I/O.
+    callback_count_limit = 1000
+
+    #: If set to a number of seconds, the loop also stops running
+    #: callbacks in one iteration once they have taken this long, so
+    #: that a storm of callbacks cannot keep it from polling for I/O.
+    #: ``None`` (the default) means only :attr:`callback_count_limit`
+    #: applies.
+    callback_time_budget = None
+
+    #: How many native watcher structures of each type, and how many
+    #: callback objects, are kept for reuse after they are no longer
+    #: needed. See :meth:`freelist_stats`. Set to 0 before creating
+    #: the loop to disable recycling.
+    freelist_capacity = 256
+
+    #: The total number of callbacks run.
+    callbacks_run = 0
+    #: The number of iterations that stopped running callbacks
+    #: because of :attr:`callback_count_limit` or
+    #: :attr:`callback_time_budget`.
+    callback_deferrals = 0
+    #: The sum, over those iterations, of the callbacks left waiting.
+    callbacks_deferred = 0
+
+    _monitor = None
+
     _CHECK_POINTER = None
     _CHECK_CALLBACK_SIG = None
 
@@ -278,7 +317,13 @@ class AbstractLoop(object):
         self._ptr = None
         self._watchers = watchers
         self._in_callback = False
-        self._callbacks = []
+        self._callbacks = deque()
+        # {key: FreeList}, where key is a watcher class or the
+        # callback class.
+        self._freelists = {}
+        self._callback_freelist = None
+        if _getrefcount is not None and self.freelist_capacity:
+            self._callback_freelist = self._freelist(callback)
         self._keepaliveset = set()
         self._init_loop_and_aux_watchers(flags, default)
 
@@ -296,22 +341,55 @@ class AbstractLoop(object):
 
 
     @classmethod
-    def __make_watcher_ref_callback(cls, typ, active_watchers, ffi_watcher, debug):
+    def __make_watcher_ref_callback(cls, typ, active_watchers, ffi_watcher, debug, freelist):
         # separate method to make sure we have no ref to the watcher
         def callback(_):
             active_watchers.pop(ffi_watcher)
             _dbg("Python weakref callback closing", debug)
             typ._watcher_ffi_close(ffi_watcher)
+            if freelist is not None and typ._watcher_ffi_can_recycle(ffi_watcher):
+                freelist.put(ffi_watcher)
 
         return callback
 
     def _register_watcher(self, python_watcher, ffi_watcher):
+        typ = type(python_watcher)
         self._active_watchers[ffi_watcher] = WeakRef(python_watcher,
                                                      self.__make_watcher_ref_callback(
-                                                         type(python_watcher),
+                                                         typ,
                                                          self._active_watchers,
                                                          ffi_watcher,
-                                                         repr(python_watcher)))
+                                                         repr(python_watcher) if GEVENT_DEBUG >= TRACE else None,
+                                                         self._watcher_freelist(typ)))
+
+    def _freelist(self, key):
+        freelist = self._freelists.get(key)
+        if freelist is None:
+            freelist = self._freelists[key] = FreeList(self.freelist_capacity)
+        return freelist
+
+    def _watcher_freelist(self, watcher_type):
+        """
+        The freelist for native structures of *watcher_type*, or None
+        if they can't be recycled.
+        """
+        # libuv's stat watcher registers its class, not an instance,
+        # so watcher_type may be the metaclass.
+        if not getattr(watcher_type, '_watcher_recyclable', False) or not self.freelist_capacity:
+            return None
+        return self._freelist(watcher_type)
+
+    def freelist_stats(self):
+        """
+        Return a dictionary mapping the name of each type of recycled
+        object (watcher classes and ``callback``) to a dictionary of
+        its freelist's ``size``, ``capacity``, ``hits``, ``misses``,
+        ``dropped`` and ``hit_rate``.
+
+        .. versionadded:: 1.3a1
+        """
+        return dict((key.__name__, freelist.stats())
+                    for key, freelist in self._freelists.items())
 
     def _init_loop_and_aux_watchers(self, flags=None, default=None):
 
@@ -376,60 +454,91 @@ class AbstractLoop(object):
         self.handle_error(None, t, v, tb)
 
     def _check_callback(self, *args):
-        # If we have the onerror callback, this is a no-op; all the real
-        # work to rethrow the exception is done by the onerror callback
-        pass
+        # Apart from the monitor, this is a no-op; all the real work
+        # to rethrow the exception is done by the onerror callback
+        monitor = self._monitor
+        if monitor is not None:
+            monitor._on_check()
+
+    def _set_monitor(self, monitor):
+        """
+        Have ``monitor._on_check()`` called as soon as the loop has
+        polled for I/O, and ``monitor._on_prepare()`` just before it
+        polls again, once the callbacks have run. ``None`` stops
+        that. This is how :class:`gevent._monitor.BlockingMonitor`
+        follows the loop.
+        """
+        self._monitor = monitor
 
     def _run_callbacks(self, *args):
-        count = 1000
         self._stop_callback_timer()
-        while self._callbacks and count > 0:
-            callbacks = self._callbacks
-            self._callbacks = []
-            for cb in callbacks:
+        callbacks = self._callbacks
+        recycle = self._callback_freelist
+        limit = count = self.callback_count_limit
+        budget = self.callback_time_budget
+        deadline = default_timer() + budget if budget else None
+        while callbacks and count > 0:
+            cb = callbacks.popleft()
+            if not callbacks:
+                # Drop the reference run_callback took when the queue
+                # became non-empty.
                 self.unref() # XXX: libuv doesn't have a global ref count!
-                callback = cb.callback
-                args = cb.args
-                if callback is None or args is None:
-                    # it's been stopped
-                    continue
+            callback = cb.callback
+            args = cb.args
+            if callback is None or args is None:
+                # it's been stopped
+                if recycle is not None and _getrefcount(cb) == 2:
+                    recycle.put(cb)
+                continue
 
-                cb.callback = None
+            cb.callback = None
 
+            try:
+                callback(*args)
+            except: # pylint:disable=bare-except
+                # If we allow an exception to escape this method (while we are running the ev callback),
+                # then CFFI will print the error and libev will continue executing.
+                # There are two problems with this. The first is that the code after
+                # the loop won't run. The second is that any remaining callbacks scheduled
+                # for this loop iteration will be silently dropped; they won't run, but they'll
+                # also not be *stopped* (which is not a huge deal unless you're looking for
+                # consistency or checking the boolean/pending status; the loop doesn't keep
+                # a reference to them like it does to watchers...*UNLESS* the callback itself had
+                # a reference to a watcher; then I don't know what would happen, it depends on
+                # the state of the watcher---a leak or crash is not totally inconceivable).
+                # The Cython implementation in core.ppyx uses gevent_call from callbacks.c
+                # to run the callback, which uses gevent_handle_error to handle any errors the
+                # Python callback raises...it unconditionally simply prints any error raised
+                # by loop.handle_error and clears it, so callback handling continues.
+                # We take a similar approach (but are extra careful about printing)
                 try:
-                    callback(*args)
+                    self.handle_error(cb, *sys.exc_info())
                 except: # pylint:disable=bare-except
-                    # If we allow an exception to escape this method (while we are running the ev callback),
-                    # then CFFI will print the error and libev will continue executing.
-                    # There are two problems with this. The first is that the code after
-                    # the loop won't run. The second is that any remaining callbacks scheduled
-                    # for this loop iteration will be silently dropped; they won't run, but they'll
-                    # also not be *stopped* (which is not a huge deal unless you're looking for
-                    # consistency or checking the boolean/pending status; the loop doesn't keep
-                    # a reference to them like it does to watchers...*UNLESS* the callback itself had
-                    # a reference to a watcher; then I don't know what would happen, it depends on
-                    # the state of the watcher---a leak or crash is not totally inconceivable).
-                    # The Cython implementation in core.ppyx uses gevent_call from callbacks.c
-                    # to run the callback, which uses gevent_handle_error to handle any errors the
-                    # Python callback raises...it unconditionally simply prints any error raised
-                    # by loop.handle_error and clears it, so callback handling continues.
-                    # We take a similar approach (but are extra careful about printing)
                     try:
-                        self.handle_error(cb, *sys.exc_info())
+                        print("Exception while handling another error", file=sys.stderr)
+                        traceback.print_exc()
                     except: # pylint:disable=bare-except
-                        try:
-                            print("Exception while handling another error", file=sys.stderr)
-                            traceback.print_exc()
-                        except: # pylint:disable=bare-except
-                            pass # Nothing we can do here
-                finally:
-                    # NOTE: this must be reset here, because cb.args is used as a flag in
-                    # the callback class so that bool(cb) of a callback that has been run
-                    # becomes False
-                    cb.args = None
-                    count -= 1
-        if self._callbacks:
+                        pass # Nothing we can do here
+            finally:
+                # NOTE: this must be reset here, because cb.args is used as a flag in
+                # the callback class so that bool(cb) of a callback that has been run
+                # becomes False
+                cb.args = None
+                count -= 1
+            # Only our local variable and getrefcount's argument refer
+            # to it, so nobody can tell if it's reused.
+            if recycle is not None and _getrefcount(cb) == 2:
+                recycle.put(cb)
+            if deadline is not None and default_timer() >= deadline:
+                break
+        self.callbacks_run += limit - count
+        if callbacks:
+            self.callback_deferrals += 1
+            self.callbacks_deferred += len(callbacks)
             self._start_callback_timer()
+        monitor = self._monitor
+        if monitor is not None:
+            monitor._on_prepare()
 
     def _stop_aux_watchers(self):
         raise NotImplementedError()
@@ -580,9 +689,17 @@ class AbstractLoop(object):
         raise NotImplementedError()
 
     def run_callback(self, func, *args):
-        cb = callback(func, args)
+        cb = self._callback_freelist.get() if self._callback_freelist is not None else None
+        if cb is None:
+            cb = callback(func, args)
+        else:
+            cb.callback = func
+            cb.args = args or _NOARGS
+        if not self._callbacks:
+            # The queue was empty, so nothing is keeping the loop
+            # running for it yet.
+            self._setup_for_run_callback()
         self._callbacks.append(cb)
-        self._setup_for_run_callback()
 
         return cb
 
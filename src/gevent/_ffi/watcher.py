@@ -178,6 +178,12 @@ class watcher(object):
 
     _watcher_registers_with_loop_on_create = True
 
+    # If true, the native structure of a watcher of this class that
+    # has been garbage collected may be given to a new watcher of the
+    # same class, if _watcher_ffi_can_recycle agrees. See
+    # AbstractLoop.freelist_stats.
+    _watcher_recyclable = False
+
     def __init__(self, _loop, ref=True, priority=None, args=_NOARGS):
         self.loop = _loop
         self.__init_priority = priority
@@ -192,9 +198,6 @@ class watcher(object):
 
         self._watcher_create(ref)
 
-        if priority is not None:
-            self._watcher_ffi_set_priority(priority)
-
         try:
             self._watcher_ffi_init(args)
         except:
@@ -204,12 +207,20 @@ class watcher(object):
             # we do then to close() them are likely to fail
             self._watcher = None
             raise
+        # Initializing the watcher (e.g., ev_prepare_init) resets its
+        # priority, so this must come after.
+        if priority is not None:
+            self._watcher_ffi_set_priority(priority)
         self._watcher_ffi_set_init_ref(ref)
 
     @classmethod
     def _watcher_ffi_close(cls, ffi_watcher):
         pass
 
+    @classmethod
+    def _watcher_ffi_can_recycle(cls, ffi_watcher): # pylint:disable=unused-argument
+        return False
+
     def _watcher_create(self, ref): # pylint:disable=unused-argument
         # self._handle has a reference to self, keeping it alive.
         # We must keep self._handle alive for ffi.from_handle() to be
@@ -230,6 +241,13 @@ class watcher(object):
         self._watcher.data = self._handle
 
     def _watcher_new(self):
+        if self._watcher_recyclable:
+            freelist = self.loop._watcher_freelist(type(self))
+            if freelist is not None:
+                ffi_watcher = freelist.get()
+                if ffi_watcher is not None:
+                    # The init function called next resets everything.
+                    return ffi_watcher
         return type(self).new(self._watcher_struct_pointer_type) # pylint:disable=no-member
 
     def _watcher_ffi_set_init_ref(self, ref):
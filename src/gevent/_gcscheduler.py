@@ -0,0 +1,138 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Running full garbage collections when the event loop is idle.
+
+This is an internal module. Use :meth:`gevent.hub.Hub.start_idle_gc`
+to enable it, or set the ``GEVENT_IDLE_GC`` environment variable.
+"""
+from __future__ import print_function, absolute_import, division
+
+import gc
+from timeit import default_timer
+
+from gevent._monitor import LoopLagHistogram
+
+__all__ = [
+    'IdleCollector',
+]
+
+# Large enough that the interpreter never gets there by itself.
+_NEVER = 2 ** 30
+
+
+class IdleCollector(object):
+    """
+    Takes the oldest generation's collections away from the
+    interpreter and runs them between iterations of the loop instead.
+
+    The interpreter still collects the two younger generations
+    automatically; those collections are cheap. When it has collected
+    the middle generation *threshold* times (by default, its own
+    threshold for the oldest generation), a full collection is due.
+    A ``prepare`` watcher notices that, and starts an ``idle``
+    watcher of the lowest priority, which libev only runs when an
+    iteration of the loop finds no events waiting; the collection is
+    made then, unless callbacks are waiting. If the loop stays that
+    busy for *max_deferral* seconds after the collection became due,
+    the collection runs anyway.
+
+    libuv has no ``prepare`` watchers, and runs ``idle`` watchers in
+    every iteration, so :meth:`start` raises :exc:`TypeError` with
+    it.
+
+    The time taken by each collection goes into :attr:`histogram`.
+
+    Garbage collection settings are global to the process, so only
+    one collector should be running, in the main thread's hub.
+    Instances are not meant to be created directly; see
+    :meth:`gevent.hub.Hub.start_idle_gc`.
+    """
+
+    # pylint:disable=too-many-instance-attributes
+
+    def __init__(self, hub, threshold=None, max_deferral=5.0):
+        self.hub = hub
+        self.threshold = threshold
+        self.max_deferral = max_deferral
+        #: The pause caused by each full collection, in seconds.
+        self.histogram = LoopLagHistogram()
+        #: The number of full collections run because the loop was idle.
+        self.idle_collections = 0
+        #: The number of full collections run because they had been
+        #: deferred for *max_deferral* seconds.
+        self.forced_collections = 0
+        #: The number of unreachable objects found.
+        self.collected = 0
+
+        self._saved_threshold = None
+        self._due_since = None
+        self._prepare = None
+        self._idle = None
+
+    @property
+    def collections(self):
+        return self.idle_collections + self.forced_collections
+
+    def start(self):
+        if self._prepare is not None:
+            return
+        loop = self.hub.loop
+        # Run after every other prepare watcher, in particular the one
+        # that runs callbacks.
+        try:
+            prepare = loop.prepare(ref=False, priority=loop.MINPRI)
+        except AttributeError:
+            raise TypeError("The loop %r can't tell when it is idle" % (loop,))
+        self._idle = loop.idle(ref=False, priority=loop.MINPRI)
+        thresholds = gc.get_threshold()
+        if self.threshold is None:
+            self.threshold = thresholds[2]
+        self._saved_threshold = thresholds
+        gc.set_threshold(thresholds[0], thresholds[1], _NEVER)
+        self._prepare = prepare
+        prepare.start(self._on_prepare)
+
+    def stop(self):
+        if self._prepare is None:
+            return
+        self._prepare.stop()
+        self._idle.stop()
+        self._prepare = self._idle = None
+        if self._saved_threshold is not None:
+            gc.set_threshold(*self._saved_threshold)
+            self._saved_threshold = None
+        self._due_since = None
+
+    def _on_prepare(self):
+        if gc.get_count()[2] < self.threshold:
+            return
+        now = default_timer()
+        if self._due_since is None:
+            self._due_since = now
+            # While it's active, the loop doesn't block polling.
+            self._idle.start(self._on_idle)
+        elif now - self._due_since >= self.max_deferral:
+            self.forced_collections += 1
+            self.collect()
+
+    def _on_idle(self):
+        if self.hub.loop._callbacks:
+            return
+        self.idle_collections += 1
+        self.collect()
+
+    def collect(self):
+        """
+        Run a full collection now and record how long it took.
+        """
+        self._due_since = None
+        if self._idle is not None:
+            self._idle.stop()
+        start = default_timer()
+        self.collected += gc.collect()
+        self.histogram.add(default_timer() - start)
+
+    def __repr__(self):
+        return '<%s at 0x%x threshold=%s idle=%d forced=%d %r>' % (
+            self.__class__.__name__, id(self), self.threshold,
+            self.idle_collections, self.forced_collections, self.histogram)
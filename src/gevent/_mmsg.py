@@ -0,0 +1,201 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Access to the Linux ``recvmmsg`` and ``sendmmsg`` system calls through
+:mod:`ctypes`, used by :class:`gevent.server.DatagramServer` to move
+many datagrams per system call.
+
+Only IPv4 and IPv6 addresses are supported. :data:`recvmmsg` and
+:data:`sendmmsg` are None where the C library doesn't provide the
+calls.
+"""
+from __future__ import absolute_import
+
+import errno
+import os
+import struct
+import _socket
+
+__all__ = [
+    'recvmmsg',
+    'sendmmsg',
+]
+
+recvmmsg = None
+sendmmsg = None
+
+AF_INET = _socket.AF_INET
+AF_INET6 = getattr(_socket, 'AF_INET6', None)
+
+_WOULD_BLOCK = (errno.EAGAIN, getattr(errno, 'EWOULDBLOCK', errno.EAGAIN))
+
+try:
+    import ctypes
+    if not os.uname()[0].startswith('Linux'):
+        raise ImportError("recvmmsg is Linux-only")
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _recvmmsg = _libc.recvmmsg
+    _sendmmsg = _libc.sendmmsg
+except (ImportError, OSError, AttributeError):
+    pass
+else:
+    class _iovec(ctypes.Structure):
+        _fields_ = [
+            ('iov_base', ctypes.c_void_p),
+            ('iov_len', ctypes.c_size_t),
+        ]
+
+    class _msghdr(ctypes.Structure):
+        _fields_ = [
+            ('msg_name', ctypes.c_void_p),
+            ('msg_namelen', ctypes.c_uint32),
+            ('msg_iov', ctypes.POINTER(_iovec)),
+            ('msg_iovlen', ctypes.c_size_t),
+            ('msg_control', ctypes.c_void_p),
+            ('msg_controllen', ctypes.c_size_t),
+            ('msg_flags', ctypes.c_int),
+        ]
+
+    class _mmsghdr(ctypes.Structure):
+        _fields_ = [
+            ('msg_hdr', _msghdr),
+            ('msg_len', ctypes.c_uint),
+        ]
+
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint,
+                          ctypes.c_int, ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint,
+                          ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+
+    # sizeof(struct sockaddr_storage)
+    _SOCKADDR_SIZE = 128
+
+    def _raise_errno():
+        err = ctypes.get_errno()
+        raise _socket.error(err, os.strerror(err))
+
+    class Receiver(object):
+        """
+        Receiver(count, bufsize)
+
+        Receives up to *count* datagrams of up to *bufsize* bytes
+        each per call, into buffers allocated once.
+        """
+
+        def __init__(self, count, bufsize):
+            self.count = count
+            self.bufsize = bufsize
+            self._buffers = ctypes.create_string_buffer(count * bufsize)
+            self._names = ctypes.create_string_buffer(count * _SOCKADDR_SIZE)
+            self._iovecs = (_iovec * count)()
+            self._msgs = (_mmsghdr * count)()
+            base = ctypes.addressof(self._buffers)
+            names = ctypes.addressof(self._names)
+            for i in range(count):
+                iov = self._iovecs[i]
+                iov.iov_base = base + i * bufsize
+                iov.iov_len = bufsize
+                hdr = self._msgs[i].msg_hdr
+                hdr.msg_name = names + i * _SOCKADDR_SIZE
+                hdr.msg_iov = ctypes.pointer(iov)
+                hdr.msg_iovlen = 1
+            # Decoding addresses is as expensive as receiving; servers
+            # usually hear from the same peers over and over.
+            self._addresses = {}
+
+        def __call__(self, fileno):
+            """
+            Return a list of ``(data, address)`` tuples, which is empty if
+            the call would block.
+            """
+            msgs = self._msgs
+            for i in range(self.count):
+                msgs[i].msg_hdr.msg_namelen = _SOCKADDR_SIZE
+            n = _recvmmsg(fileno, msgs, self.count, 0, None)
+            if n < 0:
+                if ctypes.get_errno() in _WOULD_BLOCK:
+                    return []
+                _raise_errno()
+            string_at = ctypes.string_at
+            base = ctypes.addressof(self._buffers)
+            names = ctypes.addressof(self._names)
+            addresses = self._addresses
+            bufsize = self.bufsize
+            result = []
+            for i in range(n):
+                msg = msgs[i]
+                data = string_at(base + i * bufsize, msg.msg_len)
+                name = string_at(names + i * _SOCKADDR_SIZE, msg.msg_hdr.msg_namelen)
+                address = addresses.get(name)
+                if address is None:
+                    if len(addresses) >= 1024:
+                        addresses.clear()
+                    address = addresses[name] = _decode_address(name)
+                result.append((data, address))
+            return result
+
+    recvmmsg = Receiver
+
+    def sendmmsg(fileno, family, messages):
+        """
+        Send as many of the ``(data, address)`` tuples in *messages*
+        as possible without blocking, and return how many were sent.
+        Raises :exc:`ValueError`, having sent nothing, if any address
+        isn't numeric.
+        """
+        count = len(messages)
+        msgs = (_mmsghdr * count)()
+        iovecs = (_iovec * count)()
+        keep = []
+        for i, (data, address) in enumerate(messages):
+            data = bytes(data) if not isinstance(data, bytes) else data
+            try:
+                name = _encode_address(family, address)
+            except (_socket.error, struct.error, TypeError, ValueError) as ex:
+                raise ValueError("Not a numeric address", address, ex)
+            keep.append(data)
+            keep.append(name)
+            iov = iovecs[i]
+            iov.iov_base = ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p)
+            iov.iov_len = len(data)
+            hdr = msgs[i].msg_hdr
+            hdr.msg_name = ctypes.cast(ctypes.c_char_p(name), ctypes.c_void_p)
+            hdr.msg_namelen = len(name)
+            hdr.msg_iov = ctypes.pointer(iov)
+            hdr.msg_iovlen = 1
+        n = _sendmmsg(fileno, msgs, count, 0)
+        if n < 0:
+            if ctypes.get_errno() in _WOULD_BLOCK:
+                return 0
+            _raise_errno()
+        return n
+
+
+_FAMILY = struct.Struct('=H')
+
+
+def _decode_address(name):
+    family = _FAMILY.unpack_from(name)[0]
+    if family == AF_INET:
+        port = struct.unpack_from('!H', name, 2)[0]
+        return _socket.inet_ntop(AF_INET, name[4:8]), port
+    if family == AF_INET6:
+        port, flowinfo = struct.unpack_from('!HI', name, 2)
+        scope_id = struct.unpack_from('=I', name, 24)[0]
+        return _socket.inet_ntop(AF_INET6, name[8:24]), port, flowinfo, scope_id
+    raise ValueError("Unsupported address family", family)
+
+
+def _encode_address(family, address):
+    if family == AF_INET:
+        host, port = address
+        return (_FAMILY.pack(AF_INET) + struct.pack('!H', port)
+                + _socket.inet_pton(AF_INET, host) + b'\0' * 8)
+    if family == AF_INET6:
+        host, port = address[:2]
+        flowinfo = address[2] if len(address) > 2 else 0
+        scope_id = address[3] if len(address) > 3 else 0
+        return (_FAMILY.pack(AF_INET6) + struct.pack('!HI', port, flowinfo)
+                + _socket.inet_pton(AF_INET6, host) + struct.pack('=I', scope_id))
+    raise ValueError("Unsupported address family", family)
@@ -0,0 +1,265 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Watching the event loop from a native thread.
+
+This is an internal module. Use :meth:`gevent.hub.Hub.start_blocking_monitor`
+to enable it, or set the ``GEVENT_MAX_BLOCKING_TIME`` environment variable.
+"""
+from __future__ import print_function, absolute_import, division
+
+import sys
+import traceback
+from bisect import bisect_left
+from timeit import default_timer
+
+from greenlet import gettrace
+from greenlet import settrace
+
+from gevent import monkey
+from gevent._threading import start_new_thread
+from gevent._threading import get_ident
+
+__all__ = [
+    'BlockingMonitor',
+    'LoopLagHistogram',
+]
+
+# The monitoring thread must really sleep, even if the time module
+# has been monkey-patched.
+_sleep = monkey.get_original('time', 'sleep')
+
+
+class LoopLagHistogram(object):
+    """
+    A fixed-bucket histogram of how long each iteration of the event
+    loop spent running Python code (callbacks, greenlets and watchers)
+    before it was able to poll for I/O again.
+
+    Recording a value is a bisection and an increment; reading
+    the histogram never blocks the loop.
+    """
+
+    #: The default upper bounds, in seconds, of the buckets. A final
+    #: unbounded bucket catches everything larger.
+    BUCKETS = (0.0001, 0.00025, 0.0005,
+               0.001, 0.0025, 0.005,
+               0.01, 0.025, 0.05,
+               0.1, 0.25, 0.5,
+               1.0, 2.5, 5.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets)) if buckets is not None else self.BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def items(self):
+        """
+        Return a list of ``(upper_bound, count)`` pairs, in increasing
+        order. The last upper bound is infinity.
+        """
+        return list(zip(self.buckets + (float('inf'),), self.counts))
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct):
+        """
+        Return the upper bound of the bucket containing the *pct*
+        percentile (0 to 100) of the recorded values, or 0.0 if
+        nothing has been recorded.
+        """
+        if not self.count:
+            return 0.0
+        wanted = self.count * pct / 100.0
+        seen = 0
+        for bound, count in self.items():
+            seen += count
+            if count and seen >= wanted:
+                return bound if bound != float('inf') else self.max
+        return self.max
+
+    def __repr__(self):
+        return '<%s at 0x%x count=%d mean=%.6f max=%.6f>' % (
+            self.__class__.__name__, id(self),
+            self.count, self.mean, self.max)
+
+
+class BlockingMonitor(object):
+    """
+    Detects when the hub has been prevented from running its event
+    loop for longer than *threshold* seconds.
+
+    The loop itself (see ``_set_monitor`` on the loop classes) tells
+    the monitor when it has finished polling for I/O and when it is
+    about to poll again, once its callbacks have run. A counter bumped
+    at each of those points tells iterations apart, and a flag notes
+    whether the loop is busy running Python code or idle in the poll.
+    Between them, they also time each iteration into
+    :attr:`histogram`. A native thread wakes up every *period*
+    seconds and, if the loop has been busy in the same iteration for
+    more than *threshold* seconds, calls *report* with the greenlet
+    that is running and its current stack.
+
+    libuv runs I/O callbacks inside its poll, so switching from the
+    hub to another greenlet also counts as the loop being busy.
+
+    If the loop doesn't support monitoring, :meth:`start` raises
+    :exc:`TypeError`.
+
+    Instances are not meant to be created directly; see
+    :meth:`gevent.hub.Hub.start_blocking_monitor`.
+    """
+
+    # pylint:disable=too-many-instance-attributes
+
+    def __init__(self, hub, threshold=0.1, report=None, period=None):
+        if threshold <= 0:
+            raise ValueError("threshold must be positive", threshold)
+        self.hub = hub
+        self.threshold = threshold
+        self.period = period if period is not None else min(threshold / 2.0, 1.0)
+        self.report = report if report is not None else self._default_report
+        self.histogram = LoopLagHistogram()
+        #: How many times :attr:`report` has been called.
+        self.blocking_reports = 0
+
+        # Written from the hub's thread, read from the monitoring thread.
+        self._counter = 0
+        self._polling = True
+        self._busy_start = 0.0
+        self._active_greenlet = None
+        self._last_reported = -1
+
+        self._hub_thread = None
+        self._running = False
+        self._previous_trace = None
+        self._trace_function = self._greenlet_trace
+
+    def start(self):
+        """
+        Begin monitoring. Must be called in the hub's thread.
+        """
+        if self._running:
+            return
+        loop = self.hub.loop
+        set_monitor = getattr(loop, '_set_monitor', None)
+        if set_monitor is None:
+            raise TypeError("The loop %r does not support the blocking monitor" % (loop,))
+        self._hub_thread = get_ident()
+        set_monitor(self)
+        self._previous_trace = settrace(self._trace_function)
+        # We're being called from a greenlet, so the loop is busy
+        # right now, in an iteration we haven't seen yet.
+        self._mark_busy()
+        self._running = True
+        self._start_thread()
+
+    def stop(self):
+        """
+        Stop monitoring. Must be called in the hub's thread.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self.hub.loop._set_monitor(None)
+        if gettrace() == self._trace_function:
+            settrace(self._previous_trace)
+            self._previous_trace = None
+        # Otherwise, another tracer was installed after us and is calling
+        # us in turn; we now just forward to our predecessor.
+        self._active_greenlet = None
+
+    def _start_thread(self):
+        start_new_thread(self._run, ())
+
+    def _on_fork(self):
+        # Our thread did not survive into the child.
+        if self._running:
+            self._hub_thread = get_ident()
+            self._start_thread()
+
+    def _on_check(self):
+        if self._polling:
+            self._mark_busy()
+
+    def _mark_busy(self):
+        self._counter += 1
+        self._polling = False
+        self._busy_start = default_timer()
+
+    def _on_prepare(self):
+        self._counter += 1
+        if not self._polling:
+            self.histogram.add(default_timer() - self._busy_start)
+        self._polling = True
+
+    def _greenlet_trace(self, event, args):
+        if self._running and event in ('switch', 'throw'):
+            target = self._active_greenlet = args[1]
+            if self._polling and target is not self.hub:
+                # Called back from within the poll, as libuv does.
+                self._mark_busy()
+        previous = self._previous_trace
+        if previous is not None:
+            previous(event, args)
+
+    def _run(self):
+        # The body of the native thread.
+        while self._running:
+            _sleep(self.period)
+            if not self._running:
+                break
+            self.check_blocking()
+
+    def check_blocking(self):
+        """
+        Examine the loop once, reporting if it is blocked.
+
+        Returns the number of seconds the loop has been blocked, or
+        ``None`` if it is not blocked (or this iteration was already
+        reported).
+        """
+        counter = self._counter
+        if self._polling or not counter or counter == self._last_reported:
+            return None
+        blocked_for = default_timer() - self._busy_start
+        if blocked_for < self.threshold:
+            return None
+        self._last_reported = counter
+        frame = sys._current_frames().get(self._hub_thread)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        del frame
+        self.blocking_reports += 1
+        try:
+            self.report(self._active_greenlet, blocked_for, stack)
+        except: # pylint:disable=bare-except
+            traceback.print_exc()
+        return blocked_for
+
+    def _default_report(self, greenlet, blocked_for, stack):
+        stream = self.hub.exception_stream
+        stream.write('\n*** gevent: the hub was blocked for %.4f seconds '
+                     '(threshold %.4f) by greenlet %r\n' % (blocked_for, self.threshold, greenlet))
+        stream.write(''.join(stack))
+
+    def __repr__(self):
+        return '<%s at 0x%x threshold=%s running=%s reports=%d %r>' % (
+            self.__class__.__name__, id(self),
+            self.threshold, self._running, self.blocking_reports,
+            self.histogram)
@@ -6,6 +6,7 @@ Python 2 socket module.
 # pylint: disable=undefined-variable
 
 import time
+from timeit import default_timer
 from gevent import _socketcommon
 from gevent._util import copy_globals
 from gevent._compat import PYPY
@@ -102,6 +103,11 @@ class socket(object):
 
     # pylint:disable=too-many-public-methods
 
+    # Set by cork()
+    _cork = None
+    # A gevent.socketstats.SocketStats, or None
+    _stats = None
+
     def __init__(self, family=AF_INET, type=SOCK_STREAM, proto=0, _sock=None):
         if _sock is None:
             self._sock = _realsocket(family, type, proto)
@@ -178,11 +184,16 @@ class socket(object):
             timeout = Timeout.start_new(self.timeout, timeout_exc, ref=False)
         else:
             timeout = None
+        stats = self._stats
+        if stats is not None:
+            start = default_timer()
         try:
             self.hub.wait(watcher)
         finally:
             if timeout is not None:
                 timeout.cancel()
+            if stats is not None:
+                stats.waited(watcher is self._write_event, default_timer() - start)
 
     def accept(self):
         sock = self._sock
@@ -206,6 +217,9 @@ class socket(object):
         # Also break any reference to the loop.io objects. Our fileno, which they were
         # tied to, is now free to be reused, so these objects are no longer functional.
 
+        if self._cork is not None:
+            self._cork.close()
+            self._cork = None
         if self._read_event is not None:
             self.hub.cancel_wait(self._read_event, cancel_wait_ex)
             self._read_event.close()
@@ -288,45 +302,61 @@ class socket(object):
         sock = self._sock  # keeping the reference so that fd is not closed during waiting
         while True:
             try:
-                return sock.recv(*args)
+                result = sock.recv(*args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
                 # QQQ without clearing exc_info test__refcount.test_clean_exit fails
                 sys.exc_clear()
+            else:
+                if self._stats is not None:
+                    self._stats.received(len(result))
+                return result
             self._wait(self._read_event)
 
     def recvfrom(self, *args):
         sock = self._sock
         while True:
             try:
-                return sock.recvfrom(*args)
+                result = sock.recvfrom(*args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
                 sys.exc_clear()
+            else:
+                if self._stats is not None:
+                    self._stats.received(len(result[0]))
+                return result
             self._wait(self._read_event)
 
     def recvfrom_into(self, *args):
         sock = self._sock
         while True:
             try:
-                return sock.recvfrom_into(*args)
+                result = sock.recvfrom_into(*args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
                 sys.exc_clear()
+            else:
+                if self._stats is not None:
+                    self._stats.received(result[0])
+                return result
             self._wait(self._read_event)
 
     def recv_into(self, *args):
         sock = self._sock
         while True:
             try:
-                return sock.recv_into(*args)
+                result = sock.recv_into(*args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
                 sys.exc_clear()
+            else:
+                if self._stats is not None:
+                    self._stats.received(result)
+                return result
             self._wait(self._read_event)
 
     def send(self, data, flags=0, timeout=timeout_default):
@@ -334,18 +364,21 @@ class socket(object):
         if timeout is timeout_default:
             timeout = self.timeout
         try:
-            return sock.send(data, flags)
+            sent = sock.send(data, flags)
         except error as ex:
             if ex.args[0] not in _socketcommon.GSENDAGAIN or timeout == 0.0:
                 raise
             sys.exc_clear()
             self._wait(self._write_event)
             try:
-                return sock.send(data, flags)
+                sent = sock.send(data, flags)
             except error as ex2:
                 if ex2.args[0] == EWOULDBLOCK:
                     return 0
                 raise
+        if self._stats is not None:
+            self._stats.sent(sent)
+        return sent
 
     def __send_chunk(self, data_memory, flags, timeleft, end):
         """
@@ -383,6 +416,9 @@ class socket(object):
         return timeleft
 
     def sendall(self, data, flags=0):
+        cork = self._cork
+        if cork is not None and cork.flusher is not getcurrent():
+            return cork.sendall(data, flags)
         if isinstance(data, unicode):
             data = data.encode()
         # this sendall is also reused by gevent.ssl.SSLSocket subclass,
@@ -433,21 +469,102 @@ class socket(object):
             timeleft = self.__send_chunk(chunk, flags, timeleft, end)
             data_sent += len(chunk) # Guaranteed it sent the whole thing
 
+    def sendall_vectored(self, buffers, flags=0):
+        """
+        Send all the bytes in the sequence of buffers *buffers*, in
+        order, as if they had been joined and passed to :meth:`sendall`.
+
+        Python 2 has no ``sendmsg``, so small buffers are copied
+        together into larger chunks, and each chunk is sent with
+        :meth:`sendall`. The socket's timeout bounds the whole call.
+
+        .. versionadded:: 1.3a1
+        """
+        _socketcommon._sendall_coalesced(self, buffers, flags)
+
+    def _send_vectored_nowait(self, buffers):
+        # Send what the kernel takes of the byte strings *buffers*
+        # without waiting and return how many bytes that was. cork()
+        # uses this from the hub, where it can't wait. There's no
+        # sendmsg, so they are joined; cork() only buffers small writes.
+        try:
+            sent = self._sock.send(b''.join(buffers))
+        except error as ex:
+            if ex.args[0] not in _socketcommon.GSENDAGAIN:
+                raise
+            sys.exc_clear()
+            return 0
+        if self._stats is not None:
+            self._stats.sent(sent)
+        return sent
+
+    def cork(self, threshold=_socketcommon.COALESCE_SIZE):
+        """
+        Start buffering small writes.
+
+        Until :meth:`uncork` is called, :meth:`sendall` keeps data
+        smaller than *threshold* bytes instead of sending it. What's
+        buffered is sent all together once the greenlets that are
+        ready to run in the current iteration of the event loop have
+        run (so a protocol that writes a message in several pieces
+        produces one system call, and usually one packet, even with
+        ``TCP_NODELAY``), when it reaches *threshold* bytes, before a
+        larger write, or when :meth:`flush` is called. At the end of
+        an iteration, the event loop itself writes what the socket
+        will take without waiting; only what's left, if anything, is
+        written in the background by another greenlet.
+
+        If sending in the background fails, the exception is raised
+        by the next call to :meth:`sendall` or :meth:`flush`. Other
+        methods that send data don't look at the buffer; call
+        :meth:`flush` before using them.
+
+        .. versionadded:: 1.3a1
+        """
+        if self._cork is None:
+            self._cork = _socketcommon._Cork(self, threshold)
+
+    def uncork(self):
+        """
+        Send what :meth:`cork` buffered and stop buffering.
+
+        .. versionadded:: 1.3a1
+        """
+        cork = self._cork
+        if cork is not None:
+            try:
+                cork.flush()
+            finally:
+                self._cork = None
+
+    def flush(self):
+        """
+        Send what :meth:`cork` has buffered so far, waiting until it
+        has all been written. Does nothing if the socket isn't corked.
+
+        .. versionadded:: 1.3a1
+        """
+        if self._cork is not None:
+            self._cork.flush()
+
     def sendto(self, *args):
         sock = self._sock
         try:
-            return sock.sendto(*args)
+            sent = sock.sendto(*args)
         except error as ex:
             if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                 raise
             sys.exc_clear()
             self._wait(self._write_event)
             try:
-                return sock.sendto(*args)
+                sent = sock.sendto(*args)
             except error as ex2:
                 if ex2.args[0] == EWOULDBLOCK:
                     return 0
                 raise
+        if self._stats is not None:
+            self._stats.sent(sent)
+        return sent
 
     def setblocking(self, flag):
         if flag:
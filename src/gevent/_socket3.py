@@ -15,6 +15,7 @@ from gevent import _socketcommon
 from gevent._util import copy_globals
 from gevent._compat import PYPY
 import _socket
+from timeit import default_timer
 from os import dup
 
 copy_globals(_socketcommon, globals(),
@@ -30,6 +31,13 @@ __dns__ = _socketcommon.__dns__
 
 SocketIO = __socket__.SocketIO # pylint:disable=no-member
 
+try:
+    _GiveupOnSendfile = __socket__._GiveupOnSendfile # pylint:disable=no-member
+except AttributeError:
+    # Python 3.4
+    class _GiveupOnSendfile(Exception):
+        pass
+
 
 def _get_memory(data):
     mv = memoryview(data)
@@ -39,6 +47,7 @@ def _get_memory(data):
     # or something else exotic that supports the buffer interface
     return mv.tobytes()
 
+
 timeout_default = object()
 
 
@@ -74,6 +83,11 @@ class socket(object):
     # of _wrefsocket. (gevent internal usage only)
     _gevent_sock_class = _wrefsocket
 
+    # Set by cork()
+    _cork = None
+    # A gevent.socketstats.SocketStats, or None
+    _stats = None
+
     def __init__(self, family=AF_INET, type=SOCK_STREAM, proto=0, fileno=None):
         # Take the same approach as socket2: wrap a real socket object,
         # don't subclass it. This lets code that needs the raw _sock (not tied to the hub)
@@ -152,11 +166,16 @@ class socket(object):
             timeout = Timeout.start_new(self.timeout, timeout_exc, ref=False)
         else:
             timeout = None
+        stats = self._stats
+        if stats is not None:
+            start = default_timer()
         try:
             self.hub.wait(watcher)
         finally:
             if timeout is not None:
                 timeout.cancel()
+            if stats is not None:
+                stats.waited(watcher is self._write_event, default_timer() - start)
 
     def dup(self):
         """dup() -> socket object
@@ -277,6 +296,9 @@ class socket(object):
 
     def close(self):
         # This function should not reference any globals. See Python issue #808164.
+        if self._cork is not None:
+            self._cork.close()
+            self._cork = None
         self._closed = True
         if self._io_refs <= 0:
             self._real_close()
@@ -341,10 +363,14 @@ class socket(object):
     def recv(self, *args):
         while True:
             try:
-                return _socket.socket.recv(self._sock, *args)
+                result = _socket.socket.recv(self._sock, *args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
+            else:
+                if self._stats is not None:
+                    self._stats.received(len(result))
+                return result
             self._wait(self._read_event)
 
     if hasattr(_socket.socket, 'sendmsg'):
@@ -371,47 +397,65 @@ class socket(object):
     def recvfrom(self, *args):
         while True:
             try:
-                return _socket.socket.recvfrom(self._sock, *args)
+                result = _socket.socket.recvfrom(self._sock, *args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
+            else:
+                if self._stats is not None:
+                    self._stats.received(len(result[0]))
+                return result
             self._wait(self._read_event)
 
     def recvfrom_into(self, *args):
         while True:
             try:
-                return _socket.socket.recvfrom_into(self._sock, *args)
+                result = _socket.socket.recvfrom_into(self._sock, *args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
+            else:
+                if self._stats is not None:
+                    self._stats.received(result[0])
+                return result
             self._wait(self._read_event)
 
     def recv_into(self, *args):
         while True:
             try:
-                return _socket.socket.recv_into(self._sock, *args)
+                result = _socket.socket.recv_into(self._sock, *args)
             except error as ex:
                 if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                     raise
+            else:
+                if self._stats is not None:
+                    self._stats.received(result)
+                return result
             self._wait(self._read_event)
 
     def send(self, data, flags=0, timeout=timeout_default):
         if timeout is timeout_default:
             timeout = self.timeout
         try:
-            return _socket.socket.send(self._sock, data, flags)
+            sent = _socket.socket.send(self._sock, data, flags)
         except error as ex:
             if ex.args[0] not in _socketcommon.GSENDAGAIN or timeout == 0.0:
                 raise
             self._wait(self._write_event)
             try:
-                return _socket.socket.send(self._sock, data, flags)
+                sent = _socket.socket.send(self._sock, data, flags)
             except error as ex2:
                 if ex2.args[0] == EWOULDBLOCK:
                     return 0
                 raise
+        if self._stats is not None:
+            self._stats.sent(sent)
+        return sent
 
     def sendall(self, data, flags=0):
+        cork = self._cork
+        if cork is not None and cork.flusher is not getcurrent():
+            return cork.sendall(data, flags)
         # XXX Now that we run on PyPy3, see the notes in _socket2.py's sendall()
         # and implement that here if needed.
         # PyPy3 is not optimized for performance yet, and is known to be slower than
@@ -440,19 +484,160 @@ class socket(object):
                 if timeleft <= 0:
                     raise timeout('timed out')
 
+    if hasattr(_socket.socket, 'sendmsg'):
+        def sendall_vectored(self, buffers, flags=0):
+            """
+            Send all the bytes in the sequence of bytes-like objects
+            *buffers*, in order, as if they had been joined and passed
+            to :meth:`sendall`, but without joining them.
+
+            The buffers are handed to the kernel together with
+            ``sendmsg`` (up to ``IOV_MAX`` at a time). After a partial
+            write, the remaining buffers are sent starting from where it
+            stopped, slicing the first one rather than copying it. As
+            for :meth:`sendall`, the socket's timeout bounds the whole
+            call.
+
+            Where ``sendmsg`` isn't available, and on SSL sockets,
+            small buffers are copied together into larger chunks and
+            each chunk is sent with :meth:`sendall`.
+
+            .. versionadded:: 1.3a1
+            """
+            views = [view for view in map(_socketcommon._get_byte_view, buffers) if len(view)]
+            if not views:
+                return
+            sock = self._sock
+            sendmsg = _socket.socket.sendmsg
+            iov_max = _socketcommon.IOV_MAX
+            start = 0
+            count = len(views)
+            # One timer for the whole call, so that each wait only
+            # gets what's left of the timeout.
+            if self.timeout:
+                timer = Timeout.start_new(self.timeout, timeout('timed out'))
+            else:
+                timer = None
+            try:
+                while True:
+                    try:
+                        sent = sendmsg(sock, views[start:start + iov_max], (), flags)
+                    except error as ex:
+                        if ex.args[0] not in _socketcommon.GSENDAGAIN or self.timeout == 0.0:
+                            raise
+                        self._wait(self._write_event)
+                        sent = 0
+                    else:
+                        if self._stats is not None:
+                            self._stats.sent(sent)
+                    while sent:
+                        length = len(views[start])
+                        if sent < length:
+                            views[start] = views[start][sent:]
+                            break
+                        sent -= length
+                        start += 1
+                    if start >= count:
+                        return
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+        def _send_vectored_nowait(self, buffers):
+            # Send what the kernel takes of the byte strings *buffers*
+            # without waiting and return how many bytes that was.
+            # cork() uses this from the hub, where it can't wait.
+            try:
+                sent = _socket.socket.sendmsg(self._sock, buffers[:_socketcommon.IOV_MAX])
+            except error as ex:
+                if ex.args[0] not in _socketcommon.GSENDAGAIN:
+                    raise
+                return 0
+            if self._stats is not None:
+                self._stats.sent(sent)
+            return sent
+    else:
+        def sendall_vectored(self, buffers, flags=0):
+            _socketcommon._sendall_coalesced(self, buffers, flags)
+
+        def _send_vectored_nowait(self, buffers):
+            # Like the version above, but the buffers are joined. cork()
+            # only buffers small writes.
+            try:
+                sent = _socket.socket.send(self._sock, b''.join(buffers))
+            except error as ex:
+                if ex.args[0] not in _socketcommon.GSENDAGAIN:
+                    raise
+                return 0
+            if self._stats is not None:
+                self._stats.sent(sent)
+            return sent
+
+    def cork(self, threshold=_socketcommon.COALESCE_SIZE):
+        """
+        Start buffering small writes.
+
+        Until :meth:`uncork` is called, :meth:`sendall` keeps data
+        smaller than *threshold* bytes instead of sending it. What's
+        buffered is sent all together once the greenlets that are
+        ready to run in the current iteration of the event loop have
+        run (so a protocol that writes a message in several pieces
+        produces one system call, and usually one packet, even with
+        ``TCP_NODELAY``), when it reaches *threshold* bytes, before a
+        larger write, or when :meth:`flush` is called. At the end of
+        an iteration, the event loop itself writes what the socket
+        will take without waiting; only what's left, if anything, is
+        written in the background by another greenlet.
+
+        If sending in the background fails, the exception is raised
+        by the next call to :meth:`sendall` or :meth:`flush`. Other
+        methods that send data don't look at the buffer; call
+        :meth:`flush` before using them.
+
+        .. versionadded:: 1.3a1
+        """
+        if self._cork is None:
+            self._cork = _socketcommon._Cork(self, threshold)
+
+    def uncork(self):
+        """
+        Send what :meth:`cork` buffered and stop buffering.
+
+        .. versionadded:: 1.3a1
+        """
+        cork = self._cork
+        if cork is not None:
+            try:
+                cork.flush()
+            finally:
+                self._cork = None
+
+    def flush(self):
+        """
+        Send what :meth:`cork` has buffered so far, waiting until it
+        has all been written. Does nothing if the socket isn't corked.
+
+        .. versionadded:: 1.3a1
+        """
+        if self._cork is not None:
+            self._cork.flush()
+
     def sendto(self, *args):
         try:
-            return _socket.socket.sendto(self._sock, *args)
+            sent = _socket.socket.sendto(self._sock, *args)
         except error as ex:
             if ex.args[0] != EWOULDBLOCK or self.timeout == 0.0:
                 raise
             self._wait(self._write_event)
             try:
-                return _socket.socket.sendto(self._sock, *args)
+                sent = _socket.socket.sendto(self._sock, *args)
             except error as ex2:
                 if ex2.args[0] == EWOULDBLOCK:
                     return 0
                 raise
+        if self._stats is not None:
+            self._stats.sent(sent)
+        return sent
 
     if hasattr(_socket.socket, 'sendmsg'):
         # Only on Unix
@@ -511,11 +696,63 @@ class socket(object):
         self._sock.shutdown(how)
 
     # sendfile: new in 3.5. But there's no real reason to not
-    # support it everywhere. Note that we can't use os.sendfile()
-    # because it's not cooperative.
-    def _sendfile_use_sendfile(self, file, offset=0, count=None):
-        # This is called directly by tests
-        raise __socket__._GiveupOnSendfile() # pylint:disable=no-member
+    # support it everywhere. We can't use the standard library's
+    # implementation of _sendfile_use_sendfile because it blocks in a
+    # selector, but os.sendfile() itself is fine on our non-blocking
+    # sockets as long as we wait for the write watcher on EAGAIN.
+    if hasattr(os, 'sendfile'):
+        def _sendfile_use_sendfile(self, file, offset=0, count=None):
+            self._check_sendfile_params(file, offset, count)
+            sockno = self.fileno()
+            try:
+                fileno = file.fileno()
+            except (AttributeError, io.UnsupportedOperation) as err:
+                raise _GiveupOnSendfile(err)
+            try:
+                fsize = os.fstat(fileno).st_size
+            except OSError as err:
+                raise _GiveupOnSendfile(err)
+            if not fsize:
+                return 0
+            if self.gettimeout() == 0:
+                raise ValueError("non-blocking sockets are not supported")
+            # Linux won't send more than 0x7ffff000 bytes at once; asking
+            # for no more than 1GB keeps us well under that everywhere.
+            blocksize = min(count or fsize, 0x40000000)
+            total_sent = 0
+            os_sendfile = os.sendfile
+            try:
+                while True:
+                    if count:
+                        blocksize = min(count - total_sent, blocksize)
+                        if blocksize <= 0:
+                            break
+                    try:
+                        sent = os_sendfile(sockno, fileno, offset, blocksize)
+                    except BlockingIOError:
+                        self._wait(self._write_event)
+                        continue
+                    except OSError as err:
+                        if total_sent == 0:
+                            # We can fall back to send() (e.g., the
+                            # file or socket type isn't supported)
+                            raise _GiveupOnSendfile(err)
+                        raise
+                    else:
+                        if sent == 0:
+                            break  # EOF
+                        if self._stats is not None:
+                            self._stats.sent(sent)
+                        offset += sent
+                        total_sent += sent
+                return total_sent
+            finally:
+                if total_sent > 0 and hasattr(file, 'seek'):
+                    file.seek(offset)
+    else:
+        def _sendfile_use_sendfile(self, file, offset=0, count=None):
+            # This is called directly by tests
+            raise _GiveupOnSendfile()
 
     def _sendfile_use_send(self, file, offset=0, count=None):
         self._check_sendfile_params(file, offset, count)
@@ -587,8 +824,16 @@ class socket(object):
         .. versionadded:: 1.1rc4
            Added in Python 3.5, but available under all Python 3 versions in
            gevent.
+
+        .. versionchanged:: 1.3a1
+           Use :func:`os.sendfile` where available, waiting for the
+           socket to become writable whenever it would block, so the
+           file data doesn't pass through Python.
         """
-        return self._sendfile_use_send(file, offset, count)
+        try:
+            return self._sendfile_use_sendfile(file, offset, count)
+        except _GiveupOnSendfile:
+            return self._sendfile_use_send(file, offset, count)
 
     # get/set_inheritable new in 3.4
     if hasattr(os, 'get_inheritable') or hasattr(os, 'get_handle_inheritable'):
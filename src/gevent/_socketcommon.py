@@ -27,6 +27,8 @@ __extensions__ = [
     'wait_read',
     'wait_write',
     'wait_readwrite',
+    'relay',
+    'relay_pair',
 ]
 
 # standard functions and classes that this module re-imports
@@ -69,11 +71,16 @@ __py3_imports__ = [
 __imports__.extend(__py3_imports__)
 
 
+import os
 import sys
+import time
+from gevent import _splice
 from gevent.hub import get_hub
+from gevent.hub import getcurrent
+from gevent.hub import spawn_raw
 from gevent.hub import ConcurrentObjectUseError
 from gevent.timeout import Timeout
-from gevent._compat import string_types, integer_types, PY3
+from gevent._compat import string_types, integer_types, text_type, PY3
 from gevent._util import copy_globals
 from gevent._util import _NONE
 
@@ -134,6 +141,400 @@ del _name, _value
 
 _timeout_error = timeout # pylint: disable=undefined-variable
 
+# The most buffers one sendmsg() call may be given.
+try:
+    from os import sysconf as _sysconf
+    IOV_MAX = _sysconf('SC_IOV_MAX')
+except (ImportError, ValueError, OSError):
+    IOV_MAX = -1
+if IOV_MAX <= 0:
+    # The POSIX minimum, and what Linux has had forever.
+    IOV_MAX = 1024
+
+# Buffers smaller than this are copied together before being written
+# when writing them separately isn't possible.
+COALESCE_SIZE = 64 * 1024
+
+
+def _get_byte_view(data):
+    # A buffer over *data* whose len() is in bytes.
+    if not PY3 and isinstance(data, text_type):
+        data = data.encode()
+    try:
+        mv = memoryview(data)
+    except TypeError:
+        if PY3:
+            raise
+        # Python 2's array.array doesn't support memoryview
+        return buffer(data) # pylint:disable=undefined-variable
+    if mv.itemsize == 1 and mv.ndim == 1:
+        return mv
+    if PY3 and mv.c_contiguous:
+        return mv.cast('B')
+    return memoryview(mv.tobytes())
+
+
+def _coalesce(views, size=COALESCE_SIZE):
+    """
+    Yield the buffers in *views*, copying runs of ones smaller than
+    *size* into chunks of at least *size* bytes (except maybe the
+    last). Larger buffers are yielded as they are.
+    """
+    pending = None
+    for view in views:
+        if len(view) >= size:
+            if pending:
+                yield pending
+                pending = None
+            yield view
+            continue
+        if pending is None:
+            pending = bytearray(view)
+        else:
+            pending += view
+        if len(pending) >= size:
+            yield pending
+            pending = None
+    if pending:
+        yield pending
+
+
+def _sendall_coalesced(sock, buffers, flags=0):
+    """
+    The implementation of ``sendall_vectored`` when the buffers can't
+    be handed to the kernel together: :meth:`sendall` each chunk from
+    :func:`_coalesce`. The socket's timeout applies to the whole call,
+    as for ``sendall``, but is only checked between chunks.
+    """
+    timeleft = sock.timeout
+    end = time.time() + timeleft if timeleft is not None else None
+    started = False
+    for chunk in _coalesce([_get_byte_view(data) for data in buffers]):
+        if started and end is not None and time.time() >= end:
+            raise _timeout_error('timed out')
+        started = True
+        sock.sendall(chunk, flags)
+
+
+class _Cork(object):
+    # The state of a socket between cork() and uncork(): the small
+    # writes waiting to be sent together.
+
+    __slots__ = ('sock', 'threshold', 'buffers', 'size', 'lock',
+                 'flusher', 'callback', 'error')
+
+    def __init__(self, sock, threshold):
+        from gevent.lock import Semaphore
+        self.sock = sock
+        self.threshold = threshold
+        self.buffers = []
+        self.size = 0
+        # Held while writing, so writes stay in order.
+        self.lock = Semaphore()
+        # The greenlet holding the lock, whose sendall() calls
+        # go straight to the socket.
+        self.flusher = None
+        self.callback = None
+        # An exception from a flush in the background, raised by
+        # the next call to sendall() or flush().
+        self.error = None
+
+    def _raise_error(self):
+        error = self.error
+        if error is not None:
+            self.error = None
+            raise error
+
+    def sendall(self, data, flags):
+        if self.error is not None:
+            self._raise_error()
+        if isinstance(data, bytes):
+            size = len(data)
+        else:
+            data = _get_byte_view(data)
+            size = len(data)
+        if flags or size >= self.threshold:
+            # Send it now, after what's already buffered.
+            with self.lock:
+                self._flush_locked(data, flags)
+            return
+        if not size:
+            return
+        if not isinstance(data, bytes):
+            # The caller may reuse the buffer as soon as we return.
+            data = data.tobytes() if hasattr(data, 'tobytes') else bytes(data)
+        self.buffers.append(data)
+        self.size += size
+        if self.size >= self.threshold:
+            self.flush()
+        elif self.callback is None:
+            self.callback = self.sock.hub.loop.run_callback(self._flush_later)
+
+    def flush(self):
+        self._raise_error()
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self, data=None, flags=0):
+        self.flusher = getcurrent()
+        try:
+            while self.buffers:
+                buffers = self.buffers
+                self.buffers = []
+                self.size = 0
+                self.sock.sendall_vectored(buffers)
+            if data is not None:
+                self.sock.sendall(data, flags)
+        finally:
+            self.flusher = None
+
+    def _flush_later(self):
+        # Runs in the hub once the greenlets that were ready this loop
+        # iteration have had their turn. The kernel usually takes
+        # everything at once, so try that here; only what's left after
+        # a partial write is written by a greenlet, which can wait for
+        # the socket. (SSL sockets always use a greenlet.) If another
+        # greenlet is already writing, it will also write what was
+        # buffered meanwhile.
+        self.callback = None
+        if not self.buffers or self.lock.locked():
+            return
+        if not hasattr(self.sock, '_sslobj'):
+            try:
+                sent = self.sock._send_vectored_nowait(self.buffers)
+            except error as ex: # pylint:disable=undefined-variable
+                self.buffers = []
+                self.size = 0
+                self.error = ex
+                return
+            if sent:
+                self._consumed(sent)
+            if not self.buffers:
+                return
+        spawn_raw(self._flush_in_background)
+
+    def _consumed(self, sent):
+        # Drop the first *sent* bytes of the buffers.
+        buffers = self.buffers
+        self.size -= sent
+        index = 0
+        while sent:
+            length = len(buffers[index])
+            if sent < length:
+                buffers[index] = buffers[index][sent:]
+                break
+            sent -= length
+            index += 1
+        del buffers[:index]
+
+    def _flush_in_background(self):
+        try:
+            with self.lock:
+                self._flush_locked()
+        except Exception as ex: # pylint:disable=broad-except
+            self.error = ex
+
+    def close(self):
+        # Make a last attempt to send what's buffered, and let a
+        # greenlet that is writing in the background finish, if we're
+        # allowed to block. Errors can't be reported to anyone.
+        if self.callback is not None:
+            self.callback.stop()
+            self.callback = None
+        current = getcurrent()
+        if ((self.buffers or self.lock.locked())
+                and current is not self.sock.hub and current is not self.flusher):
+            try:
+                self.flush()
+            except error: # pylint:disable=undefined-variable
+                pass
+        self.buffers = []
+        self.size = 0
+
+
+class _RelayEnd(object):
+    # One end of relay(): a gevent socket, or a file descriptor (or
+    # an object with a fileno() method), such as a pipe, that is
+    # waited on with a watcher of our own.
+
+    __slots__ = ('obj', 'sock', 'fileno', 'watcher')
+
+    def __init__(self, obj, event):
+        self.obj = obj
+        if hasattr(obj, '_wait'):
+            self.sock = obj
+            self.fileno = obj.fileno()
+            self.watcher = obj._read_event if event == 1 else obj._write_event
+        else:
+            self.sock = None
+            self.fileno = obj if isinstance(obj, integer_types) else obj.fileno()
+            self.watcher = get_hub().loop.io(self.fileno, event)
+
+    def wait(self):
+        if self.sock is not None:
+            self.sock._wait(self.watcher)
+        else:
+            wait(self.watcher)
+
+    def close(self):
+        if self.sock is None:
+            self.watcher.close()
+
+    def can_splice(self):
+        # Not through SSL, or with data buffered in Python.
+        sock = self.sock
+        return sock is None or (not hasattr(sock, '_sslobj') and sock._cork is None)
+
+    def recv_into(self, view):
+        if self.sock is not None:
+            return self.sock.recv_into(view)
+        while True:
+            try:
+                data = os.read(self.fileno, len(view))
+            except OSError as ex:
+                if ex.errno not in (EAGAIN, EWOULDBLOCK):
+                    raise
+                self.wait()
+            else:
+                view[:len(data)] = data
+                return len(data)
+
+    def sendall(self, view):
+        if self.sock is not None:
+            return self.sock.sendall(view)
+        while len(view):
+            try:
+                view = view[os.write(self.fileno, view):]
+            except OSError as ex:
+                if ex.errno not in (EAGAIN, EWOULDBLOCK):
+                    raise
+                self.wait()
+
+
+def relay(source, dest, bufsize=65536):
+    """
+    Copy everything read from *source* to *dest*, until the end of
+    *source*, and return the number of bytes copied.
+
+    Each of *source* and *dest* is a gevent socket, or a file
+    descriptor (or an object with a ``fileno()`` method), such as
+    a pipe, that is ready for non-blocking I/O. Neither is closed or
+    shut down.
+
+    On Linux, when neither is an SSL socket, the data is moved with
+    the ``splice`` system call through a pipe, never being copied
+    into Python. Otherwise, it is read with ``recv_into`` into a
+    buffer of *bufsize* bytes and written with ``sendall``. Either
+    way, the current greenlet waits for the ends to become ready as
+    a socket operation would, honoring the sockets' timeouts.
+
+    .. versionadded:: 1.3a1
+    """
+    src = _RelayEnd(source, 1)
+    dst = _RelayEnd(dest, 2)
+    try:
+        if _splice.splice is not None and src.can_splice() and dst.can_splice():
+            total = _relay_splice(src, dst, bufsize)
+            if total is not None:
+                return total
+        return _relay_copy(src, dst, bufsize)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _relay_splice(src, dst, bufsize):
+    # Return None if splice() isn't supported for these
+    # descriptors and nothing has been moved.
+    splice = _splice.splice
+    pipe_r, pipe_w = os.pipe()
+    try:
+        total = 0
+        while True:
+            try:
+                pending = splice(src.fileno, pipe_w, bufsize)
+            except error as ex: # pylint:disable=undefined-variable
+                if ex.args[0] in (EAGAIN, EWOULDBLOCK):
+                    # The pipe is always empty here, so it's the source
+                    # that has nothing to read.
+                    src.wait()
+                    continue
+                if ex.args[0] == EINVAL and not total:
+                    return None
+                raise
+            if not pending:
+                return total
+            while pending:
+                try:
+                    moved = splice(pipe_r, dst.fileno, pending)
+                except error as ex: # pylint:disable=undefined-variable
+                    if ex.args[0] not in (EAGAIN, EWOULDBLOCK):
+                        raise
+                    dst.wait()
+                    continue
+                pending -= moved
+                total += moved
+    finally:
+        os.close(pipe_r)
+        os.close(pipe_w)
+
+
+def _relay_copy(src, dst, bufsize):
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    total = 0
+    while True:
+        count = src.recv_into(view)
+        if not count:
+            return total
+        dst.sendall(view[:count])
+        total += count
+
+
+def relay_pair(a, b, bufsize=65536):
+    """
+    Copy data between the connected sockets *a* and *b* in both
+    directions, as :func:`relay` does, until each has reached the
+    end of its input. Return the number of bytes copied from *a* to
+    *b* and from *b* to *a*.
+
+    When one direction ends, the socket it was writing to is shut
+    down for writing, so the peer sees the end of the stream. The
+    sockets aren't closed. If copying fails in either direction, the
+    other is stopped and the exception is raised.
+
+    .. versionadded:: 1.3a1
+    """
+    from gevent.greenlet import Greenlet
+    from gevent.hub import kill
+
+    caller = getcurrent()
+
+    def reverse_half():
+        try:
+            return _relay_half(b, a, bufsize)
+        except Exception as ex: # pylint:disable=broad-except
+            # Stop the forward direction by raising it there.
+            kill(caller, ex)
+
+    reverse = Greenlet.spawn(reverse_half)
+    try:
+        forward = _relay_half(a, b, bufsize)
+        backward = reverse.get()
+    finally:
+        reverse.kill()
+    return forward, backward
+
+
+def _relay_half(source, dest, bufsize):
+    count = relay(source, dest, bufsize)
+    try:
+        dest.shutdown(SHUT_WR) # pylint:disable=undefined-variable
+    except error: # pylint:disable=undefined-variable
+        # The peer is already gone.
+        pass
+    return count
+
 
 def wait(io, timeout=None, timeout_exc=_NONE):
     """
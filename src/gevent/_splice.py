@@ -0,0 +1,50 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Access to the Linux ``splice`` system call through :mod:`ctypes`,
+used by :func:`gevent.socket.relay` to move data between file
+descriptors through a kernel pipe without copying it into Python.
+
+:data:`splice` is None where the C library doesn't provide the call.
+"""
+from __future__ import absolute_import
+
+import os
+import _socket
+
+__all__ = [
+    'splice',
+]
+
+splice = None
+
+SPLICE_F_MOVE = 1
+SPLICE_F_NONBLOCK = 2
+SPLICE_F_MORE = 4
+
+try:
+    import ctypes
+    if not os.uname()[0].startswith('Linux'):
+        raise ImportError("splice is Linux-only")
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _splice = _libc.splice
+except (ImportError, OSError, AttributeError):
+    pass
+else:
+    _splice.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p,
+                        ctypes.c_size_t, ctypes.c_uint]
+    _splice.restype = ctypes.c_ssize_t
+
+    def splice(fd_in, fd_out, count, flags=SPLICE_F_MOVE | SPLICE_F_NONBLOCK):
+        """
+        Move up to *count* bytes from *fd_in* to *fd_out*, one of
+        which must be a pipe. Return the number of bytes moved, 0 at
+        the end of the input.
+
+        :raises socket.error: With the ``errno`` of the failure,
+            ``EAGAIN`` included.
+        """
+        result = _splice(fd_in, None, fd_out, None, count, flags)
+        if result < 0:
+            err = ctypes.get_errno()
+            raise _socket.error(err, os.strerror(err))
+        return result
@@ -173,6 +173,8 @@ class SSLSocket(socket):
                     else:
                         raise
                 else:
+                    if self._stats is not None:
+                        self._stats.sent(v)
                     return v
         else:
             return socket.send(self, data, flags, timeout)
@@ -189,6 +191,27 @@ class SSLSocket(socket):
             # Convert the socket.timeout back to the sslerror
             raise SSLError(*ex.args)
 
+    def sendall_vectored(self, buffers, flags=0):
+        """
+        Like :meth:`gevent.socket.socket.sendall_vectored`, except
+        that once the connection is encrypted each write produces
+        its own TLS record(s), so the small buffers are copied
+        together into larger chunks instead.
+
+        .. versionadded:: 1.3a1
+        """
+        if self._sslobj and flags != 0:
+            raise ValueError(
+                "non-zero flags not allowed in calls to sendall_vectored() on %s" %
+                self.__class__)
+        try:
+            # Each chunk goes through our sendall().
+            socket.sendall_vectored(self, buffers, flags)
+        except _socket_timeout as ex:
+            if self.timeout == 0.0:
+                raise SSLError(SSL_ERROR_WANT_WRITE)
+            raise SSLError(*ex.args)
+
     def sendto(self, *args):
         if self._sslobj:
             raise ValueError("sendto not allowed on instances of %s" %
@@ -203,7 +226,10 @@ class SSLSocket(socket):
                     "non-zero flags not allowed in calls to recv() on %s" %
                     self.__class__)
             # QQQ Shouldn't we wrap the SSL_WANT_READ errors as socket.timeout errors to match socket.recv's behavior?
-            return self.read(buflen)
+            data = self.read(buflen)
+            if self._stats is not None:
+                self._stats.received(len(data))
+            return data
         else:
             return socket.recv(self, buflen, flags)
 
@@ -222,6 +248,8 @@ class SSLSocket(socket):
                     tmp_buffer = self.read(nbytes)
                     v = len(tmp_buffer)
                     buffer[:v] = tmp_buffer
+                    if self._stats is not None:
+                        self._stats.received(v)
                     return v
                 except SSLError as x:
                     if x.args[0] == SSL_ERROR_WANT_READ:
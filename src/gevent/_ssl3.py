@@ -18,6 +18,7 @@ import errno
 from gevent.socket import socket, timeout_default
 from gevent.socket import error as socket_error
 from gevent.socket import timeout as _socket_timeout
+from gevent._socketcommon import _sendall_coalesced
 from gevent._util import copy_globals
 
 from weakref import ref as _wref
@@ -375,7 +376,6 @@ class SSLSocket(socket):
                 return None
             return self._sslobj.version()
 
-        # We inherit sendfile from super(); it always uses `send`
 
     def cipher(self):
         self._checkClosed()
@@ -400,7 +400,7 @@ class SSLSocket(socket):
                     self.__class__)
             while True:
                 try:
-                    return self._sslobj.write(data)
+                    sent = self._sslobj.write(data)
                 except SSLWantReadError:
                     if self.timeout == 0.0:
                         return 0
@@ -409,6 +409,10 @@ class SSLSocket(socket):
                     if self.timeout == 0.0:
                         return 0
                     self._wait(self._write_event)
+                else:
+                    if self._stats is not None:
+                        self._stats.sent(sent)
+                    return sent
         else:
             return socket.send(self, data, flags, timeout)
 
@@ -444,6 +448,39 @@ class SSLSocket(socket):
                 raise SSLWantWriteError("The operation did not complete (write)")
             raise
 
+    def sendall_vectored(self, buffers, flags=0):
+        """
+        Like :meth:`gevent.socket.socket.sendall_vectored`, except
+        that once the connection is encrypted each write produces
+        its own TLS record(s), so the small buffers are copied
+        together into larger chunks instead.
+
+        .. versionadded:: 1.3a1
+        """
+        self._checkClosed()
+        if not self._sslobj:
+            return socket.sendall_vectored(self, buffers, flags)
+        if flags != 0:
+            raise ValueError(
+                "non-zero flags not allowed in calls to sendall_vectored() on %s" %
+                self.__class__)
+        try:
+            return _sendall_coalesced(self, buffers)
+        except _socket_timeout:
+            if self.timeout == 0.0:
+                raise SSLWantWriteError("The operation did not complete (write)")
+            raise
+
+    def sendfile(self, file, offset=0, count=None):
+        """
+        Send a file, possibly by using :func:`os.sendfile` if this is a
+        clear-text socket. Once encrypted, the file data must pass
+        through the SSL object, so this uses :meth:`send`.
+        """
+        if self._sslobj is not None:
+            return self._sendfile_use_send(file, offset, count)
+        return socket.sendfile(self, file, offset, count)
+
     def recv(self, buflen=1024, flags=0):
         self._checkClosed()
         if self._sslobj:
@@ -455,7 +492,10 @@ class SSLSocket(socket):
                 # https://github.com/python/cpython/commit/00915577dd84ba75016400793bf547666e6b29b5
                 # Python #23804
                 return b''
-            return self.read(buflen)
+            data = self.read(buflen)
+            if self._stats is not None:
+                self._stats.received(len(data))
+            return data
         else:
             return socket.recv(self, buflen, flags)
 
@@ -468,7 +508,10 @@ class SSLSocket(socket):
         if self._sslobj:
             if flags != 0:
                 raise ValueError("non-zero flags not allowed in calls to recv_into() on %s" % self.__class__)
-            return self.read(nbytes, buffer)
+            nbytes = self.read(nbytes, buffer)
+            if self._stats is not None:
+                self._stats.received(nbytes)
+            return nbytes
         else:
             return socket.recv_into(self, buffer, nbytes, flags)
 
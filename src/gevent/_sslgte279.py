@@ -406,7 +406,7 @@ class SSLSocket(socket):
 
         while True:
             try:
-                return self._sslobj.write(data)
+                sent = self._sslobj.write(data)
             except SSLWantReadError:
                 if self.timeout == 0.0:
                     return 0
@@ -415,6 +415,10 @@ class SSLSocket(socket):
                 if self.timeout == 0.0:
                     return 0
                 self._wait(self._write_event)
+            else:
+                if self._stats is not None:
+                    self._stats.sent(sent)
+                return sent
 
     def sendto(self, data, flags_or_addr, addr=None):
         self._checkClosed()
@@ -446,6 +450,26 @@ class SSLSocket(socket):
             # Convert the socket.timeout back to the sslerror
             raise SSLError(*ex.args)
 
+    def sendall_vectored(self, buffers, flags=0):
+        """
+        Like :meth:`gevent.socket.socket.sendall_vectored`, except
+        that once the connection is encrypted each write produces
+        its own TLS record(s), so the small buffers are copied
+        together into larger chunks instead.
+
+        .. versionadded:: 1.3a1
+        """
+        self._checkClosed()
+        self.__check_flags('sendall_vectored', flags)
+
+        try:
+            # Each chunk goes through our sendall().
+            socket.sendall_vectored(self, buffers)
+        except _socket_timeout as ex:
+            if self.timeout == 0.0:
+                raise SSLWantWriteError("The operation did not complete (write)")
+            raise SSLError(*ex.args)
+
     def recv(self, buflen=1024, flags=0):
         self._checkClosed()
         if self._sslobj:
@@ -455,7 +479,10 @@ class SSLSocket(socket):
                     self.__class__)
             if buflen == 0:
                 return b''
-            return self.read(buflen)
+            data = self.read(buflen)
+            if self._stats is not None:
+                self._stats.received(len(data))
+            return data
         else:
             return socket.recv(self, buflen, flags)
 
@@ -472,7 +499,10 @@ class SSLSocket(socket):
                 raise ValueError(
                     "non-zero flags not allowed in calls to recv_into() on %s" %
                     self.__class__)
-            return self.read(nbytes, buffer)
+            nbytes = self.read(nbytes, buffer)
+            if self._stats is not None:
+                self._stats.received(nbytes)
+            return nbytes
         else:
             return socket.recv_into(self, buffer, nbytes, flags)
 
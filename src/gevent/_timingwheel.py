@@ -0,0 +1,322 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+A hierarchical timing wheel driven by a single loop timer.
+
+This is an internal module. Set :attr:`gevent.hub.Hub.timer_resolution`
+(or the ``GEVENT_TIMER_RESOLUTION`` environment variable) to have
+:class:`gevent.Timeout`, :func:`gevent.sleep` and socket timeouts use it.
+"""
+from __future__ import print_function, absolute_import, division
+
+import sys
+from timeit import default_timer
+
+__all__ = [
+    'TimingWheel',
+]
+
+
+class WheelTimer(object):
+    """
+    A one-shot timer kept by a :class:`TimingWheel`.
+
+    It has the subset of the API of a loop's ``timer`` watcher that
+    :class:`gevent.Timeout` and :meth:`gevent.hub.Hub.wait` use.
+    """
+
+    __slots__ = ('wheel', 'seconds', 'ref', 'callback', 'args', '_target', '_slot')
+
+    #: Wheel timers are run directly when their tick is processed,
+    #: so they are never pending.
+    pending = False
+
+    def __init__(self, wheel, seconds, ref=True):
+        self.wheel = wheel
+        self.seconds = seconds
+        self.ref = ref
+        self.callback = None
+        self.args = None
+        self._target = 0
+        self._slot = None
+
+    def start(self, callback, *args, **kwargs):
+        # 'update' is accepted for compatibility with loop timers;
+        # the wheel always reads the clock.
+        kwargs.pop('update', None)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments", kwargs)
+        self.callback = callback
+        self.args = args
+        self.wheel._arm(self)
+
+    def stop(self):
+        self.callback = None
+        self.args = None
+        if self._slot is not None:
+            self.wheel._disarm(self)
+
+    def close(self):
+        self.stop()
+
+    @property
+    def active(self):
+        return self._slot is not None
+
+    def __repr__(self):
+        return '<%s at 0x%x seconds=%s active=%s callback=%r>' % (
+            self.__class__.__name__, id(self), self.seconds, self.active, self.callback)
+
+
+class TimingWheel(object):
+    """
+    Keeps any number of one-shot timers using one loop timer.
+
+    Time is divided into ticks of *resolution* seconds. Timers due in
+    the next ``slots[0]`` ticks are kept in the slot for their tick
+    in the first level; those further out are kept in coarser levels
+    (``slots[1]`` slots, each ``slots[0]`` ticks wide, and so on) and
+    moved down a level as their time approaches. Starting and
+    stopping a timer are therefore constant time no matter how many
+    timers exist, at the cost of firing up to one *resolution* late.
+    Timers further out than all the levels can hold wait in an
+    overflow set that is sorted back into the wheel once per full
+    rotation.
+
+    The wheel is driven by one of two repeating loop timers, created
+    when first needed and reused after that: one fires every tick,
+    while there are timers due within the next ``slots[0]`` ticks,
+    and the other once every ``slots[0]`` ticks, while there aren't,
+    so that a single long timer doesn't wake the loop every tick.
+    Neither runs while the wheel is empty, and they only keep the
+    loop alive while there are timers created with ``ref=True``.
+    They have the given *priority*, and so do the timers of the
+    wheel, which are run by them.
+    """
+
+    # pylint:disable=too-many-instance-attributes
+
+    #: The default number of slots in each level. With a resolution of
+    #: 10ms, these cover about 7.7 days before overflowing.
+    SLOTS = (256, 64, 64, 64)
+
+    def __init__(self, loop, resolution=0.01, slots=None, priority=None):
+        if resolution <= 0:
+            raise ValueError("resolution must be positive", resolution)
+        self.loop = loop
+        self.resolution = resolution
+        self.priority = priority
+        self._sizes = tuple(slots) if slots is not None else self.SLOTS
+        if not self._sizes or min(self._sizes) < 2:
+            raise ValueError("Each level needs at least two slots", slots)
+        # The number of ticks covered by one slot of each level, and by
+        # a full rotation of each level.
+        self._spans = []
+        self._rotations = []
+        span = 1
+        for size in self._sizes:
+            self._spans.append(span)
+            span *= size
+            self._rotations.append(span)
+        self._levels = [[set() for _ in range(size)] for size in self._sizes]
+        self._overflow = set()
+        self._base = default_timer()
+        self._tick = 0
+        self._count = 0
+        self._refs = 0
+        # The loop timers that fire every tick and every slots[0]
+        # ticks, and the one of them that is running.
+        self._fine = None
+        self._coarse = None
+        self._driver = None
+
+    def timer(self, seconds, ref=True):
+        """
+        Return a new, unstarted timer that will fire *seconds* after
+        it is started.
+        """
+        return WheelTimer(self, seconds, ref)
+
+    def __len__(self):
+        return self._count
+
+    def _now_tick(self):
+        return int((default_timer() - self._base) / self.resolution)
+
+    def _arm(self, timer):
+        if timer._slot is not None:
+            self._disarm(timer)
+        resolution = self.resolution
+        now = default_timer() - self._base
+        now_tick = int(now / resolution)
+        if not self._count:
+            # Nothing is waiting, so there's no need to walk the ticks
+            # that passed since we last ran.
+            self._tick = now_tick
+        tick = self._tick
+        # Round up so that timers never fire early.
+        due = (now + (timer.seconds or 0)) / resolution
+        target = int(due)
+        if target < due:
+            target += 1
+        if target <= tick:
+            target = tick + 1
+        timer._target = target
+        size = self._sizes[0]
+        if target // size == tick // size:
+            # The common case: due in the current rotation of the
+            # first level.
+            slot = self._levels[0][target % size]
+            slot.add(timer)
+            timer._slot = slot
+            visit = target
+        else:
+            visit = self._place(timer)
+        self._count += 1
+        if timer.ref:
+            self._refs += 1
+            if self._refs == 1 and self._driver is not None:
+                self._driver.ref = True
+        # Tick every tick if the wheel has to look at the timer soon.
+        if visit - now_tick <= size:
+            self._drive(True)
+        elif self._driver is None:
+            self._drive(False)
+
+    def _disarm(self, timer):
+        timer._slot.discard(timer)
+        timer._slot = None
+        self._count -= 1
+        if timer.ref:
+            self._refs -= 1
+            if not self._refs and self._driver is not None:
+                self._driver.ref = False
+        if not self._count and self._driver is not None:
+            self._driver.stop()
+            self._driver = None
+
+    def _place(self, timer):
+        # Returns the tick at which the wheel next looks at the
+        # timer, to run it or to move it down a level.
+        target = timer._target
+        tick = self._tick
+        for level, rotation in enumerate(self._rotations):
+            # The lowest level whose current rotation includes the
+            # target. Its slot for the target is still ahead of us.
+            if target // rotation == tick // rotation:
+                span = self._spans[level]
+                slot = self._levels[level][(target // span) % self._sizes[level]]
+                visit = target // span * span
+                break
+        else:
+            slot = self._overflow
+            rotation = self._rotations[-1]
+            visit = (tick // rotation + 1) * rotation
+        slot.add(timer)
+        timer._slot = slot
+        return visit
+
+    def _next_tick(self):
+        # The first tick after the current one that has timers to
+        # expire or to move down a level. Only the lowest level with
+        # any timers ahead in its current rotation matters: the
+        # slots of the levels above it start after that rotation.
+        tick = self._tick
+        for level, size in enumerate(self._sizes):
+            span = self._spans[level]
+            slots = self._levels[level]
+            index = tick // span
+            for index in range(index + 1, (index // size + 1) * size):
+                if slots[index % size]:
+                    return index * span
+        rotation = self._rotations[-1]
+        return (tick // rotation + 1) * rotation
+
+    def _drive(self, fine):
+        # Run the loop timer that fires every tick if *fine*, or the
+        # one that fires every slots[0] ticks if not, instead of the
+        # one running.
+        driver = self._fine if fine else self._coarse
+        if driver is None:
+            interval = self.resolution if fine else self.resolution * self._sizes[0]
+            driver = self.loop.timer(interval, interval, priority=self.priority)
+            if fine:
+                self._fine = driver
+            else:
+                self._coarse = driver
+        if driver is self._driver:
+            return
+        if self._driver is not None:
+            self._driver.stop()
+        driver.ref = self._refs > 0
+        driver.start(self._advance)
+        self._driver = driver
+
+    def _cascade(self, slot):
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _advance(self):
+        # Called by the running loop timer, in the hub. Nothing
+        # happens in the ticks between those _next_tick() finds, so
+        # skip them.
+        now_tick = self._now_tick()
+        while self._count:
+            tick = self._next_tick()
+            if tick > now_tick:
+                break
+            self._tick = tick
+            if tick % self._rotations[-1] == 0:
+                self._cascade(self._overflow)
+            # Refill the levels from the top down, so that timers
+            # can fall through several levels at once.
+            for level in range(len(self._sizes) - 1, 0, -1):
+                span = self._spans[level]
+                if tick % span == 0:
+                    self._cascade(self._levels[level][(tick // span) % self._sizes[level]])
+            self._expire(self._levels[0][tick % self._sizes[0]])
+        self._tick = now_tick
+        if self._count:
+            self._drive(self._next_tick() - now_tick <= self._sizes[0])
+
+    def _expire(self, slot):
+        if not slot:
+            return
+        timers = list(slot)
+        for timer in timers:
+            if timer._slot is not slot:
+                # Stopped by an earlier callback.
+                continue
+            self._disarm(timer)
+            callback = timer.callback
+            args = timer.args
+            if callback is None:
+                continue
+            try:
+                callback(*args)
+            except: # pylint:disable=bare-except
+                self.loop.handle_error(timer, *sys.exc_info())
+
+    def close(self):
+        """
+        Stop all timers and the loop timers.
+        """
+        for slot in [s for level in self._levels for s in level] + [self._overflow]:
+            for timer in slot:
+                timer._slot = None
+            slot.clear()
+        self._count = self._refs = 0
+        self._driver = None
+        for driver in self._fine, self._coarse:
+            if driver is not None:
+                driver.stop()
+                # Not every loop's timers have close().
+                close = getattr(driver, 'close', None)
+                if close is not None:
+                    close()
+        self._fine = self._coarse = None
+
+    def __repr__(self):
+        return '<%s at 0x%x resolution=%s timers=%d>' % (
+            self.__class__.__name__, id(self), self.resolution, self._count)
@@ -0,0 +1,169 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Per-greenlet run time and switch accounting.
+
+This is an internal module. Use :meth:`gevent.hub.Hub.start_greenlet_tracing`
+to enable it, or set the ``GEVENT_TRACE_GREENLETS`` environment variable.
+"""
+from __future__ import print_function, absolute_import, division
+
+import heapq
+from time import time as _wall_time
+from timeit import default_timer
+from weakref import WeakSet
+
+from greenlet import getcurrent
+from greenlet import gettrace
+from greenlet import settrace
+
+__all__ = [
+    'GreenletStats',
+    'GreenletTracer',
+    'get_stats',
+]
+
+_SWITCH_EVENTS = ('switch', 'throw')
+
+# default_timer is the most precise monotonic-ish clock available, but
+# its epoch is arbitrary. This lets us report wall-clock timestamps
+# without a second clock read on every switch.
+_CLOCK_OFFSET = _wall_time() - default_timer()
+
+_STATS_ATTR = '_gevent_run_stats'
+
+
+class GreenletStats(object):
+    """
+    The accounting kept for one greenlet.
+    """
+
+    __slots__ = ('run_time', 'switch_count', '_switched_in', '_last_run')
+
+    def __init__(self):
+        #: The total number of seconds this greenlet has been running
+        #: (from being switched into until switching out), by the
+        #: clock, not CPU time: time the thread was descheduled or
+        #: blocked in a system call counts. For the hub, this
+        #: includes time spent waiting for I/O.
+        self.run_time = 0.0
+        #: The number of times this greenlet has been switched into.
+        self.switch_count = 0
+        self._switched_in = 0.0
+        self._last_run = 0.0
+
+    @property
+    def last_run(self):
+        """
+        The :func:`time.time` at which this greenlet was last switched
+        into, or ``None`` if it never has been.
+        """
+        if not self._last_run:
+            return None
+        return self._last_run + _CLOCK_OFFSET
+
+    def __repr__(self):
+        return '<%s run_time=%.6f switch_count=%d last_run=%r>' % (
+            self.__class__.__name__, self.run_time, self.switch_count, self.last_run)
+
+
+def get_stats(glet):
+    """
+    Return the :class:`GreenletStats` recorded for *glet*, or ``None``
+    if it has not run while tracing was enabled.
+    """
+    return getattr(glet, _STATS_ATTR, None)
+
+
+class GreenletTracer(object):
+    """
+    Records, for each greenlet that runs in this thread, how long it
+    runs, how many times it is switched into, and when it last ran.
+
+    The accounting is kept on the greenlet objects themselves, so
+    each switch costs one clock read and a few attribute updates;
+    greenlets that have been garbage collected drop out of
+    :meth:`top` automatically.
+
+    Any function already installed with :func:`greenlet.settrace`
+    continues to be called.
+    """
+
+    def __init__(self):
+        self._greenlets = WeakSet()
+        self._previous_trace = None
+        self._trace_function = self._trace
+        self._active = False
+
+    def start(self):
+        """
+        Begin tracing switches. Must be called from the thread whose
+        greenlets are to be traced.
+        """
+        if self._active:
+            return
+        self._active = True
+        self._previous_trace = settrace(self._trace_function)
+        # Whoever is running now has been switched into.
+        self._stats_for(getcurrent())._switched_in = default_timer()
+
+    def stop(self):
+        """
+        Stop tracing. Accounting already recorded is kept.
+        """
+        if not self._active:
+            return
+        self._active = False
+        if gettrace() == self._trace_function:
+            settrace(self._previous_trace)
+            self._previous_trace = None
+        # Otherwise, another tracer was installed after us and is calling
+        # us in turn; we now just forward to our predecessor.
+
+    def _stats_for(self, glet):
+        stats = getattr(glet, _STATS_ATTR, None)
+        if stats is None:
+            stats = GreenletStats()
+            setattr(glet, _STATS_ATTR, stats)
+            self._greenlets.add(glet)
+        return stats
+
+    def _trace(self, event, args):
+        if self._active and event in _SWITCH_EVENTS:
+            origin, target = args
+            now = default_timer()
+            stats = getattr(origin, _STATS_ATTR, None)
+            if stats is not None and stats._switched_in:
+                stats.run_time += now - stats._switched_in
+                stats._switched_in = 0.0
+            stats = self._stats_for(target)
+            stats.switch_count += 1
+            stats._switched_in = stats._last_run = now
+        previous = self._previous_trace
+        if previous is not None:
+            previous(event, args)
+
+    def top(self, n=10):
+        """
+        Return a list of up to *n* ``(greenlet, stats)`` pairs for
+        the greenlets that have run the longest, longest first.
+
+        The hub is left out, since most of its time is usually spent
+        waiting for events; :func:`get_stats` still has its numbers.
+        """
+        from gevent.hub import Hub
+        items = [(glet, get_stats(glet)) for glet in list(self._greenlets)
+                 if not isinstance(glet, Hub)]
+        return heapq.nlargest(n, items, key=lambda item: item[1].run_time)
+
+    def reset(self):
+        """
+        Discard all accounting recorded so far.
+        """
+        for glet in list(self._greenlets):
+            stats = get_stats(glet)
+            if stats is not None:
+                stats.run_time = 0.0
+                stats.switch_count = 0
+
+    def __len__(self):
+        return len(self._greenlets)
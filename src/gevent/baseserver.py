@@ -3,6 +3,12 @@
 import sys
 import _socket
 import errno
+import os
+import select
+import struct
+from array import array
+from timeit import default_timer
+from gevent import monkey
 from gevent.greenlet import Greenlet
 from gevent.event import Event
 from gevent.hub import get_hub
@@ -11,6 +17,12 @@ from gevent._compat import string_types, integer_types, xrange
 
 __all__ = ['BaseServer']
 
+# Linux 4.5; Python 2 doesn't define it.
+EPOLLEXCLUSIVE = getattr(select, 'EPOLLEXCLUSIVE', 1 << 28)
+
+# The family and type sent ahead of a listening socket's descriptor
+_HANDOFF_HEADER = struct.Struct('!ii')
+
 
 # We define a helper function to handle closing the socket in
 # do_handle; We'd like to bind it to a kwarg to avoid *any* lookups at
@@ -28,6 +40,155 @@ def _handle_and_close_when_done(handle, close, args_tuple):
         close(*args_tuple)
 
 
+class _ExclusiveAcceptWatcher(object):
+    # Stands in for the io watcher of the listening socket when
+    # BaseServer.exclusive_accept is set. The kernel only honors
+    # EPOLLEXCLUSIVE for a thread blocked in epoll_wait on the epoll
+    # instance itself, not for an epoll watched from another one (such
+    # as the event loop's), so this waits in a thread of the hub's
+    # threadpool and calls back in a greenlet. A pipe registered
+    # alongside the socket wakes the thread up to stop.
+
+    def __init__(self, hub, fileno):
+        # gevent.monkey removes epoll from the select module.
+        try:
+            epoll = monkey.get_original('select', 'epoll')
+        except AttributeError:
+            raise ValueError('exclusive_accept requires epoll')
+        self.hub = hub
+        self.epoll = epoll()
+        self._stop_r, self._stop_w = os.pipe()
+        try:
+            self.epoll.register(fileno, select.EPOLLIN | EPOLLEXCLUSIVE)
+            self.epoll.register(self._stop_r, select.EPOLLIN)
+        except:
+            self._close()
+            raise
+        self.stopped = False
+
+    def start(self, callback):
+        Greenlet.spawn(self._run, callback)
+
+    def _run(self, callback):
+        try:
+            while not self.stopped:
+                self.hub.threadpool.apply(self.epoll.poll)
+                if not self.stopped:
+                    callback()
+        finally:
+            self._close()
+
+    def stop(self):
+        if not self.stopped:
+            self.stopped = True
+            os.write(self._stop_w, b'x')
+
+    def _close(self):
+        self.stopped = True
+        self.epoll.close()
+        os.close(self._stop_r)
+        os.close(self._stop_w)
+
+
+def _retry_fd_call(sock, wait, func, *args):
+    # Python 2's _multiprocessing.sendfd and recvfd, on a
+    # non-blocking socket.
+    while True:
+        try:
+            return func(*args)
+        except OSError as ex:
+            if ex.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+        wait(sock.fileno())
+
+
+def _send_fd(sock, header, fd):
+    if hasattr(sock, 'sendmsg'):
+        sock.sendmsg([header], [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS, array('i', [fd]))])
+    else:
+        import _multiprocessing
+        from gevent.socket import wait_write
+        sock.sendall(header)
+        _retry_fd_call(sock, wait_write, _multiprocessing.sendfd, sock.fileno(), fd)
+
+
+def _recv_fd(sock, size):
+    # Return the header and the descriptor, or None for the latter if
+    # the peer closed the connection first.
+    if hasattr(sock, 'recvmsg'):
+        fds = array('i')
+        header, ancdata, _, _ = sock.recvmsg(size, _socket.CMSG_LEN(fds.itemsize))
+        for level, kind, data in ancdata:
+            if level == _socket.SOL_SOCKET and kind == _socket.SCM_RIGHTS:
+                fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+        return header, fds[0] if fds else None
+
+    import _multiprocessing
+    from gevent.socket import wait_read
+    header = b''
+    while len(header) < size:
+        data = sock.recv(size - len(header))
+        if not data:
+            return header, None
+        header += data
+    return header, _retry_fd_call(sock, wait_read, _multiprocessing.recvfd, sock.fileno())
+
+
+class _AdmissionControl(object):
+    # Throttles a server's accepting by the lag of its event loop: how
+    # late a timer fires, plus how long its callback then waits behind
+    # the greenlets and callbacks that became runnable before it.
+    # While the lag is over BaseServer.max_lag, max_accept is halved on
+    # each measurement; once it is down to one, the server is
+    # overloaded. Below half of max_lag, the server recovers and
+    # max_accept doubles back to its configured value.
+
+    def __init__(self, server):
+        self.server = server
+        self.max_accept = server.max_accept
+        self.lag = 0.0
+        self._due = 0.0
+        self._timer = None
+        self._schedule()
+
+    def _schedule(self):
+        # A new timer each time: restarting a libev timer that has
+        # fired schedules it for what was left of it, about nothing.
+        max_lag = self.server.max_lag
+        self._due = default_timer() + max_lag
+        self._timer = self.server.loop.timer(max_lag, ref=False)
+        self._timer.start(self._probe)
+
+    def _probe(self):
+        self.server.loop.run_callback(self._measure)
+
+    def _measure(self):
+        if self._timer is None:
+            # Closed while this was queued.
+            return
+        server = self.server
+        self.lag = lag = max(0.0, default_timer() - self._due)
+        if lag > server.max_lag:
+            if server.max_accept > 1:
+                server.max_accept = max(1, server.max_accept // 2)
+            elif not server.overloaded:
+                server._set_overloaded(True)
+        elif lag < server.max_lag / 2.0:
+            if server.overloaded:
+                server._set_overloaded(False)
+            elif server.max_accept < self.max_accept:
+                server.max_accept = min(self.max_accept, server.max_accept * 2)
+        self._schedule()
+
+    def close(self):
+        self._timer.stop()
+        self._timer = None
+        server = self.server
+        server.max_accept = self.max_accept
+        if server.overloaded:
+            server._set_overloaded(False)
+
+
 class BaseServer(object):
     """
     An abstract base class that implements some common functionality for the servers in gevent.
@@ -89,8 +250,65 @@ class BaseServer(object):
     #: the default timeout that we wait for the client connections to close in stop()
     stop_timeout = 1
 
+    #: Set by :meth:`stop` when called with ``drain=True``. Handlers
+    #: that serve more than one request on a connection should finish
+    #: the one in progress and close the connection instead of waiting
+    #: for another.
+    #:
+    #: .. versionadded:: 1.3a1
+    draining = False
+
+    #: A :class:`gevent.socketstats.SocketStats` that the sockets of
+    #: this server count their I/O into, or None to leave them to
+    #: :func:`gevent.socketstats.enable`. Set it before the server
+    #: starts; sockets already accepted keep what they had.
+    #:
+    #: .. versionadded:: 1.3a1
+    stats = None
+
+    #: If true, wait for connections on a private epoll instance in
+    #: which the listening socket is registered with ``EPOLLEXCLUSIVE``
+    #: (Linux 4.5 and above), instead of in the event loop. When
+    #: several processes accept from the same socket, a new
+    #: connection then wakes up one (or a few) of them instead of
+    #: every one, most of which would find nothing to accept. The
+    #: wait happens in a thread of the hub's
+    #: :attr:`~gevent.hub.Hub.threadpool`, which it occupies while the
+    #: server is accepting. Each process must start its server
+    #: itself, after forking.
+    #:
+    #: .. versionadded:: 1.3a1
+    exclusive_accept = False
+
+    #: If set, the most seconds that the event loop may lag before the
+    #: server accepts fewer connections, to finish the work it already
+    #: has before taking on more. The lag is measured every *max_lag*
+    #: seconds as how late a timer gets to run. Each measurement
+    #: over the limit halves :attr:`max_accept`; once it is one, the
+    #: server becomes :attr:`overloaded`. When the lag falls under half
+    #: the limit, the server recovers, and :attr:`max_accept` doubles
+    #: back to its configured value. Set it before starting the server.
+    #:
+    #: .. versionadded:: 1.3a1
+    max_lag = None
+
+    #: True while :attr:`max_lag` is exceeded. New connections are left
+    #: in the kernel's listen backlog, or passed to :meth:`reject` if
+    #: :attr:`reject_overload` is set.
+    #:
+    #: .. versionadded:: 1.3a1
+    overloaded = False
+
+    #: If true, keep accepting connections while :attr:`overloaded`,
+    #: and hand them to :meth:`reject` instead of the handler.
+    #:
+    #: .. versionadded:: 1.3a1
+    reject_overload = False
+
     fatal_errors = (errno.EBADF, errno.EINVAL, errno.ENOTSOCK)
 
+    _admission = None
+
     def __init__(self, listener, handle=None, spawn='default'):
         self._stop_event = Event()
         self._stop_event.set()
@@ -151,13 +369,38 @@ class BaseServer(object):
             raise TypeError("'handle' must be provided")
 
     def _start_accepting_if_started(self, _event=None):
-        if self.started:
+        if self.started and not (self.overloaded and not self.reject_overload):
             self.start_accepting()
 
+    def _set_overloaded(self, overloaded):
+        self.overloaded = overloaded
+        if overloaded:
+            if self.reject_overload:
+                self.do_handle = self.reject
+            else:
+                self.stop_accepting()
+        else:
+            self.__dict__.pop('do_handle', None)
+            self._start_accepting_if_started()
+
+    def reject(self, *args):
+        """
+        Called in the hub, instead of the handler, with each
+        connection accepted while the server is :attr:`overloaded`
+        and :attr:`reject_overload` is set. It must not block. This
+        implementation closes the connection.
+
+        .. versionadded:: 1.3a1
+        """
+        self.do_close(*args)
+
     def start_accepting(self):
         if self._watcher is None:
             # just stop watcher without creating a new one?
-            self._watcher = self.loop.io(self.socket.fileno(), 1)
+            if self.exclusive_accept:
+                self._watcher = _ExclusiveAcceptWatcher(get_hub(), self.socket.fileno())
+            else:
+                self._watcher = self.loop.io(self.socket.fileno(), 1)
             self._watcher.start(self._do_read)
 
     def stop_accepting(self):
@@ -305,6 +548,8 @@ class BaseServer(object):
         self._stop_event.clear()
         try:
             self.start_accepting()
+            if self.max_lag:
+                self._admission = _AdmissionControl(self)
         except:
             self.close()
             raise
@@ -314,6 +559,9 @@ class BaseServer(object):
         self._stop_event.set()
         try:
             self.stop_accepting()
+            if self._admission is not None:
+                self._admission.close()
+                self._admission = None
         finally:
             try:
                 self.socket.close()
@@ -332,7 +580,7 @@ class BaseServer(object):
     def closed(self):
         return not hasattr(self, 'socket')
 
-    def stop(self, timeout=None):
+    def stop(self, timeout=None, drain=False):
         """
         Stop accepting the connections and close the listening socket.
 
@@ -345,13 +593,95 @@ class BaseServer(object):
         If the server does not use a pool, then this merely stops accepting connections;
         any spawned greenlets that are handling requests continue running until
         they naturally complete.
+
+        If *drain* is true, :attr:`draining` is set and
+        :meth:`close_idle` closes the connections that are waiting
+        for another request, so that only the requests in progress
+        are waited for. Servers that keep track of their handlers
+        (like :class:`gevent.pywsgi.WSGIServer`) wait for them up to
+        *timeout* even without a pool. Together with
+        :meth:`send_listener`, this lets a replacement process take
+        over without refusing or dropping any connection.
+
+        .. versionchanged:: 1.3a1
+           Add the *drain* argument.
         """
+        if drain:
+            self.draining = True
         self.close()
         if timeout is None:
             timeout = self.stop_timeout
+        if drain:
+            self.close_idle()
         if self.pool:
             self.pool.join(timeout=timeout)
             self.pool.kill(block=True, timeout=1)
+        elif drain:
+            self._wait_for_handlers(timeout)
+
+    def close_idle(self):
+        """
+        Close the connections that are open between requests. Called
+        by :meth:`stop` when draining. This class doesn't know what a
+        request is, so it does nothing; subclasses that do override it.
+
+        .. versionadded:: 1.3a1
+        """
+
+    def _wait_for_handlers(self, timeout):
+        # Wait up to *timeout* for the handlers to return, if the
+        # server tracks them outside of a pool.
+        pass
+
+    def send_listener(self, sock):
+        """
+        Send the listening socket over the connected ``AF_UNIX``
+        socket *sock* (as ancillary ``SCM_RIGHTS`` data), for the
+        process at the other end to get with :meth:`receive_listener`.
+
+        The listening socket is shared, not moved: both processes
+        accept connections from it until this one is stopped, so no
+        connection is refused while one server replaces the other::
+
+            # In the old process
+            server.send_listener(unix_sock)
+            server.stop(timeout=30, drain=True)
+
+            # In the new process
+            listener = WSGIServer.receive_listener(unix_sock)
+            WSGIServer(listener, application).serve_forever()
+
+        .. versionadded:: 1.3a1
+        """
+        listener = self.socket
+        header = _HANDOFF_HEADER.pack(listener.family,
+                                      listener.getsockopt(_socket.SOL_SOCKET, _socket.SO_TYPE))
+        _send_fd(sock, header, listener.fileno())
+
+    @staticmethod
+    def receive_listener(sock):
+        """
+        Receive a listening socket sent with :meth:`send_listener`
+        over the ``AF_UNIX`` socket *sock*, and return it as a
+        :class:`gevent.socket.socket` that can be passed as the
+        *listener* of a new server.
+
+        :raises ValueError: If the other end closed *sock* or sent
+            something else.
+
+        .. versionadded:: 1.3a1
+        """
+        from gevent.socket import fromfd
+        header, fd = _recv_fd(sock, _HANDOFF_HEADER.size)
+        if fd is None or len(header) != _HANDOFF_HEADER.size:
+            if fd is not None:
+                os.close(fd)
+            raise ValueError('Expected a listening socket, received %r' % (header, ))
+        family, kind = _HANDOFF_HEADER.unpack(header)
+        try:
+            return fromfd(fd, family, kind)
+        finally:
+            os.close(fd)
 
     def serve_forever(self, stop_timeout=None):
         """Start the server if it hasn't been already started and wait until it's stopped."""
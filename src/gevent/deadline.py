@@ -0,0 +1,170 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Deadlines that follow a unit of work across greenlets.
+
+A :class:`Timeout` interrupts the one greenlet that started it. A
+:class:`Deadline` instead belongs to the work being done: while the
+``with`` block runs, the current greenlet and every greenlet it
+spawns (with :func:`gevent.spawn`, :meth:`gevent.pool.Pool.spawn` and
+the like) carry the deadline, and the blocking operations they perform
+give up with :exc:`DeadlineExceeded` once it has passed::
+
+    from gevent.deadline import Deadline
+
+    def handle(request):
+        with Deadline(2.0):
+            # Both of these, and anything they spawn, share
+            # the same two seconds.
+            user = pool.spawn(load_user, request)
+            items = fetch_items(request)
+            return render(user.get(), items)
+
+The deadline is honored by waiting on sockets (and anything else that
+uses :meth:`gevent.hub.Hub.wait`, such as :func:`gevent.sleep`), by
+:meth:`gevent.queue.Queue.get`, and by :meth:`gevent.event.Event.wait`
+and :meth:`gevent.event.AsyncResult.get`. An operation that would block
+after the deadline has passed fails immediately, so work for a caller
+that has already given up doesn't go on consuming capacity. Code that
+runs for a long time without blocking can call
+:func:`check_deadline`.
+
+Deadlines nest: inside the ``with`` block of another deadline, the
+earlier of the two applies.
+
+.. versionadded:: 1.3a1
+"""
+from __future__ import absolute_import
+
+from timeit import default_timer
+
+from greenlet import getcurrent
+
+__all__ = [
+    'Deadline',
+    'DeadlineExceeded',
+    'check_deadline',
+    'current_deadline',
+]
+
+# The attribute of a greenlet that holds its deadline. Greenlets that
+# have never had one don't have the attribute.
+_ATTR = '_gevent_deadline'
+
+
+class DeadlineExceeded(BaseException):
+    """
+    Raised by blocking operations performed after the current
+    :class:`Deadline` has passed.
+
+    Like :class:`gevent.Timeout`, this derives from
+    :exc:`BaseException` so that ``except Exception`` blocks don't
+    catch it by accident.
+    """
+
+    def __init__(self, deadline=None):
+        BaseException.__init__(self, deadline)
+        #: The :class:`Deadline` that passed.
+        self.deadline = deadline
+
+    def __str__(self):
+        if self.deadline is None:
+            return 'deadline exceeded'
+        return 'deadline of %s seconds exceeded' % (self.deadline.seconds,)
+
+
+class Deadline(object):
+    """
+    Deadline(seconds, exception=None)
+
+    A point in time *seconds* from now, applied to the current
+    greenlet and the greenlets it spawns while used as a context
+    manager.
+
+    :keyword exception: What to raise when the deadline has passed,
+        either an exception class or instance. The default is a new
+        :exc:`DeadlineExceeded`.
+
+    An instance may only be entered in one greenlet at a time; the
+    greenlets spawned inside the block pick it up automatically.
+    """
+
+    def __init__(self, seconds, exception=None):
+        self.seconds = seconds
+        self.exception = exception
+        #: The value of :func:`timeit.default_timer` at which the
+        #: deadline passes.
+        self.expires = default_timer() + seconds
+        self._greenlet = None
+        self._outer = None
+
+    def remaining(self):
+        """
+        Return the number of seconds left, which is 0 once the deadline
+        has passed.
+        """
+        return max(0.0, self.expires - default_timer())
+
+    @property
+    def expired(self):
+        return default_timer() >= self.expires
+
+    def _exception(self):
+        exception = self.exception
+        return exception if exception is not None else DeadlineExceeded(self)
+
+    def _start_timer(self):
+        # Raise now if we've passed, otherwise return a started Timeout
+        # that will raise when we do.
+        from gevent.timeout import Timeout
+        remaining = self.expires - default_timer()
+        if remaining <= 0:
+            raise self._exception()
+        return Timeout.start_new(remaining, self._exception())
+
+    def __enter__(self):
+        if self._greenlet is not None:
+            raise AssertionError("Deadline already entered", self)
+        current = getcurrent()
+        outer = getattr(current, _ATTR, None)
+        self._greenlet = current
+        self._outer = outer
+        if outer is None or outer.expires > self.expires:
+            setattr(current, _ATTR, self)
+        return self
+
+    def __exit__(self, typ, value, tb):
+        current = self._greenlet
+        self._greenlet = None
+        setattr(current, _ATTR, self._outer)
+        self._outer = None
+
+    def __repr__(self):
+        return '<%s at 0x%x seconds=%s remaining=%.3f>' % (
+            self.__class__.__name__, id(self), self.seconds, self.remaining())
+
+
+def current_deadline():
+    """
+    Return the :class:`Deadline` that applies to the current greenlet,
+    or None.
+    """
+    return getattr(getcurrent(), _ATTR, None)
+
+
+def check_deadline():
+    """
+    Raise the current deadline's exception if it has passed.
+    """
+    deadline = getattr(getcurrent(), _ATTR, None)
+    if deadline is not None and deadline.expired:
+        raise deadline._exception()
+
+
+def _start_timer():
+    # For the blocking operations that honor deadlines: return None if
+    # the current greenlet has no deadline, raise if it has passed, and
+    # otherwise return a started Timeout for the caller to cancel.
+    deadline = getattr(getcurrent(), _ATTR, None)
+    if deadline is None:
+        return None
+    return deadline._start_timer()
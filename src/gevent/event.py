@@ -6,6 +6,7 @@ from gevent.hub import get_hub, getcurrent, _NONE
 from gevent._compat import reraise
 from gevent.hub import InvalidSwitchError
 from gevent.timeout import Timeout
+from gevent.deadline import _start_timer as _start_deadline_timer
 from gevent._tblib import dump_traceback, load_traceback
 
 __all__ = ['Event', 'AsyncResult']
@@ -97,6 +98,8 @@ class _AbstractLinkable(object):
         # switching and linking. If *catch* is set to (),
         # a timeout that elapses will be allowed to be raised.
         # Returns a true value if the wait succeeded without timing out.
+        # The current deadline, if any, is raised whatever *catch* is.
+        deadline = _start_deadline_timer()
         switch = getcurrent().switch
         self.rawlink(switch)
         try:
@@ -117,6 +120,8 @@ class _AbstractLinkable(object):
                 timer.cancel()
         finally:
             self.unlink(switch)
+            if deadline is not None:
+                deadline.cancel()
 
     def _wait_return_value(self, waited, wait_success):
         # pylint:disable=unused-argument
@@ -215,6 +220,9 @@ class Event(_AbstractLinkable):
             are waiting. When the waiters wake up, this will return True; previously,
             they would still wake up, but the return value would be False. This is most
             noticeable when the *timeout* is present.
+
+        .. versionchanged:: 1.3a1
+           Honors the current :class:`gevent.deadline.Deadline`.
         """
         return self._wait(timeout)
 
@@ -368,6 +376,10 @@ class AsyncResult(_AbstractLinkable):
 
         :keyword bool block: If set to ``False`` and this instance is not ready,
             immediately raise a :class:`Timeout` exception.
+
+        .. versionchanged:: 1.3a1
+           Raises :exc:`gevent.deadline.DeadlineExceeded` instead of
+           blocking past the current :class:`gevent.deadline.Deadline`.
         """
         if self._value is not _NONE:
             return self._value
@@ -417,6 +429,9 @@ class AsyncResult(_AbstractLinkable):
         .. note:: If a timeout is given and expires, ``None`` will be returned
             (no timeout exception will be raised).
 
+        .. versionchanged:: 1.3a1
+           Honors the current :class:`gevent.deadline.Deadline`, like
+           :meth:`get`.
         """
         return self._wait(timeout)
 
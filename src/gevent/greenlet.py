@@ -8,6 +8,8 @@ from gevent._compat import reraise
 from gevent._util import Lazy
 from gevent._tblib import dump_traceback
 from gevent._tblib import load_traceback
+from gevent._tracer import get_stats as get_run_stats
+from gevent.deadline import _ATTR as _DEADLINE_ATTR
 from gevent.hub import GreenletExit
 from gevent.hub import InvalidSwitchError
 from gevent.hub import Waiter
@@ -119,6 +121,9 @@ class Greenlet(greenlet):
             The ``run`` argument to the constructor is now verified to be a callable
             object. Previously, passing a non-callable object would fail after the greenlet
             was spawned.
+        .. versionchanged:: 1.3a1
+            The new greenlet inherits the :class:`~gevent.deadline.Deadline` of
+            the greenlet that creates it.
         """
         # greenlet.greenlet(run=None, parent=None)
         # Calling it with both positional arguments instead of a keyword
@@ -144,6 +149,10 @@ class Greenlet(greenlet):
         if kwargs:
             self._kwargs = kwargs
 
+        deadline = getattr(getcurrent(), _DEADLINE_ATTR, None)
+        if deadline is not None:
+            setattr(self, _DEADLINE_ATTR, deadline)
+
     @property
     def kwargs(self):
         return self._kwargs or {}
@@ -300,6 +309,19 @@ class Greenlet(greenlet):
         self._formatted_info = result
         return result
 
+    @property
+    def run_stats(self):
+        """
+        The :class:`gevent._tracer.GreenletStats` (run time, switch
+        count and last run time) recorded for this greenlet, or
+        ``None`` if it has not run while greenlet tracing was enabled.
+
+        .. seealso:: :meth:`gevent.hub.Hub.start_greenlet_tracing`
+
+        .. versionadded:: 1.3a1
+        """
+        return get_run_stats(self)
+
     @property
     def exception(self):
         """Holds the exception instance raised by the function if the greenlet has finished with an error.
@@ -30,6 +30,7 @@ from gevent._compat import string_types
 from gevent._compat import xrange
 from gevent._util import _NONE
 from gevent._util import readproperty
+from gevent.deadline import _start_timer as _start_deadline_timer
 
 if sys.version_info[0] <= 2:
     import thread # pylint:disable=import-error
@@ -166,7 +167,7 @@ def sleep(seconds=0, ref=True):
         loop.run_callback(waiter.switch)
         waiter.get()
     else:
-        hub.wait(loop.timer(seconds, ref=ref))
+        hub.wait(hub.timer(seconds, ref=ref))
 
 
 def idle(priority=0):
@@ -336,6 +337,9 @@ def reinit():
         # resolver_ares also has a fork watcher that's not firing
         if hasattr(hub.resolver, '_on_fork'):
             hub.resolver._on_fork()
+        # likewise the blocking monitor's native thread
+        if hub.blocking_monitor is not None:
+            hub.blocking_monitor._on_fork()
 
         # TODO: We'd like to sleep for a non-zero amount of time to force the loop to make a
         # pass around before returning to this greenlet. That will allow any
@@ -433,6 +437,27 @@ def config(default, envvar):
     return result
 
 
+def float_config(default, envvar):
+    result = os.environ.get(envvar)
+    if not result:
+        return default
+    return float(result)
+
+
+def int_config(default, envvar):
+    result = os.environ.get(envvar)
+    if not result:
+        return default
+    return int(result)
+
+
+def bool_config(default, envvar):
+    result = os.environ.get(envvar)
+    if result is None:
+        return default
+    return result.lower() not in ('', '0', 'false', 'off', 'no')
+
+
 def resolver_config(default, envvar):
     result = config(default, envvar)
     return [_resolvers.get(x, x) for x in result]
@@ -493,6 +518,102 @@ class Hub(RawGreenlet):
     backend = config(None, 'GEVENT_BACKEND')
     threadpool_size = 10
 
+    #: The class or callable object, or the name of a factory function
+    #: or class, that will be used to create :attr:`buffer_pool`.
+    #:
+    #: .. versionadded:: 1.3a1
+    buffer_pool_class = config('gevent.socketreader.BufferPool', 'GEVENT_BUFFER_POOL')
+
+    #: If this is a number of seconds, :meth:`run` automatically calls
+    #: :meth:`start_blocking_monitor` with it as the threshold. Configured by
+    #: the ``GEVENT_MAX_BLOCKING_TIME`` environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    max_blocking_time = float_config(None, 'GEVENT_MAX_BLOCKING_TIME')
+
+    #: The :class:`gevent._monitor.BlockingMonitor` watching this hub,
+    #: if one has been started.
+    #:
+    #: .. versionadded:: 1.3a1
+    blocking_monitor = None
+
+    #: If true, :meth:`run` automatically calls
+    #: :meth:`start_greenlet_tracing`. Configured by the
+    #: ``GEVENT_TRACE_GREENLETS`` environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    trace_greenlets = bool_config(False, 'GEVENT_TRACE_GREENLETS')
+
+    #: The :class:`gevent._tracer.GreenletTracer` accounting for the
+    #: greenlets of this hub's thread, if one has been started.
+    #:
+    #: .. versionadded:: 1.3a1
+    greenlet_tracer = None
+
+    #: If not ``None``, assigned to the ``callback_time_budget`` of
+    #: the loop: the number of seconds the loop may spend running
+    #: callbacks (such as those that start greenlets) in one iteration
+    #: before polling for I/O. Configured by the
+    #: ``GEVENT_CALLBACK_TIME_BUDGET`` environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    callback_time_budget = float_config(None, 'GEVENT_CALLBACK_TIME_BUDGET')
+
+    #: If not ``None``, assigned to the ``callback_count_limit`` of
+    #: the loop: the most callbacks it runs in one iteration.
+    #: Configured by the ``GEVENT_CALLBACK_COUNT_LIMIT`` environment
+    #: variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    callback_count_limit = int_config(None, 'GEVENT_CALLBACK_COUNT_LIMIT')
+
+    #: If set to a number of seconds, :class:`gevent.Timeout`,
+    #: :func:`gevent.sleep` and socket timeouts are kept in a single
+    #: :attr:`timer_wheel` with this resolution instead of each using
+    #: its own loop timer. This makes starting and cancelling them
+    #: much cheaper when there are very many, but they may fire up to
+    #: *timer_resolution* seconds late. Configured by the
+    #: ``GEVENT_TIMER_RESOLUTION`` environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    timer_resolution = float_config(None, 'GEVENT_TIMER_RESOLUTION')
+
+    #: The :class:`gevent._timingwheel.TimingWheel` used by :meth:`timer`,
+    #: if :attr:`timer_resolution` is set.
+    #:
+    #: .. versionadded:: 1.3a1
+    timer_wheel = None
+
+    #: If true, :meth:`run` calls :meth:`start_idle_gc` in the main
+    #: thread's hub. Configured by the ``GEVENT_IDLE_GC`` environment
+    #: variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    idle_gc = bool_config(False, 'GEVENT_IDLE_GC')
+
+    #: The most seconds a full garbage collection is put off waiting
+    #: for the loop to be idle. Configured by the
+    #: ``GEVENT_IDLE_GC_MAX_DEFERRAL`` environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    idle_gc_max_deferral = float_config(5.0, 'GEVENT_IDLE_GC_MAX_DEFERRAL')
+
+    #: The :class:`gevent._gcscheduler.IdleCollector` started by
+    #: :meth:`start_idle_gc`, if any.
+    #:
+    #: .. versionadded:: 1.3a1
+    idle_collector = None
+
+    #: If set to a number of seconds, :func:`gevent.socket.create_connection`
+    #: connects to hosts with more than one address as described in
+    #: :rfc:`8305` ("Happy Eyeballs"), starting a new attempt in
+    #: parallel each time the previous one has gone on this long (0.25
+    #: is recommended). Configured by the ``GEVENT_HAPPY_EYEBALLS_DELAY``
+    #: environment variable.
+    #:
+    #: .. versionadded:: 1.3a1
+    happy_eyeballs_delay = float_config(None, 'GEVENT_HAPPY_EYEBALLS_DELAY')
+
     # using pprint.pformat can override custom __repr__ methods on dict/list
     # subclasses, which can be a security concern
     format_context = 'pprint.saferepr'
@@ -516,8 +637,19 @@ class Hub(RawGreenlet):
             if loop is None:
                 loop = self.backend
             self.loop = loop_class(flags=loop, default=default)
+        if self.callback_time_budget is not None:
+            self.loop.callback_time_budget = self.callback_time_budget
+        if self.callback_count_limit is not None:
+            self.loop.callback_count_limit = self.callback_count_limit
+        if self.timer_resolution:
+            from gevent._timingwheel import TimingWheel
+            self.timer_wheel = TimingWheel(self.loop, self.timer_resolution)
+        # {priority: TimingWheel} for the timers with another priority
+        # than the timer_wheel's.
+        self._timer_wheels = {}
         self._resolver = None
         self._threadpool = None
+        self._buffer_pool = None
         self.format_context = _import(self.format_context)
 
     def __repr__(self):
@@ -643,7 +775,11 @@ class Hub(RawGreenlet):
             :class:`gevent.core.check`, :class:`gevent.core.fork`, :class:`gevent.core.async`,
             :class:`gevent.core.child`, :class:`gevent.core.stat`
 
+        .. versionchanged:: 1.3a1
+           Raises :exc:`gevent.deadline.DeadlineExceeded` if the
+           current :class:`gevent.deadline.Deadline` passes.
         """
+        deadline = _start_deadline_timer()
         waiter = Waiter()
         unique = object()
         watcher.start(waiter.switch, unique)
@@ -653,6 +789,31 @@ class Hub(RawGreenlet):
                 raise InvalidSwitchError('Invalid switch into %s: %r (expected %r)' % (getcurrent(), result, unique))
         finally:
             watcher.stop()
+            if deadline is not None:
+                deadline.cancel()
+
+    def timer(self, seconds, ref=True, priority=None):
+        """
+        Return a new, unstarted, one-shot timer for *seconds*, for use
+        with :meth:`wait` or as the timer of a :class:`gevent.Timeout`.
+
+        This is :attr:`timer_wheel` if one is in use, otherwise the
+        loop. Timers with a *priority* that isn't the wheel's are kept
+        in another wheel with the same resolution, created as needed,
+        whose loop timer has that priority.
+
+        .. versionadded:: 1.3a1
+        """
+        wheel = self.timer_wheel
+        if wheel is None:
+            return self.loop.timer(seconds, ref=ref, priority=priority)
+        if priority != wheel.priority:
+            wheel = self._timer_wheels.get(priority)
+            if wheel is None:
+                from gevent._timingwheel import TimingWheel
+                wheel = TimingWheel(self.loop, self.timer_wheel.resolution, priority=priority)
+                self._timer_wheels[priority] = wheel
+        return wheel.timer(seconds, ref=ref)
 
     def cancel_wait(self, watcher, error):
         """
@@ -681,6 +842,12 @@ class Hub(RawGreenlet):
            programming error.
         """
         assert self is getcurrent(), 'Do not call Hub.run() directly'
+        if self.max_blocking_time and self.blocking_monitor is None:
+            self.start_blocking_monitor(self.max_blocking_time)
+        if self.trace_greenlets and self.greenlet_tracer is None:
+            self.start_greenlet_tracing()
+        if self.idle_gc and self.idle_collector is None and get_ident() == MAIN_THREAD:
+            self.start_idle_gc()
         while True:
             loop = self.loop
             loop.error_handler = self
@@ -697,6 +864,129 @@ class Hub(RawGreenlet):
         # It is still possible to kill this greenlet with throw. However, in that case
         # switching to it is no longer safe, as switch will return immediately
 
+    def start_blocking_monitor(self, threshold=None, report=None):
+        """
+        Start watching for greenlets that keep this hub from running
+        its event loop, and keep a histogram of the time each loop
+        iteration spends running Python code.
+
+        A native thread checks on the loop periodically. When the
+        loop has been busy in the same iteration for more than
+        *threshold* seconds (default :attr:`max_blocking_time`, or 0.1),
+        *report* is called with the running greenlet, the number of
+        seconds it has been blocking, and its formatted stack. The
+        default reporter writes to :attr:`exception_stream`.
+
+        This must be called from the thread that runs this hub. If a
+        monitor is already running, it is returned unchanged. A
+        :exc:`TypeError` is raised if the loop doesn't support
+        monitoring; the libev and libuv loops do.
+
+        :return: The :class:`gevent._monitor.BlockingMonitor`; its
+           ``histogram`` attribute can be read at any time.
+
+        .. versionadded:: 1.3a1
+        """
+        if self.blocking_monitor is None:
+            from gevent._monitor import BlockingMonitor
+            monitor = BlockingMonitor(self,
+                                      threshold or self.max_blocking_time or 0.1,
+                                      report)
+            monitor.start()
+            self.blocking_monitor = monitor
+        return self.blocking_monitor
+
+    def stop_blocking_monitor(self):
+        """
+        Stop the monitor started by :meth:`start_blocking_monitor`, if any.
+
+        .. versionadded:: 1.3a1
+        """
+        monitor = self.blocking_monitor
+        if monitor is not None:
+            self.blocking_monitor = None
+            monitor.stop()
+
+    def start_idle_gc(self, threshold=None, max_deferral=None):
+        """
+        Stop the interpreter from running full (oldest generation)
+        garbage collections at arbitrary points, such as in the
+        middle of handling a request, and run them when this hub's
+        loop has no I/O events or callbacks waiting instead.
+
+        A collection becomes due when the interpreter has collected
+        the middle generation *threshold* times (default, the
+        interpreter's threshold for the oldest generation). It is
+        never put off for more than *max_deferral* seconds (default
+        :attr:`idle_gc_max_deferral`).
+
+        Garbage collection settings are global, so this should only
+        be used in the main thread's hub. :meth:`stop_idle_gc`
+        restores the interpreter's settings. If the collector is
+        already running, it is returned unchanged. The libuv loop
+        can't tell when it is idle, so a :exc:`TypeError` is raised
+        with it.
+
+        :return: The :class:`gevent._gcscheduler.IdleCollector`; its
+           ``histogram`` attribute records the pause caused by each
+           collection.
+
+        .. versionadded:: 1.3a1
+        """
+        if self.idle_collector is None:
+            from gevent._gcscheduler import IdleCollector
+            collector = IdleCollector(self, threshold,
+                                      max_deferral if max_deferral is not None else self.idle_gc_max_deferral)
+            collector.start()
+            self.idle_collector = collector
+        return self.idle_collector
+
+    def stop_idle_gc(self):
+        """
+        Stop the collector started by :meth:`start_idle_gc`, if any,
+        and give garbage collection back to the interpreter.
+
+        .. versionadded:: 1.3a1
+        """
+        collector = self.idle_collector
+        if collector is not None:
+            self.idle_collector = None
+            collector.stop()
+
+    def start_greenlet_tracing(self):
+        """
+        Start recording, for every greenlet in this hub's thread, the
+        time it spends running, the number of times it is switched
+        into, and when it last ran.
+
+        The numbers for a single greenlet are available from
+        :attr:`gevent.Greenlet.run_stats`; the greenlets that have
+        run the longest are returned by the ``top(n)`` method of the
+        returned :class:`gevent._tracer.GreenletTracer`.
+
+        This must be called from the thread that runs this hub. If
+        tracing is already enabled, the existing tracer is returned.
+
+        .. versionadded:: 1.3a1
+        """
+        if self.greenlet_tracer is None:
+            from gevent._tracer import GreenletTracer
+            tracer = GreenletTracer()
+            tracer.start()
+            self.greenlet_tracer = tracer
+        return self.greenlet_tracer
+
+    def stop_greenlet_tracing(self):
+        """
+        Stop the tracing started by :meth:`start_greenlet_tracing`, if any.
+
+        .. versionadded:: 1.3a1
+        """
+        tracer = self.greenlet_tracer
+        if tracer is not None:
+            self.greenlet_tracer = None
+            tracer.stop()
+
     def join(self, timeout=None):
         """Wait for the event loop to finish. Exits only when there are
         no more spawned greenlets, started servers, active timeouts or watchers.
@@ -727,12 +1017,24 @@ class Hub(RawGreenlet):
         return False
 
     def destroy(self, destroy_loop=None):
+        self.stop_blocking_monitor()
+        self.stop_greenlet_tracing()
+        self.stop_idle_gc()
+        if self.timer_wheel is not None:
+            self.timer_wheel.close()
+            self.timer_wheel = None
+        for wheel in self._timer_wheels.values():
+            wheel.close()
+        self._timer_wheels.clear()
         if self._resolver is not None:
             self._resolver.close()
             del self._resolver
         if self._threadpool is not None:
             self._threadpool.kill()
             del self._threadpool
+        if self._buffer_pool is not None:
+            self._buffer_pool.clear()
+            del self._buffer_pool
         if destroy_loop is None:
             destroy_loop = not self.loop.default
         if destroy_loop:
@@ -779,6 +1081,26 @@ class Hub(RawGreenlet):
 
     threadpool = property(_get_threadpool, _set_threadpool, _del_threadpool)
 
+    def _get_buffer_pool(self):
+        if self._buffer_pool is None:
+            if self.buffer_pool_class is not None:
+                self.buffer_pool_class = _import(self.buffer_pool_class)
+                self._buffer_pool = self.buffer_pool_class()
+        return self._buffer_pool
+
+    def _set_buffer_pool(self, value):
+        self._buffer_pool = value
+
+    def _del_buffer_pool(self):
+        del self._buffer_pool
+
+    #: The :class:`gevent.socketreader.BufferPool` shared by the
+    #: :class:`gevent.socketreader.SocketReader` objects of this hub,
+    #: created when first used.
+    #:
+    #: .. versionadded:: 1.3a1
+    buffer_pool = property(_get_buffer_pool, _set_buffer_pool, _del_buffer_pool)
+
 
 class Waiter(object):
     """
@@ -211,6 +211,25 @@ static void gevent_run_callbacks(struct ev_loop *_loop, void *watcher, int reven
     GIL_RELEASE;
 }
 
+static void gevent_run_check(struct ev_loop *_loop, void *watcher, int revents) {
+    struct PyGeventLoopObject* loop;
+    PyObject *result;
+    GIL_DECLARE;
+    GIL_ENSURE;
+    loop = GET_OBJECT(PyGeventLoopObject, watcher, _check);
+    Py_INCREF(loop);
+    result = ((_GEVENTLOOP *)loop->__pyx_vtab)->_run_check(loop);
+    if (result) {
+        Py_DECREF(result);
+    }
+    else {
+        PyErr_Print();
+        PyErr_Clear();
+    }
+    Py_DECREF(loop);
+    GIL_RELEASE;
+}
+
 #if defined(_WIN32)
 
 static void gevent_periodic_signal_check(struct ev_loop *_loop, void *watcher, int revents) {
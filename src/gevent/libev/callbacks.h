@@ -31,6 +31,7 @@ DEFINE_CALLBACKS
 
 
 static void gevent_run_callbacks(struct ev_loop *, void *, int);
+static void gevent_run_check(struct ev_loop *, void *, int);
 struct PyGeventLoopObject;
 static void gevent_handle_error(struct PyGeventLoopObject* loop, PyObject* context);
 struct PyGeventCallbackObject;
@@ -241,6 +241,8 @@ class loop(AbstractLoop):
 
     def _init_and_start_check(self):
         libev.ev_check_init(self._check, self._check_callback_ffi)
+        # First after polling, for the benefit of _set_monitor.
+        libev.ev_set_priority(self._check, libev.EV_MAXPRI)
         libev.ev_check_start(self._ptr, self._check)
         self.unref()
 
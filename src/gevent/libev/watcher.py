@@ -58,6 +58,7 @@ class watcher(_base.watcher):
     _FFI = ffi
     _LIB = libev
     _watcher_prefix = 'ev'
+    _watcher_recyclable = True
 
     # Flags is a bitfield with the following meaning:
     # 0000 -> default, referenced (when active)
@@ -73,6 +74,11 @@ class watcher(_base.watcher):
 
         super(watcher, self).__init__(_loop, ref=ref, priority=priority, args=args)
 
+    @classmethod
+    def _watcher_ffi_can_recycle(cls, ffi_watcher):
+        # libev must be done with it.
+        return not libev.ev_is_active(ffi_watcher) and not libev.ev_is_pending(ffi_watcher)
+
     def _watcher_ffi_set_priority(self, priority):
         libev.ev_set_priority(self._watcher, priority)
 
@@ -147,6 +153,11 @@ class io(_base.IoMixin, watcher):
 
     EVENT_MASK = libev.EV__IOFDSET | libev.EV_READ | libev.EV_WRITE
 
+    # These live as long as the socket they watch, so there's little
+    # to gain, and a closed one must not hand its structure to the
+    # next watcher of the same fd (see test__core_watcher).
+    _watcher_recyclable = False
+
     def _get_fd(self):
         return vfd_get(self._watcher.fd)
 
@@ -149,7 +149,11 @@ class loop(AbstractLoop):
         libuv.uv_timer_stop(self._timer0)
 
     def _start_callback_timer(self):
-        libuv.uv_timer_start(self._timer0, libuv.gevent_noop, 0, 0)
+        # Repeating, so that it keeps the loop alive until
+        # _run_callbacks stops it; a one-shot timer can expire
+        # at the end of a UV_RUN_ONCE iteration with callbacks
+        # still queued.
+        libuv.uv_timer_start(self._timer0, libuv.gevent_noop, 0, 1)
 
     def _stop_aux_watchers(self):
         libuv.uv_prepare_stop(self._prepare)
@@ -12,8 +12,13 @@ The :class:`Pool` class, which is a subclass of :class:`Group`,
 provides a way to limit concurrency: its :meth:`spawn <Pool.spawn>`
 method blocks if the number of greenlets in the pool has already
 reached the limit, until there is a free slot.
-"""
 
+The :class:`WorkerPool` class offers the same mapping API as
+:class:`Pool` but runs each task in one of a fixed set of long-lived
+worker greenlets instead of a new greenlet, which is cheaper when there
+are many short tasks.
+"""
+import sys
 from bisect import insort_right
 try:
     from itertools import izip
@@ -21,14 +26,17 @@ except ImportError:
     # Python 3
     izip = zip
 
-from gevent.hub import GreenletExit, getcurrent, kill as _kill
+from gevent.hub import GreenletExit, getcurrent, get_hub, kill as _kill
+from gevent.deadline import _ATTR as _DEADLINE_ATTR
 from gevent.greenlet import joinall, Greenlet
+from gevent.greenlet import SpawnedLink, SuccessSpawnedLink, FailureSpawnedLink
 from gevent.queue import Full as QueueFull
+from gevent.queue import Queue
 from gevent.timeout import Timeout
-from gevent.event import Event
+from gevent.event import AsyncResult, Event
 from gevent.lock import Semaphore, DummySemaphore
 
-__all__ = ['Group', 'Pool', 'PoolFull']
+__all__ = ['Group', 'Pool', 'PoolFull', 'WorkerPool']
 
 
 class IMapUnordered(Greenlet):
@@ -784,6 +792,274 @@ class Pool(Group):
         self._semaphore.release()
 
 
+class TaskResult(AsyncResult):
+    """
+    The result of a task submitted to a :class:`WorkerPool`.
+
+    In addition to the :class:`~gevent.event.AsyncResult` API, this has
+    the :meth:`link` family of methods of :class:`~gevent.Greenlet`, so
+    it can be used wherever a pool's greenlet would be.
+
+    .. versionadded:: 1.3a1
+    """
+
+    def link(self, callback, SpawnedLink=SpawnedLink):
+        """
+        Arrange for *callback* to be called with this object, in a new
+        greenlet, once the task has finished.
+        """
+        # pylint:disable=redefined-outer-name
+        self.rawlink(SpawnedLink(callback))
+
+    def link_value(self, callback, SpawnedLink=SuccessSpawnedLink):
+        """
+        Like :meth:`link` but *callback* is only notified when the task
+        returned a value.
+        """
+        # pylint:disable=redefined-outer-name
+        self.link(callback, SpawnedLink=SpawnedLink)
+
+    def link_exception(self, callback, SpawnedLink=FailureSpawnedLink):
+        """
+        Like :meth:`link` but *callback* is only notified when the task
+        raised an exception.
+        """
+        # pylint:disable=redefined-outer-name
+        self.link(callback, SpawnedLink=SpawnedLink)
+
+
+def _finish_unrun(result, exception):
+    # Resolve the result of a task that was cancelled before it ran
+    # the same way a greenlet killed before it started is.
+    if isinstance(exception, type):
+        exception = exception()
+    if isinstance(exception, GreenletExit):
+        result.set(exception)
+    else:
+        result.set_exception(exception)
+
+
+class WorkerPool(GroupMappingMixin):
+    """
+    Run tasks in a bounded set of reusable worker greenlets.
+
+    :meth:`spawn` puts the task on an internal queue and returns a
+    :class:`TaskResult`; up to *size* worker greenlets take tasks from
+    the queue and run them one after another. Workers are started as
+    they are needed and then kept waiting for more work, so a task
+    doesn't pay for creating, starting and linking a greenlet of its
+    own. The mapping methods it shares with :class:`Pool` (:meth:`apply`,
+    :meth:`apply_async`, :meth:`map`, :meth:`imap`,
+    :meth:`imap_unordered` and so on) work as they do there.
+
+    Like :class:`Pool`, at most *size* tasks are outstanding at a
+    time, and :meth:`spawn` blocks while the pool is full. A *size*
+    of ``None`` places no limit on the number of tasks or workers.
+
+    The differences from :class:`Pool` are that tasks are not
+    greenlets (so ``getcurrent()`` inside a task is the worker, which
+    has run earlier tasks and will run later ones), that the pool
+    tracks tasks rather than greenlets, and that exceptions raised by
+    a task are reported to the hub but don't end its worker.
+
+    .. versionadded:: 1.3a1
+    """
+
+    #: The type of Greenlet object we start for each worker.
+    greenlet_class = Greenlet
+
+    def __init__(self, size=None):
+        if size is not None and size < 0:
+            raise ValueError('size must not be negative: %r' % (size, ))
+        self.size = size
+        self._semaphore = Semaphore(size) if size is not None else DummySemaphore()
+        self._tasks = Queue()
+        #: The set of running worker greenlets.
+        self.workers = set()
+        self._dying = set()
+        # The number of workers blocked waiting for a task.
+        self._idle = 0
+        # The number of tasks queued or running.
+        self._count = 0
+        self._empty_event = Event()
+        self._empty_event.set()
+
+    def __repr__(self):
+        return '<%s at 0x%x size=%s tasks=%d workers=%d>' % (
+            self.__class__.__name__, id(self), self.size, self._count, len(self.workers))
+
+    def __len__(self):
+        """
+        Answer how many tasks are queued or running.
+        """
+        return self._count
+
+    def spawn(self, func, *args, **kwargs):
+        """
+        Queue ``func(*args, **kwargs)`` to run in a worker, blocking
+        while the pool is full.
+
+        :return: A :class:`TaskResult`.
+        """
+        self._semaphore.acquire()
+        result = TaskResult()
+        tasks = self._tasks
+        # Like a spawned greenlet, the task inherits our deadline.
+        deadline = getattr(getcurrent(), _DEADLINE_ATTR, None)
+        try:
+            tasks.put((result, func, args, kwargs, deadline))
+        except:
+            self._semaphore.release()
+            raise
+        self._count += 1
+        self._empty_event.clear()
+        self._adjust()
+        return result
+
+    def _adjust(self):
+        # Start a worker if there are more tasks waiting than there are
+        # idle workers to take them.
+        if self._tasks.qsize() > self._idle and (self.size is None or len(self.workers) < self.size):
+            worker = self.greenlet_class(self._worker)
+            self.workers.add(worker)
+            worker.rawlink(self._discard_worker)
+            worker.start()
+
+    def _discard_worker(self, worker):
+        self.workers.discard(worker)
+        self._dying.discard(worker)
+        # A task may have ended its worker (by raising GreenletExit,
+        # for example); make sure somebody takes over the queue.
+        self._adjust()
+
+    def _task_done(self):
+        self._count -= 1
+        self._semaphore.release()
+        if not self._count:
+            self._empty_event.set()
+
+    def _worker(self):
+        tasks = self._tasks
+        worker = getcurrent()
+        while True:
+            # Whatever deadline the greenlet that started us had, it
+            # doesn't apply to waiting for work.
+            setattr(worker, _DEADLINE_ATTR, None)
+            self._idle += 1
+            try:
+                result, func, args, kwargs, deadline = tasks.get()
+                setattr(worker, _DEADLINE_ATTR, deadline)
+            finally:
+                self._idle -= 1
+            try:
+                self._run_task(result, func, args, kwargs)
+            finally:
+                result = func = args = kwargs = deadline = None
+                self._task_done()
+
+    def _run_task(self, result, func, args, kwargs):
+        try:
+            value = func(*args, **kwargs)
+        except GreenletExit as ex:
+            # As for a killed greenlet, this is the result; it also
+            # ends the worker.
+            result.set(ex)
+            raise
+        except: # pylint:disable=bare-except
+            exc_info = sys.exc_info()
+            result.set_exception(exc_info[1], exc_info)
+            if getcurrent() in self._dying:
+                # Killed with some other exception.
+                raise
+            try:
+                get_hub().handle_error((self, func), *exc_info)
+            finally:
+                exc_info = None
+        else:
+            result.set(value)
+
+    def join(self, timeout=None):
+        """
+        Wait for this pool to have no tasks queued or running *at
+        least once*.
+
+        :return bool: Whether the pool became empty before *timeout*
+            expired.
+        """
+        return self._empty_event.wait(timeout=timeout)
+
+    def kill(self, exception=GreenletExit, block=True, timeout=None):
+        """
+        Cancel the queued tasks and kill the workers (and thus the
+        tasks they are running) with *exception*.
+
+        The result of each affected task is resolved as a killed
+        greenlet's would be: with the exception instance as its value if
+        it is a :exc:`~gevent.GreenletExit`, otherwise with the
+        exception. The pool can be used again afterwards.
+        """
+        timer = Timeout._start_new_or_dummy(timeout)
+        try:
+            while self.workers or self._tasks.qsize():
+                self._cancel_queued(exception)
+                for worker in list(self.workers):
+                    if worker not in self._dying:
+                        self._dying.add(worker)
+                        worker.kill(exception, block=False)
+                if not block:
+                    break
+                joinall(list(self.workers))
+        except Timeout as ex:
+            if ex is not timer:
+                raise
+        finally:
+            timer.cancel()
+
+    def _cancel_queued(self, exception):
+        tasks = self._tasks
+        while tasks.qsize():
+            result = tasks.get_nowait()[0]
+            _finish_unrun(result, exception)
+            self._task_done()
+
+    def full(self):
+        """
+        Return a boolean indicating whether :meth:`spawn` would block.
+        """
+        return self.free_count() <= 0
+
+    def free_count(self):
+        """
+        Return how many more tasks can be submitted without blocking.
+        """
+        if self.size is None:
+            return 1
+        return max(0, self.size - self._count)
+
+    def wait_available(self, timeout=None):
+        """
+        Wait until it's possible to :meth:`spawn` a task without
+        blocking.
+
+        :return: A number indicating how many tasks can be submitted
+            without blocking.
+        """
+        return self._semaphore.wait(timeout=timeout)
+
+    # MappingMixin methods
+
+    def _apply_immediately(self):
+        # Calling apply() from one of our workers would deadlock a full
+        # pool, so run the function directly.
+        return getcurrent() in self.workers
+
+    def _apply_async_cb_spawn(self, callback, result):
+        Greenlet.spawn(callback, result)
+
+    def _apply_async_use_greenlet(self):
+        return self.full()
+
+
 class pass_value(object):
     __slots__ = ['callback']
 
@@ -0,0 +1,283 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Running a server in several forked worker processes.
+
+A single gevent process uses a single CPU core. :class:`Prefork`
+lets one service use all of them: the master process creates the
+server (and loads the application it serves), then forks a number
+of workers that each run the server's accept loop::
+
+    from gevent.pywsgi import WSGIServer
+    from gevent.prefork import Prefork
+
+    server = WSGIServer(('', 8080), application)
+    Prefork(server, workers=4).serve_forever()
+
+By default the workers share the listening socket created in the
+master. With ``reuse_port=True`` each worker instead binds its own
+listener with ``SO_REUSEPORT`` (Linux 3.9 and above) and the kernel
+balances new connections between them.
+
+The master restarts workers that die, and on ``SIGTERM`` or
+``SIGINT`` (or a call to :meth:`Prefork.stop`) asks every worker to
+stop accepting and finish its outstanding connections before
+exiting.
+
+Availability: POSIX.
+
+.. versionadded:: 1.3a1
+"""
+from __future__ import absolute_import, print_function
+
+import gc
+import os
+import signal as signalmodule
+import sys
+import traceback
+
+from gevent.event import Event
+from gevent.greenlet import Greenlet
+from gevent.hub import signal as hub_signal
+from gevent.pool import Pool
+from gevent.server import SO_REUSEPORT
+from gevent.server import _tcp_listener
+
+try:
+    from gevent.os import fork_and_watch
+except ImportError:
+    fork_and_watch = None
+
+__all__ = [
+    'Prefork',
+    'prepare_for_fork',
+]
+
+
+def _cpu_count():
+    try:
+        from multiprocessing import cpu_count
+        return cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+def prepare_for_fork():
+    """
+    Make the master's heap as friendly as possible to copy-on-write
+    before forking workers.
+
+    Garbage is collected first so that the workers don't each
+    inherit it and collect it separately. Where the interpreter
+    supports it (``gc.freeze``, Python 3.7), everything still alive is
+    then moved out of the collector's reach so that collections in
+    the workers don't write to (and thus copy) the pages holding the
+    objects the master created.
+    """
+    gc.collect()
+    freeze = getattr(gc, 'freeze', None)
+    if freeze is not None:
+        freeze()
+
+
+class Prefork(object):
+    """
+    Supervises worker processes running *server*.
+
+    :param server: A :class:`gevent.server.StreamServer` (or
+        subclass, such as :class:`gevent.pywsgi.WSGIServer`) that has
+        not been started.
+    :keyword int workers: How many worker processes to keep running.
+        Defaults to the number of CPUs.
+    :keyword bool reuse_port: If true, each worker binds its own
+        listening socket with ``SO_REUSEPORT`` instead of sharing
+        the one created by the master. The server must have been
+        given an address with a fixed port, not a socket.
+    :keyword callable post_fork: If given, called with the server in
+        each worker process right after it has been forked and before
+        it starts accepting. Use it to re-create anything (database
+        connections, random seeds) that must not be shared between
+        processes.
+    :keyword float stop_timeout: How long the workers have to finish
+        their connections when stopping (default
+        :attr:`~gevent.baseserver.BaseServer.stop_timeout`), and how
+        much longer the master waits before killing them.
+    """
+
+    #: Seconds to wait before replacing a worker that exited. This
+    #: keeps a worker that fails at startup from turning into a fork
+    #: loop.
+    restart_delay = 0.5
+
+    def __init__(self, server, workers=None, reuse_port=False, post_fork=None, stop_timeout=None):
+        if fork_and_watch is None:
+            raise TypeError("Prefork requires os.fork and child watchers")
+        if reuse_port:
+            if not server.closed:
+                raise TypeError("reuse_port requires a server created with an address, not a socket")
+            if SO_REUSEPORT is None:
+                raise ValueError("SO_REUSEPORT is not supported on this platform")
+        self.server = server
+        self.worker_count = workers if workers is not None else _cpu_count()
+        if self.worker_count < 1:
+            raise ValueError("workers must be a positive integer", workers)
+        self.reuse_port = reuse_port
+        self.post_fork = post_fork
+        self.stop_timeout = stop_timeout if stop_timeout is not None else server.stop_timeout
+        #: A dictionary mapping the pid of each running worker to its
+        #: index, from 0 to ``workers - 1``.
+        self.workers = {}
+        #: The number of workers that have exited and been replaced.
+        self.restarts = 0
+        self._stopping = False
+        self._started = False
+        self._stop_event = Event()
+        self._all_exited = Event()
+        self._signal_handlers = []
+
+    @property
+    def started(self):
+        return self._started and not self._stopping
+
+    def start(self):
+        """
+        Prepare the listener and fork the workers. Returns in the
+        master; workers never return from this method.
+        """
+        if self._started:
+            return
+        self._started = True
+        if not self.reuse_port:
+            # Bind in the master so that every worker inherits the
+            # same listening socket.
+            self.server.init_socket()
+        prepare_for_fork()
+        for signum in (signalmodule.SIGTERM, signalmodule.SIGINT):
+            self._signal_handlers.append(hub_signal(signum, self._on_stop_signal))
+        for index in range(self.worker_count):
+            self._spawn_worker(index)
+
+    def serve_forever(self):
+        """
+        Start the workers if needed and supervise them until
+        :meth:`stop` is called or the master receives ``SIGTERM`` or
+        ``SIGINT``.
+        """
+        if not self._started:
+            self.start()
+        try:
+            self._stop_event.wait()
+        finally:
+            self.stop()
+
+    def _on_stop_signal(self):
+        # Runs in its own greenlet.
+        self.stop()
+
+    def stop(self, timeout=None):
+        """
+        Stop the workers in order: stop replacing them, ask each to
+        stop accepting and finish its connections (``SIGTERM``), wait
+        up to *timeout* (default :attr:`stop_timeout`) plus a grace
+        period, kill any that remain, and finally close the master's
+        copy of the listening socket.
+        """
+        if self._stopping:
+            self._all_exited.wait()
+            return
+        self._stopping = True
+        if timeout is None:
+            timeout = self.stop_timeout
+        try:
+            for handler in self._signal_handlers:
+                handler.cancel()
+            del self._signal_handlers[:]
+            if self.workers:
+                self._signal_workers(signalmodule.SIGTERM)
+                if not self._all_exited.wait(timeout + 1):
+                    self._signal_workers(signalmodule.SIGKILL)
+                    self._all_exited.wait(1)
+            self._all_exited.set()
+        finally:
+            self.server.close()
+            self._stop_event.set()
+
+    def _signal_workers(self, signum):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+
+    def _spawn_worker(self, index):
+        if self._stopping:
+            return
+        pid = fork_and_watch(self._on_worker_exit)
+        if pid:
+            self.workers[pid] = index
+            return
+        # In the child.
+        self._run_worker(index)
+
+    def _on_worker_exit(self, watcher):
+        # Called in the hub when a child exits.
+        index = self.workers.pop(watcher.pid, None)
+        if index is None:
+            return
+        if self._stopping:
+            if not self.workers:
+                self._all_exited.set()
+            return
+        self.restarts += 1
+        Greenlet.spawn_later(self.restart_delay, self._spawn_worker, index)
+
+    def _run_worker(self, index):
+        status = 0
+        try:
+            # Nothing the master was supervising belongs to us.
+            for handler in self._signal_handlers:
+                handler.cancel()
+            del self._signal_handlers[:]
+            self.workers.clear()
+            # Interrupts from the terminal go to the whole process
+            # group; let the master drive the shutdown.
+            signalmodule.signal(signalmodule.SIGINT, signalmodule.SIG_IGN)
+
+            self.worker_index = index # pylint:disable=attribute-defined-outside-init
+            server = self.server
+            if self.reuse_port:
+                options = server._listener_options()
+                options['reuse_port'] = True
+                server.set_listener(_tcp_listener(server.address,
+                                                  backlog=server.backlog,
+                                                  family=server.family,
+                                                  **options))
+            if server.pool is None and server._spawn == Greenlet.spawn:
+                # Handlers spawned without a pool aren't waited for
+                # when the server stops; track them so that they can
+                # finish.
+                server.set_spawn(Pool())
+            drained = Event()
+            def drain():
+                try:
+                    server.stop(timeout=self.stop_timeout, drain=True)
+                finally:
+                    drained.set()
+            hub_signal(signalmodule.SIGTERM, drain)
+            if self.post_fork is not None:
+                self.post_fork(server)
+            server.serve_forever(stop_timeout=self.stop_timeout)
+            if server.draining:
+                # serve_forever returns as soon as the server is
+                # closed; the connections are still finishing.
+                drained.wait()
+        except SystemExit as ex:
+            status = ex.code if isinstance(ex.code, int) else 1
+        except: # pylint:disable=bare-except
+            traceback.print_exc()
+            status = 1
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(status)
@@ -14,6 +14,8 @@ different subclasses of :class:`WSGIHandler`.
 
 import errno
 from io import BytesIO
+import os
+import stat
 import string
 import sys
 import time
@@ -29,6 +31,7 @@ from gevent import socket
 import gevent
 from gevent.server import StreamServer
 from gevent.hub import GreenletExit
+from gevent.event import Event
 from gevent._compat import PY3, reraise
 
 from functools import partial
@@ -42,6 +45,7 @@ _no_undoc_members = True # Don't put undocumented things into sphinx
 __all__ = [
     'WSGIServer',
     'WSGIHandler',
+    'FileWrapper',
     'LoggingLogAdapter',
     'Environ',
     'SecureEnviron',
@@ -78,6 +82,7 @@ _ERRORS[400] = (_BAD_REQUEST_STATUS, _BAD_REQUEST_HEADERS, _BAD_REQUEST_BODY)
 
 _REQUEST_TOO_LONG_RESPONSE = b"HTTP/1.1 414 Request URI Too Long\r\nConnection: close\r\nContent-length: 0\r\n\r\n"
 _BAD_REQUEST_RESPONSE = b"HTTP/1.1 400 Bad Request\r\nConnection: close\r\nContent-length: 0\r\n\r\n"
+_SERVICE_UNAVAILABLE_RESPONSE = b"HTTP/1.1 503 Service Unavailable\r\nConnection: close\r\nContent-length: 0\r\n\r\n"
 _CONTINUE_RESPONSE = b"HTTP/1.1 100 Continue\r\n\r\n"
 
 
@@ -334,6 +339,40 @@ class Input(object):
     __next__ = next
 
 
+class FileWrapper(object):
+    """
+    The ``wsgi.file_wrapper`` provided to applications by
+    :class:`WSGIHandler`.
+
+    Iterating over it reads *filelike* in blocks of *blksize* bytes.
+    But when the application returns one for a regular file and the
+    response isn't chunked, the handler sends the rest of the file
+    with :meth:`socket.sendfile <gevent.socket.socket.sendfile>`
+    instead, which (where the platform supports it) doesn't copy the
+    data through Python at all. If the application doesn't provide a
+    ``Content-Length``, one is computed from the size of the file.
+
+    .. versionadded:: 1.3a1
+    """
+
+    def __init__(self, filelike, blksize=8192):
+        self.filelike = filelike
+        self.blksize = blksize
+        close = getattr(filelike, 'close', None)
+        if close is not None:
+            self.close = close
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        data = self.filelike.read(self.blksize)
+        if not data:
+            raise StopIteration
+        return data
+    __next__ = next
+
+
 try:
     import mimetools
     headers_factory = mimetools.Message
@@ -367,6 +406,28 @@ except ImportError:
         return ret
 
 
+def _nothing_buffered(sock, rfile):
+    # Whether all of the client's data that has been received is
+    # still in the kernel, so that the socket becoming readable will
+    # mean the next request has arrived.
+    pending = getattr(sock, 'pending', None) # SSL
+    if pending is not None and pending():
+        return False
+    if PY3:
+        # The buffer of an io.BufferedReader can only be seen by
+        # filling it, so don't let that wait.
+        timeout = sock.timeout
+        sock.settimeout(0.0)
+        try:
+            return not rfile.peek(1)
+        except socket.error:
+            return True
+        finally:
+            sock.settimeout(timeout)
+    buf = getattr(rfile, '_rbuf', None)
+    return buf is not None and not buf.tell()
+
+
 class WSGIHandler(object):
     """
     Handles HTTP requests from a socket, creates the WSGI environment, and
@@ -422,6 +483,7 @@ class WSGIHandler(object):
     request_version = None # str: 'HTTP 1.1'
     command = None # str: 'GET'
     path = None # str: '/'
+    request_count = 0 # Requests read from this connection so far
 
     def __init__(self, sock, address, server, rfile=None):
         # Deprecation: The rfile kwarg was introduced in 1.0a1 as part
@@ -455,6 +517,8 @@ class WSGIHandler(object):
                 if result is None:
                     break
                 if result is True:
+                    if self.server.park_idle:
+                        self._park()
                     continue
 
                 self.status, response_body = result
@@ -480,6 +544,19 @@ class WSGIHandler(object):
             self.__dict__.pop('socket', None)
             self.__dict__.pop('rfile', None)
 
+    def _park(self):
+        # Leave the kept-alive connection to the server until the next
+        # request arrives, letting this greenlet exit, if nothing of
+        # that request has been read yet.
+        server = self.server
+        if server.closed or server.draining or self.request_count == server.max_keepalive_requests:
+            return
+        if not _nothing_buffered(self.socket, self.rfile):
+            return
+        self.rfile.close()
+        server._park(self.socket, self.client_address, self.request_count)
+        self.socket = None
+
     def _check_http_version(self):
         version_str = self.request_version
         if not version_str.startswith("HTTP/"):
@@ -633,6 +710,22 @@ class WSGIHandler(object):
         if self.rfile.closed:
             return
 
+        server = self.server
+        if self.request_count:
+            # Waiting for the next request on a kept-alive connection.
+            if server.draining or self.request_count == server.max_keepalive_requests:
+                return
+            # It's idle only until the first byte of that request
+            # arrives, not until the whole request line has: a request
+            # that has started must not be closed as idle.
+            server.mark_idle(self)
+            try:
+                if _nothing_buffered(self.socket, self.rfile):
+                    socket.wait_read(self.socket.fileno(), timeout=self.socket.timeout)
+            except socket.error:
+                return
+            finally:
+                server.mark_active(self)
         try:
             self.requestline = self.read_requestline()
             # Account for old subclasses that haven't done this
@@ -668,6 +761,7 @@ class WSGIHandler(object):
         self.environ = self.get_environ()
         self.application = self.server.application
 
+        self.request_count += 1
         self.handle_one_response()
 
         if self.close_connection:
@@ -857,6 +951,10 @@ class WSGIHandler(object):
             self.close_connection = True
         elif provided_connection == 'close':
             self.close_connection = True
+        elif self.server.draining or self.request_count == self.server.max_keepalive_requests:
+            if provided_connection is None:
+                response_headers.append((b'Connection', b'close'))
+            self.close_connection = True
 
         if self.code in (304, 204):
             if self.provided_content_length is not None and self.provided_content_length != '0':
@@ -889,7 +987,54 @@ class WSGIHandler(object):
             length,
             delta)
 
+    def _sendfile(self, wrapper):
+        # Send the rest of the file of a FileWrapper result with
+        # socket.sendfile(). Returns False, having sent nothing, if
+        # that's not possible.
+        sendfile = getattr(self.socket, 'sendfile', None)
+        if sendfile is None or self.code in (304, 204):
+            return False
+        if self.headers_sent and self.response_use_chunked:
+            return False
+        filelike = wrapper.filelike
+        try:
+            offset = filelike.tell()
+            st = os.fstat(filelike.fileno())
+        except (AttributeError, IOError, OSError, ValueError):
+            # ValueError covers io.UnsupportedOperation and closed files.
+            return False
+        if not stat.S_ISREG(st.st_mode):
+            return False
+        count = st.st_size - offset
+        if self.provided_content_length is not None:
+            try:
+                count = int(self.provided_content_length)
+            except ValueError:
+                return False
+        elif not self.headers_sent:
+            count = max(count, 0)
+            self.provided_content_length = str(count)
+            count_str = self.provided_content_length
+            if PY3:
+                count_str = count_str.encode('latin-1')
+            self.response_headers.append((b'Content-Length', count_str))
+
+        if not self.headers_sent:
+            self.write(b'')
+        if count > 0:
+            try:
+                sent = sendfile(filelike, offset, count)
+            except socket.error as ex:
+                self.status = 'socket error: %s' % ex
+                if self.code > 0:
+                    self.code = -self.code
+                raise
+            self.response_length += sent
+        return True
+
     def process_result(self):
+        if isinstance(self.result, FileWrapper) and self._sendfile(self.result):
+            return
         for data in self.result:
             if data:
                 self.write(data)
@@ -1104,6 +1249,7 @@ class WSGIHandler(object):
         chunked = env.get('HTTP_TRANSFER_ENCODING', '').lower() == 'chunked'
         self.wsgi_input = Input(self.rfile, self.content_length, socket=sock, chunked_input=chunked)
         env['wsgi.input'] = self.wsgi_input
+        env['wsgi.file_wrapper'] = FileWrapper
         return env
 
 
@@ -1377,6 +1523,11 @@ class WSGIServer(StreamServer):
     .. versionchanged:: 1.1a3
         Add support for passing :class:`logging.Logger` objects to the ``log`` and
         ``error_log`` arguments.
+    .. versionchanged:: 1.3a1
+        Connections waiting for another keep-alive request are marked
+        idle (see :meth:`~gevent.server.StreamServer.mark_idle`), so
+        :attr:`~gevent.server.StreamServer.idle_timeout` and
+        :attr:`~gevent.server.StreamServer.max_idle` apply to them.
     """
 
     #: A callable taking three arguments: (socket, address, server) and returning
@@ -1408,10 +1559,33 @@ class WSGIServer(StreamServer):
     #: .. versionadded:: 1.2a1
     environ_class = dict
 
+    #: If not None, the most requests served on one connection. The
+    #: response to the last one tells the client the connection
+    #: will close.
+    #:
+    #: .. versionadded:: 1.3a1
+    max_keepalive_requests = None
+
+    #: If true, a connection waiting for another keep-alive request
+    #: is watched by the server instead of by its handler: the
+    #: handler's greenlet exits, and a new handler (spawned like any
+    #: other, so subject to the pool) picks the connection back up
+    #: when the client sends more. An idle connection then costs
+    #: little more than its socket and an io watcher. This only
+    #: happens when no part of the next request has been read yet,
+    #: and only with :class:`WSGIHandler` (or a subclass of it) as
+    #: the :attr:`handler_class`.
+    #:
+    #: .. versionadded:: 1.3a1
+    park_idle = False
+
     # Undocumented internal detail: the class that WSGIHandler._log_error
     # will cast to before passing to the loop.
     secure_environ_class = WSGISecureEnviron
 
+    # Until __init__ sets it; close() may be called first.
+    _parked = ()
+
     base_env = {'GATEWAY_INTERFACE': 'CGI/1.1',
                 'SERVER_SOFTWARE': 'gevent/%d.%d Python/%d.%d' % (gevent.version_info[:2] + sys.version_info[:2]),
                 'SCRIPT_NAME': '',
@@ -1425,6 +1599,13 @@ class WSGIServer(StreamServer):
                  handler_class=None,
                  environ=None, **ssl_args):
         StreamServer.__init__(self, listener, backlog=backlog, spawn=spawn, **ssl_args)
+        # The number of connections being handled, and, while
+        # draining, the event set when that drops to zero.
+        self._handling = 0
+        self._drained = None
+        # The parked connections (see park_idle) mapped to their io
+        # watchers.
+        self._parked = {}
         if application is not None:
             self.application = application
         if handler_class is not None:
@@ -1500,8 +1681,84 @@ class WSGIServer(StreamServer):
         This method blocks until the handler returns.
         """
         # pylint:disable=method-hidden
-        handler = self.handler_class(sock, address, self)
-        handler.handle()
+        self._run_handler(self.handler_class(sock, address, self))
+
+    def _run_handler(self, handler):
+        self._handling += 1
+        try:
+            handler.handle()
+        finally:
+            self._handling -= 1
+            if not self._handling and self._drained is not None:
+                self._drained.set()
+
+    def do_close(self, sock, *args):
+        if sock not in self._parked:
+            StreamServer.do_close(self, sock, *args)
+
+    def _park(self, sock, address, request_count):
+        watcher = self.loop.io(sock.fileno(), 1)
+        self._parked[sock] = watcher
+        self.mark_idle(sock, self._close_parked)
+        watcher.start(self._unpark, sock, address, request_count)
+
+    def _unpark(self, sock, address, request_count):
+        # Runs in the hub when a parked connection becomes readable.
+        self._parked.pop(sock).stop()
+        self.mark_active(sock)
+        self._spawn_from_hub(self._handle_unparked, sock, address, request_count)
+
+    def _handle_unparked(self, sock, address, request_count):
+        try:
+            handler = self.handler_class(sock, address, self)
+            handler.request_count = request_count
+            self._run_handler(handler)
+        finally:
+            self.do_close(sock)
+
+    def _close_parked(self, sock):
+        self._parked.pop(sock).stop()
+        self.mark_active(sock)
+        sock.close()
+
+    def close(self):
+        try:
+            StreamServer.close(self)
+        finally:
+            # Like the handlers a pool kills, parked connections don't
+            # outlive the server.
+            for sock in list(self._parked):
+                self._close_parked(sock)
+
+    def reject(self, sock, address):
+        """
+        Answer a connection accepted while the server is
+        :attr:`~gevent.baseserver.BaseServer.overloaded` with a
+        ``503 Service Unavailable`` response, without reading the
+        request, and close it. Over HTTPS the connection is just
+        closed, as the response can't be sent before a handshake.
+
+        Only used if :attr:`~gevent.baseserver.BaseServer.reject_overload`
+        is set.
+
+        .. versionadded:: 1.3a1
+        """
+        # pylint:disable=unused-argument
+        if not self.ssl_enabled:
+            try:
+                # Straight to the OS; this mustn't wait in the hub.
+                sock._sock.send(_SERVICE_UNAVAILABLE_RESPONSE)
+                # Unread data would make closing reset the connection,
+                # maybe before the client reads the response.
+                sock._sock.recv(16384)
+            except socket.error:
+                pass
+        sock.close()
+
+    def _wait_for_handlers(self, timeout):
+        if self._handling:
+            self._drained = Event()
+            self._drained.wait(timeout)
 
 def _main():
     # Provisional main handler, for quick tests, not production
@@ -40,6 +40,7 @@ Empty = __queue__.Empty
 from gevent.timeout import Timeout
 from gevent.hub import get_hub, Waiter, getcurrent
 from gevent.hub import InvalidSwitchError
+from gevent.deadline import _start_timer as _start_deadline_timer
 
 
 __all__ = ['Empty', 'Full', 'Queue', 'PriorityQueue', 'LifoQueue', 'JoinableQueue', 'Channel']
@@ -259,6 +260,7 @@ class Queue(object):
             # to return. No choice...
             raise Empty()
 
+        deadline = _start_deadline_timer()
         waiter = Waiter()
         timeout = Timeout._start_new_or_dummy(timeout, Empty)
         try:
@@ -271,6 +273,8 @@ class Queue(object):
             return method()
         finally:
             timeout.cancel()
+            if deadline is not None:
+                deadline.cancel()
             _safe_remove(self.getters, waiter)
 
     def get(self, block=True, timeout=None):
@@ -282,6 +286,10 @@ class Queue(object):
         if no item was available within that time. Otherwise (*block* is false), return
         an item if one is immediately available, else raise the :class:`Empty` exception
         (*timeout* is ignored in that case).
+
+        .. versionchanged:: 1.3a1
+           If the current :class:`gevent.deadline.Deadline` passes while
+           waiting (or already has), raise its exception instead.
         """
         if self.qsize():
             if self.putters:
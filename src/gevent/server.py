@@ -2,11 +2,19 @@
 """TCP/SSL server"""
 import sys
 import _socket
+from collections import OrderedDict
+from collections import deque
+from itertools import islice
+from timeit import default_timer
 from gevent.baseserver import BaseServer
-from gevent.socket import EWOULDBLOCK, socket
-from gevent._compat import PYPY, PY3
+from gevent.greenlet import Greenlet
+from gevent.hub import GreenletExit
+from gevent.hub import getcurrent
+from gevent.socket import EAGAIN, EWOULDBLOCK, socket, wait_write
+from gevent._compat import PYPY, PY3, xrange
+from gevent import _mmsg
 
-__all__ = ['StreamServer', 'DatagramServer']
+__all__ = ['StreamServer', 'DatagramServer', 'Protocol', 'Transport']
 
 
 if sys.platform == 'win32':
@@ -15,6 +23,31 @@ if sys.platform == 'win32':
 else:
     DEFAULT_REUSE_ADDR = 1
 
+# Linux 3.9+, the BSDs and macOS. Python only exposes the constant
+# where the platform headers define it.
+SO_REUSEPORT = getattr(_socket, 'SO_REUSEPORT', None)
+TCP_DEFER_ACCEPT = getattr(_socket, 'TCP_DEFER_ACCEPT', None)
+TCP_FASTOPEN = getattr(_socket, 'TCP_FASTOPEN', None)
+SO_BUSY_POLL = getattr(_socket, 'SO_BUSY_POLL', None)
+if sys.platform.startswith('linux'):
+    # Older Pythons don't define these even though the kernel (3.7
+    # and 3.11 respectively) supports them. The values are those of
+    # the generic Linux headers.
+    if TCP_FASTOPEN is None:
+        TCP_FASTOPEN = 23
+    if SO_BUSY_POLL is None:
+        SO_BUSY_POLL = 46
+
+# The most data DatagramServer reads from one datagram.
+_MAX_DATAGRAM = 8192
+# recvmmsg and sendmmsg only understand these address families.
+_MMSG_FAMILIES = (_mmsg.AF_INET, _mmsg.AF_INET6)
+# The kernel won't handle more messages per sendmmsg call (UIO_MAXIOV).
+_MMSG_MAX = 1024
+# The most data a Transport reads at once.
+_READ_SIZE = 65536
+_WOULDBLOCK = (EAGAIN, EWOULDBLOCK)
+
 
 class StreamServer(BaseServer):
     """
@@ -79,6 +112,8 @@ class StreamServer(BaseServer):
 
     .. versionchanged:: 1.2a2
        Add support for the *ssl_context* keyword argument.
+    .. versionchanged:: 1.3a1
+       Add the *protocol* argument.
 
     """
     # the default backlog to use if none was provided in __init__
@@ -86,8 +121,90 @@ class StreamServer(BaseServer):
 
     reuse_addr = DEFAULT_REUSE_ADDR
 
-    def __init__(self, listener, handle=None, backlog=None, spawn='default', **ssl_args):
+    #: If true, listening sockets created by :meth:`get_listener` set
+    #: ``SO_REUSEPORT`` (where the platform supports it), so that
+    #: several processes can each bind their own listener to the same
+    #: address and let the kernel balance connections between them.
+    #:
+    #: .. versionadded:: 1.3a1
+    reuse_port = False
+
+    #: If not None, the number of seconds the kernel holds on to a new
+    #: connection that hasn't sent any data before reporting it as
+    #: ready to accept (``TCP_DEFER_ACCEPT``, Linux only). Protocols
+    #: where the client speaks first, like HTTP and TLS, then never
+    #: wake the server up for a connection that has nothing to read
+    #: yet.
+    #:
+    #: .. versionadded:: 1.3a1
+    defer_accept = None
+
+    #: If not None, listening sockets created by :meth:`get_listener`
+    #: accept TCP Fast Open connections, queueing at most this many
+    #: that haven't completed the handshake (``TCP_FASTOPEN``). The
+    #: data of a client's first packet is then readable as soon as
+    #: the connection is accepted.
+    #:
+    #: .. versionadded:: 1.3a1
+    fastopen = None
+
+    #: If not None, the number of microseconds a blocking receive may
+    #: busy poll the device queue before sleeping (``SO_BUSY_POLL``,
+    #: Linux only). Accepted connections inherit it. Raising it above
+    #: the ``net.core.busy_read`` sysctl requires ``CAP_NET_ADMIN``.
+    #:
+    #: .. versionadded:: 1.3a1
+    busy_poll = None
+
+    #: If not None, the receive buffer size (``SO_RCVBUF``) of
+    #: listening sockets created by :meth:`get_listener`. Accepted
+    #: connections inherit it; setting it on the listener is the only
+    #: way to affect the TCP window negotiated in the handshake.
+    #:
+    #: .. versionadded:: 1.3a1
+    rcvbuf = None
+
+    #: If not None, connections that a handler has marked with
+    #: :meth:`mark_idle` for longer than this many seconds (give or
+    #: take half of it) are closed. One timer checks all of them.
+    #:
+    #: .. versionadded:: 1.3a1
+    idle_timeout = None
+
+    #: If not None, the most connections that may be marked with
+    #: :meth:`mark_idle` at once. Beyond that, the ones idle the
+    #: longest are closed first.
+    #:
+    #: .. versionadded:: 1.3a1
+    max_idle = None
+
+    #: If not None, a callable, such as a :class:`Protocol` subclass,
+    #: returning the protocol for each new connection; also the
+    #: *protocol* argument of the constructor. Connections are
+    #: then served by a :class:`Transport` calling the protocol from
+    #: the event loop instead of by a greenlet running *handle*, which
+    #: may be omitted. A transport can still hand its connection to a
+    #: greenlet with :meth:`Transport.spawn`. Not supported with SSL.
+    #:
+    #: .. versionadded:: 1.3a1
+    protocol = None
+
+    _reaper = None
+    # Until __init__ sets them; close() may be called first.
+    _waiting = ()
+    _transports = ()
+
+    def __init__(self, listener, handle=None, backlog=None, spawn='default', protocol=None, **ssl_args):
+        if protocol is not None:
+            self.protocol = protocol
         BaseServer.__init__(self, listener, handle=handle, spawn=spawn)
+        # The connections marked idle, the longest idle first, mapped to
+        # (when they were marked, the greenlet handling them).
+        self._idle = OrderedDict()
+        # What _spawn_from_hub is waiting for room in the pool to spawn.
+        self._waiting = deque()
+        # The open connections served by a protocol.
+        self._transports = set()
         try:
             if ssl_args:
                 ssl_args.setdefault('server_side', True)
@@ -113,6 +230,147 @@ class StreamServer(BaseServer):
     def ssl_enabled(self):
         return self.ssl_args is not None
 
+    def set_handle(self, handle):
+        if handle is None and self.protocol is not None and not hasattr(self, 'handle'):
+            return
+        BaseServer.set_handle(self, handle)
+
+    def start(self):
+        if self.protocol is not None and self.ssl_enabled:
+            raise ValueError('protocol is not supported with SSL')
+        BaseServer.start(self)
+        if self.idle_timeout is not None and self._reaper is None:
+            interval = self.idle_timeout / 2.0
+            self._reaper = self.loop.timer(interval, interval, ref=False)
+            self._reaper.start(self._reap_idle)
+
+    def close(self):
+        try:
+            BaseServer.close(self)
+        finally:
+            if self._reaper is not None:
+                self._reaper.stop()
+                self._reaper = None
+            waiting = self._waiting
+            if waiting:
+                self.pool._semaphore.unlink(self._spawn_waiting)
+                while waiting:
+                    self.do_close(waiting.popleft()[1])
+            if not self.draining:
+                # Like the handlers a pool kills, the connections
+                # served by a protocol end with the server.
+                self._abort_transports()
+
+    def stop(self, timeout=None, drain=False):
+        """
+        As :meth:`BaseServer.stop`. The connections served by a
+        :attr:`protocol` are aborted, unless draining, in which case
+        they are closed and get as long as the handlers in the pool
+        to send what they have buffered before being aborted.
+
+        .. versionchanged:: 1.3a1
+           Abort the connections served by a protocol.
+        """
+        try:
+            BaseServer.stop(self, timeout, drain)
+        finally:
+            self._abort_transports()
+
+    def _abort_transports(self):
+        for transport in list(self._transports):
+            transport.abort()
+
+    def mark_idle(self, conn, close=None):
+        """
+        Note that the current greenlet is waiting for the client of
+        *conn* (a hashable object standing for the connection, such
+        as its socket) to start another request, until it calls
+        :meth:`mark_active`. It should do that as soon as any of the
+        next request can be read, before reading it, or a request
+        that is slow to arrive could be cut off. While it's idle,
+        the greenlet may be killed with :exc:`~gevent.GreenletExit`
+        to close the connection: after :attr:`idle_timeout`, to stay
+        within :attr:`max_idle`, or by :meth:`close_idle`.
+
+        If *close* is given, no greenlet is waiting for *conn*;
+        instead, ``close(conn)`` is called in the hub to close it.
+
+        .. versionadded:: 1.3a1
+        """
+        idle = self._idle
+        idle[conn] = (default_timer(), getcurrent() if close is None else None, close)
+        max_idle = self.max_idle
+        if max_idle is not None and len(idle) > max_idle:
+            # Kill them from the hub, like the others.
+            self.loop.run_callback(self._kill_idle,
+                                   [(conn, idle[conn]) for conn in islice(idle, len(idle) - max_idle)])
+
+    def mark_active(self, conn):
+        """
+        Undo :meth:`mark_idle`, once the client has started a new request.
+
+        .. versionadded:: 1.3a1
+        """
+        self._idle.pop(conn, None)
+
+    def close_idle(self):
+        """
+        Close the connections marked with :meth:`mark_idle`, and
+        those served by a :attr:`protocol` once they have sent what
+        they have buffered.
+
+        .. versionadded:: 1.3a1
+        """
+        self.loop.run_callback(self._kill_idle, list(self._idle.items()))
+        for transport in list(self._transports):
+            transport.close()
+
+    def _reap_idle(self):
+        # Runs in the hub.
+        cutoff = default_timer() - self.idle_timeout
+        idle = self._idle
+        expired = []
+        for conn in idle:
+            entry = idle[conn]
+            if entry[0] > cutoff:
+                break
+            expired.append((conn, entry))
+        self._kill_idle(expired)
+
+    def _kill_idle(self, items):
+        # Runs in the hub, so the greenlets still marked idle are
+        # waiting. They mark themselves active as soon as the next
+        # request starts to arrive, so none is partway through one.
+        idle = self._idle
+        for conn, entry in items:
+            if idle.get(conn) is entry:
+                del idle[conn]
+                if entry[2] is None:
+                    entry[1].throw(GreenletExit)
+                else:
+                    entry[2](conn)
+
+    def _spawn_from_hub(self, func, sock, *args):
+        # Spawn func(sock, *args) from the hub, which can't wait for
+        # room in a full pool; it's spawned once there is room instead.
+        # If the server is closed first, sock is closed.
+        if self.closed:
+            self.do_close(sock)
+        elif self.full():
+            if not self._waiting:
+                self.pool._semaphore.rawlink(self._spawn_waiting)
+            self._waiting.append((func, sock, args))
+        else:
+            (self._spawn or Greenlet.spawn)(func, sock, *args)
+
+    def _spawn_waiting(self, _semaphore):
+        waiting = self._waiting
+        while waiting and not self.full():
+            func, sock, args = waiting.popleft()
+            self._spawn(func, sock, *args)
+        if not waiting:
+            self.pool._semaphore.unlink(self._spawn_waiting)
+
     def set_listener(self, listener):
         BaseServer.set_listener(self, listener)
         try:
@@ -128,14 +386,25 @@ class StreamServer(BaseServer):
             self.address = self.socket.getsockname()
         if self.ssl_args:
             self._handle = self.wrap_socket_and_handle
-        else:
+        elif hasattr(self, 'handle'):
             self._handle = self.handle
 
     @classmethod
     def get_listener(cls, address, backlog=None, family=None):
         if backlog is None:
             backlog = cls.backlog
-        return _tcp_listener(address, backlog=backlog, reuse_addr=cls.reuse_addr, family=family)
+        return _tcp_listener(address, backlog=backlog, family=family, **cls._listener_options())
+
+    @classmethod
+    def _listener_options(cls):
+        # The keyword arguments of _tcp_listener that come from class
+        # attributes.
+        return dict(reuse_addr=cls.reuse_addr,
+                    reuse_port=cls.reuse_port,
+                    defer_accept=cls.defer_accept,
+                    fastopen=cls.fastopen,
+                    busy_poll=cls.busy_poll,
+                    rcvbuf=cls.rcvbuf)
 
     if PY3:
 
@@ -149,6 +418,8 @@ class StreamServer(BaseServer):
                 raise
             sock = socket(sock.family, sock.type, sock.proto, fileno=fd)
             # XXX Python issue #7995?
+            if self.stats is not None:
+                sock._stats = self.stats
             return sock, address
 
     else:
@@ -163,8 +434,21 @@ class StreamServer(BaseServer):
             sockobj = socket(_sock=client_socket)
             if PYPY:
                 client_socket._drop()
+            if self.stats is not None:
+                sockobj._stats = self.stats
             return sockobj, address
 
+    def do_handle(self, *args):
+        protocol = self.protocol
+        if protocol is None:
+            return BaseServer.do_handle(self, *args)
+        try:
+            protocol = protocol()
+        except:
+            self.do_close(*args)
+            raise
+        Transport(self, *args)._connection_made(protocol)
+
     def do_close(self, sock, *args):
         # pylint:disable=arguments-differ
         sock.close()
@@ -172,17 +456,311 @@ class StreamServer(BaseServer):
     def wrap_socket_and_handle(self, client_socket, address):
         # used in case of ssl sockets
         ssl_socket = self.wrap_socket(client_socket, **self.ssl_args)
+        if self.stats is not None:
+            ssl_socket._stats = self.stats
         return self.handle(ssl_socket, address)
 
 
+class Protocol(object):
+    """
+    The callbacks for a connection of a :class:`StreamServer` whose
+    :attr:`~StreamServer.protocol` is set. This class does nothing;
+    subclasses override what they need.
+
+    The callbacks run in the hub, straight from the event loop, so
+    they must not block: use the :class:`Transport` passed to
+    :meth:`connection_made` to send data, and :meth:`Transport.spawn`
+    to carry on in a greenlet where blocking is needed.
+
+    .. versionadded:: 1.3a1
+    """
+
+    def connection_made(self, transport):
+        """
+        Called with the *transport* of a new connection.
+        """
+
+    def data_received(self, data):
+        """
+        Called with some bytes received from the client.
+        """
+
+    def eof_received(self):
+        """
+        Called when the client has shut down its side of the
+        connection. Unless this returns true, the transport is then
+        closed.
+        """
+
+    def connection_lost(self, exc):
+        """
+        Called once the connection is closed, with the exception that
+        caused it or None.
+        """
+
+    def pause_writing(self):
+        """
+        Called when the transport has more than
+        :attr:`Transport.write_high_water` bytes buffered.
+        """
+
+    def resume_writing(self):
+        """
+        Called when the transport has drained to
+        :attr:`Transport.write_low_water` bytes after
+        :meth:`pause_writing`.
+        """
+
+
+class Transport(object):
+    """
+    A connection of a :class:`StreamServer` served by a
+    :class:`Protocol`, without a greenlet. Data is read when the
+    socket is readable and handed to the protocol; what is written
+    and can't be sent right away is buffered until the socket is
+    writable again.
+
+    .. versionadded:: 1.3a1
+    """
+
+    #: When more than this many bytes are buffered by :meth:`write`,
+    #: the protocol's :meth:`~Protocol.pause_writing` is called.
+    write_high_water = 65536
+
+    #: When the buffer has drained to this many bytes after
+    #: pausing, the protocol's :meth:`~Protocol.resume_writing` is
+    #: called.
+    write_low_water = 16384
+
+    def __init__(self, server, sock, address):
+        self.server = server
+        #: The client socket, or None once closed or handed over.
+        self.socket = sock
+        self.address = address
+        self.protocol = None
+        self._sock = sock._sock
+        self._buffer = bytearray()
+        self._closing = False
+        self._eof = False
+        self._writing_paused = False
+        self._track_idle = server.idle_timeout is not None or server.max_idle is not None
+        fileno = sock.fileno()
+        self._read_watcher = server.loop.io(fileno, 1)
+        self._write_watcher = server.loop.io(fileno, 2)
+
+    def _connection_made(self, protocol):
+        self.protocol = protocol
+        self.server._transports.add(self)
+        self._read_watcher.start(self._read_ready)
+        self._call(protocol.connection_made, self)
+        self._mark_idle()
+
+    def write(self, data):
+        """
+        Send the bytes *data*, buffering what can't be sent now.
+        Ignored once the transport is closing.
+        """
+        if self._closing or self.socket is None:
+            return
+        if not self._buffer:
+            try:
+                sent = self._sock.send(data)
+            except _socket.error as ex:
+                if ex.args[0] not in _WOULDBLOCK:
+                    self._force_close(ex)
+                    return
+                sent = 0
+            if sent == len(data):
+                return
+            data = data[sent:]
+            self._write_watcher.start(self._write_ready)
+        self._buffer.extend(data)
+        if not self._writing_paused and len(self._buffer) > self.write_high_water:
+            self._writing_paused = True
+            self._call(self.protocol.pause_writing)
+
+    def get_write_buffer_size(self):
+        """
+        Return how many bytes are buffered, waiting to be sent.
+        """
+        return len(self._buffer)
+
+    def pause_reading(self):
+        """
+        Stop reading, so that the protocol gets no more data until
+        :meth:`resume_reading`; the client can then only send as much
+        as the socket buffers hold.
+        """
+        self._read_watcher.stop()
+
+    def resume_reading(self):
+        """
+        Undo :meth:`pause_reading`.
+        """
+        if self.socket is not None and not self._closing and not self._eof:
+            self._read_watcher.start(self._read_ready)
+
+    def is_closing(self):
+        """
+        Return whether :meth:`close` or :meth:`abort` has been called,
+        or the connection was lost.
+        """
+        return self._closing
+
+    def close(self):
+        """
+        Stop reading, and close the connection once everything
+        buffered has been sent.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self._read_watcher.stop()
+        if not self._buffer:
+            self._force_close(None)
+
+    def abort(self):
+        """
+        Close the connection now, discarding what's buffered.
+        """
+        self._force_close(None)
+
+    def spawn(self, handle=None):
+        """
+        Hand the connection over to a greenlet calling
+        ``handle(socket, address)`` (by default, the server's
+        *handle*), and close it when that returns, as if the server
+        had spawned it. Whatever is buffered is sent first. The
+        protocol gets no more callbacks, not even
+        :meth:`~Protocol.connection_lost`.
+        """
+        if self.socket is None or self._closing:
+            raise ValueError('Transport is closed')
+        server = self.server
+        sock = self.socket
+        buffered = bytes(self._buffer)
+        self._detach()
+        server._spawn_from_hub(_handle_detached, sock, self.address,
+                               handle or server.handle, server.do_close, buffered)
+
+    def _read_ready(self):
+        try:
+            data = self._sock.recv(_READ_SIZE)
+        except _socket.error as ex:
+            if ex.args[0] not in _WOULDBLOCK:
+                self._force_close(ex)
+            return
+        if not data:
+            self._eof = True
+            self._read_watcher.stop()
+            if not self._call(self.protocol.eof_received):
+                self.close()
+            return
+        self._call(self.protocol.data_received, data)
+        self._mark_idle()
+
+    def _write_ready(self):
+        buf = self._buffer
+        try:
+            sent = self._sock.send(buf)
+        except _socket.error as ex:
+            if ex.args[0] not in _WOULDBLOCK:
+                self._force_close(ex)
+            return
+        del buf[:sent]
+        if self._writing_paused and len(buf) <= self.write_low_water:
+            self._writing_paused = False
+            self._call(self.protocol.resume_writing)
+        if not buf:
+            self._write_watcher.stop()
+            if self._closing:
+                self._force_close(None)
+
+    def _mark_idle(self):
+        # Counting from the last data received, so that the server's
+        # idle_timeout and max_idle apply.
+        if self._track_idle and self.socket is not None and not self._closing:
+            self.server.mark_active(self)
+            self.server.mark_idle(self, Transport.close)
+
+    def _call(self, func, *args):
+        # Call the protocol; what it raises closes the connection.
+        try:
+            return func(*args)
+        except: # pylint:disable=bare-except
+            self.server.loop.handle_error(self, *sys.exc_info())
+            self._force_close(sys.exc_info()[1])
+
+    def _detach(self):
+        self._read_watcher.stop()
+        self._write_watcher.stop()
+        self.server._transports.discard(self)
+        self.server.mark_active(self)
+        # On Python 2, the socket is closed with the last reference to
+        # the raw one.
+        self.socket = self._sock = None
+
+    def _force_close(self, exc):
+        sock = self.socket
+        if sock is None:
+            return
+        self._closing = True
+        del self._buffer[:]
+        self._detach()
+        self.server.do_close(sock, self.address)
+        self.server.loop.run_callback(self._connection_lost, exc)
+
+    def _connection_lost(self, exc):
+        try:
+            self.protocol.connection_lost(exc)
+        except: # pylint:disable=bare-except
+            self.server.loop.handle_error(self, *sys.exc_info())
+
+
+def _handle_detached(sock, address, handle, close, buffered):
+    try:
+        if buffered:
+            sock.sendall(buffered)
+        return handle(sock, address)
+    finally:
+        close(sock, address)
+
+
 class DatagramServer(BaseServer):
-    """A UDP server"""
+    """
+    A UDP server.
+
+    By default, the *handle* function is spawned for each datagram
+    with 2 arguments: the data and the address it came from. Servers
+    that receive many small datagrams can instead set
+    :attr:`batch_size` (also accepted as a keyword argument); the
+    *handle* function is then spawned with one argument, a list of up
+    to that many ``(data, address)`` tuples received at once. On
+    Linux, the whole batch is received with a single ``recvmmsg``
+    system call.
+
+    .. versionchanged:: 1.3a1
+       Add *batch_size* and :meth:`sendto_many`.
+    """
 
     reuse_addr = DEFAULT_REUSE_ADDR
 
+    #: If set to a positive integer, the greatest number of datagrams
+    #: that are read at once and passed together to the handler. Each
+    #: wakeup reads as many batches as :attr:`max_accept` allows.
+    #:
+    #: .. versionadded:: 1.3a1
+    batch_size = None
+
     def __init__(self, *args, **kwargs):
         # The raw (non-gevent) socket, if possible
         self._socket = None
+        self._recvmmsg = None
+        batch_size = kwargs.pop('batch_size', None)
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if self.batch_size is not None and self.batch_size < 1:
+            raise ValueError('batch_size must be positive int: %r' % (self.batch_size, ))
         BaseServer.__init__(self, *args, **kwargs)
         from gevent.lock import Semaphore
         self._writelock = Semaphore()
@@ -198,20 +776,50 @@ class DatagramServer(BaseServer):
             self._socket = self._socket._sock
         except AttributeError:
             pass
+        if self.stats is not None:
+            self.socket._stats = self.stats
+        if (self.batch_size and _mmsg.recvmmsg is not None
+                and self.socket.family in _MMSG_FAMILIES):
+            self._recvmmsg = _mmsg.recvmmsg(self.batch_size, _MAX_DATAGRAM)
 
     @classmethod
     def get_listener(cls, address, family=None):
         return _udp_socket(address, reuse_addr=cls.reuse_addr, family=family)
 
     def do_read(self):
+        if self.batch_size:
+            return self._read_batch()
         try:
-            data, address = self._socket.recvfrom(8192)
+            data, address = self._socket.recvfrom(_MAX_DATAGRAM)
         except _socket.error as err:
             if err.args[0] == EWOULDBLOCK:
                 return
             raise
+        if self.stats is not None:
+            self.stats.received(len(data))
         return data, address
 
+    def _read_batch(self):
+        if self._recvmmsg is not None:
+            batch = self._recvmmsg(self._socket.fileno())
+        else:
+            batch = []
+            recvfrom = self._socket.recvfrom
+            for _ in xrange(self.batch_size):
+                try:
+                    batch.append(recvfrom(_MAX_DATAGRAM))
+                except _socket.error as err:
+                    if err.args[0] == EWOULDBLOCK or batch:
+                        # Don't lose what we have; a persistent error
+                        # will be raised next time.
+                        break
+                    raise
+        if batch:
+            if self.stats is not None:
+                for data, _ in batch:
+                    self.stats.received(len(data))
+            return (batch,)
+
     def sendto(self, *args):
         self._writelock.acquire()
         try:
@@ -219,24 +827,82 @@ class DatagramServer(BaseServer):
         finally:
             self._writelock.release()
 
+    def sendto_many(self, messages):
+        """
+        Send each of the ``(data, address)`` tuples in *messages*, in
+        order, as :meth:`sendto` would.
+
+        On Linux, if all the addresses are numeric IPv4 or IPv6
+        addresses, many datagrams are sent with each ``sendmmsg``
+        system call.
 
-def _tcp_listener(address, backlog=50, reuse_addr=None, family=_socket.AF_INET):
+        .. versionadded:: 1.3a1
+        """
+        messages = list(messages)
+        self._writelock.acquire()
+        try:
+            sock = self.socket
+            sent = 0
+            if _mmsg.sendmmsg is not None and sock.family in _MMSG_FAMILIES:
+                fileno = sock.fileno()
+                while sent < len(messages):
+                    try:
+                        count = _mmsg.sendmmsg(fileno, sock.family,
+                                               messages[sent:sent + _MMSG_MAX])
+                    except ValueError:
+                        # Not a numeric address; let sendto() resolve it.
+                        break
+                    if not count:
+                        wait_write(fileno)
+                    elif self.stats is not None:
+                        for data, _ in messages[sent:sent + count]:
+                            self.stats.sent(len(data))
+                    sent += count
+            for data, address in messages[sent:]:
+                sock.sendto(data, address)
+        finally:
+            self._writelock.release()
+
+
+def _tcp_listener(address, backlog=50, reuse_addr=None, family=_socket.AF_INET, reuse_port=False,
+                  defer_accept=None, fastopen=None, busy_poll=None, rcvbuf=None):
     """A shortcut to create a TCP socket, bind it and put it into listening state."""
+    # pylint:disable=too-many-arguments
     sock = socket(family=family)
-    if reuse_addr is not None:
-        sock.setsockopt(_socket.SOL_SOCKET, _socket.SO_REUSEADDR, reuse_addr)
     try:
-        sock.bind(address)
-    except _socket.error as ex:
-        strerror = getattr(ex, 'strerror', None)
-        if strerror is not None:
-            ex.strerror = strerror + ': ' + repr(address)
+        if reuse_addr is not None:
+            sock.setsockopt(_socket.SOL_SOCKET, _socket.SO_REUSEADDR, reuse_addr)
+        if reuse_port:
+            _setsockopt(sock, _socket.SOL_SOCKET, SO_REUSEPORT, 'SO_REUSEPORT', 1)
+        if rcvbuf is not None:
+            sock.setsockopt(_socket.SOL_SOCKET, _socket.SO_RCVBUF, rcvbuf)
+        if busy_poll is not None:
+            _setsockopt(sock, _socket.SOL_SOCKET, SO_BUSY_POLL, 'SO_BUSY_POLL', busy_poll)
+        if defer_accept is not None:
+            _setsockopt(sock, _socket.IPPROTO_TCP, TCP_DEFER_ACCEPT, 'TCP_DEFER_ACCEPT', defer_accept)
+        if fastopen is not None:
+            _setsockopt(sock, _socket.IPPROTO_TCP, TCP_FASTOPEN, 'TCP_FASTOPEN', fastopen)
+        try:
+            sock.bind(address)
+        except _socket.error as ex:
+            strerror = getattr(ex, 'strerror', None)
+            if strerror is not None:
+                ex.strerror = strerror + ': ' + repr(address)
+            raise
+        sock.listen(backlog)
+    except:
+        sock.close()
         raise
-    sock.listen(backlog)
     sock.setblocking(0)
     return sock
 
 
+def _setsockopt(sock, level, option, name, value):
+    if option is None:
+        raise ValueError('%s is not supported on this platform' % name)
+    sock.setsockopt(level, option, value)
+
+
 def _udp_socket(address, backlog=50, reuse_addr=None, family=_socket.AF_INET):
     # backlog argument for compat with tcp_listener
     # pylint:disable=unused-argument
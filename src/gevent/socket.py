@@ -70,6 +70,18 @@ def create_connection(address, timeout=_GLOBAL_DEFAULT_TIMEOUT, source_address=N
     is used. If *source_address* is set it must be a tuple of (host, port)
     for the socket to bind as a source address before making the connection.
     A host of '' or port 0 tells the OS to use the default.
+
+    If the hub's :attr:`~gevent.hub.Hub.happy_eyeballs_delay` is set
+    and the host has more than one address, the addresses are tried
+    as described in :rfc:`8305` ("Happy Eyeballs"): alternating
+    between address families, each attempt starts in its own greenlet
+    when the previous one fails or has gone on for that many seconds,
+    the first connection established is returned and the other
+    attempts are abandoned. An unreachable address then costs that
+    delay instead of the whole *timeout*.
+
+    .. versionchanged:: 1.3a1
+       Support :attr:`~gevent.hub.Hub.happy_eyeballs_delay`.
     """
 
     host, port = address
@@ -79,20 +91,16 @@ def create_connection(address, timeout=_GLOBAL_DEFAULT_TIMEOUT, source_address=N
     if not addrs:
         raise error("getaddrinfo returns an empty list")
 
+    if len(addrs) > 1:
+        delay = get_hub().happy_eyeballs_delay
+        if delay is not None:
+            return _connect_staggered(_interleave_families(addrs), timeout, source_address,
+                                      delay)
+
     for res in addrs:
-        af, socktype, proto, _, sa = res
-        sock = None
         try:
-            sock = socket(af, socktype, proto)
-            if timeout is not _GLOBAL_DEFAULT_TIMEOUT:
-                sock.settimeout(timeout)
-            if source_address:
-                sock.bind(source_address)
-            sock.connect(sa)
+            sock = _connect(res, timeout, source_address)
         except error:
-            if sock is not None:
-                sock.close()
-            sock = None
             if res is addrs[-1]:
                 raise
             # without exc_clear(), if connect() fails once, the socket
@@ -108,18 +116,94 @@ def create_connection(address, timeout=_GLOBAL_DEFAULT_TIMEOUT, source_address=N
                 pass # Python 3 doesn't have this
             else:
                 c()
-        except BaseException:
-            # Things like GreenletExit,  Timeout and KeyboardInterrupt.
-            # These get raised immediately, being sure to
-            # close the socket
-            if sock is not None:
-                sock.close()
-            sock = None
-            raise
         else:
             return sock
 
 
+def _connect(res, timeout, source_address):
+    # Return a socket connected to the getaddrinfo() result *res*;
+    # if that fails, close it and raise.
+    af, socktype, proto, _, sa = res
+    sock = None
+    try:
+        sock = socket(af, socktype, proto)
+        if timeout is not _GLOBAL_DEFAULT_TIMEOUT:
+            sock.settimeout(timeout)
+        if source_address:
+            sock.bind(source_address)
+        sock.connect(sa)
+    except BaseException:
+        # Including things like GreenletExit, Timeout and
+        # KeyboardInterrupt.
+        if sock is not None:
+            sock.close()
+        raise
+    return sock
+
+
+def _interleave_families(addrs):
+    # Reorder getaddrinfo() results to alternate between address
+    # families, starting with the family of the first one (RFC 8305,
+    # section 4).
+    by_family = {}
+    families = []
+    for res in addrs:
+        family = res[0]
+        if family not in by_family:
+            by_family[family] = []
+            families.append(family)
+        by_family[family].append(res)
+    lists = [by_family[family] for family in families]
+    result = []
+    for i in range(max(len(l) for l in lists)):
+        result.extend(l[i] for l in lists if i < len(l))
+    return result
+
+
+def _connect_staggered(addrs, timeout, source_address, delay):
+    from gevent.greenlet import Greenlet
+    from gevent.greenlet import killall
+    from gevent.queue import Queue
+    from gevent.queue import Empty
+
+    results = Queue()
+
+    def attempt(res):
+        try:
+            sock = _connect(res, timeout, source_address)
+        except Exception as ex: # pylint:disable=broad-except
+            results.put((None, ex))
+        else:
+            results.put((sock, None))
+
+    attempts = []
+    failed = []
+    winner = None
+    try:
+        while True:
+            if len(attempts) < len(addrs):
+                attempts.append(Greenlet.spawn(attempt, addrs[len(attempts)]))
+            more = len(attempts) < len(addrs)
+            try:
+                sock, ex = results.get(timeout=delay if more else None)
+            except Empty:
+                # Too slow; start the next one alongside it.
+                continue
+            if sock is not None:
+                winner = sock
+                return sock
+            failed.append(ex)
+            if len(failed) == len(addrs):
+                raise ex
+    finally:
+        killall(attempts)
+        # Connections that completed after the winner
+        while not results.empty():
+            sock = results.get()[0]
+            if sock is not None and sock is not winner:
+                sock.close()
+
+
 # This is promised to be in the __all__ of the _source, but, for circularity reasons,
 # we implement it in this module. Mostly for documentation purposes, put it
 # in the _source too.
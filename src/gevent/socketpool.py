@@ -0,0 +1,286 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+A pool of outgoing TCP and SSL connections.
+
+:class:`ConnectionPool` keeps connections to each ``(address,
+ssl_context)`` open between uses, so a client making many requests to
+the same servers pays for the TCP (and TLS) handshake once instead of
+for every request::
+
+    from gevent.socketpool import ConnectionPool
+
+    pool = ConnectionPool(maxsize=20, idle_timeout=30)
+
+    def call(request):
+        with pool.connection(('backend', 9000)) as sock:
+            sock.sendall(request)
+            return read_response(sock)
+
+Connections are handed out most recently used first, so the ones in
+use stay warm and the others go idle and are closed once they have
+been unused for *idle_timeout* seconds. Before handing out an idle
+connection, the pool checks without blocking that the server hasn't
+closed it.
+
+.. versionadded:: 1.3a1
+"""
+from __future__ import absolute_import
+
+from contextlib import contextmanager
+from errno import EAGAIN
+from errno import EWOULDBLOCK
+from timeit import default_timer
+import _socket
+
+from gevent.hub import get_hub
+from gevent.lock import Semaphore
+from gevent.pool import PoolFull
+from gevent.socket import create_connection
+from gevent.socket import _GLOBAL_DEFAULT_TIMEOUT
+
+__all__ = [
+    'ConnectionPool',
+]
+
+_WOULD_BLOCK = (EAGAIN, EWOULDBLOCK)
+
+
+def _is_alive(sock, ssl):
+    # Peek at the socket without blocking: a connection the server
+    # closed reads as end of file, one that is still open would block.
+    try:
+        data = sock._sock.recv(1, _socket.MSG_PEEK)
+    except _socket.error as ex:
+        return ex.args[0] in _WOULD_BLOCK
+    # Data nobody asked for means a plain connection is out of step
+    # with the protocol. With SSL it can just be a session ticket or
+    # some other record the application never sees.
+    return bool(data) and ssl
+
+
+class _Bucket(object):
+    # The connections to one (address, ssl_context)
+
+    __slots__ = ('key', 'idle', 'size', 'semaphore')
+
+    def __init__(self, key, maxsize):
+        self.key = key
+        # (last_used, socket) pairs; the most recently used last.
+        self.idle = []
+        # The number of open connections, idle or not.
+        self.size = 0
+        # One slot for each connection that may be checked out.
+        self.semaphore = Semaphore(maxsize)
+
+
+class ConnectionPool(object):
+    """
+    ConnectionPool(maxsize=10, minsize=0, idle_timeout=60.0, connect_timeout=None)
+
+    Connections to any number of servers, at most *maxsize* of them
+    to each ``(address, ssl_context)``.
+
+    :keyword int maxsize: The most connections to each address and
+        SSL context, checked out or idle. :meth:`get` waits for one to
+        be returned when this many are checked out.
+    :keyword int minsize: A floor for closing idle connections: the
+        idle timeout never brings the connections to an address and
+        SSL context below this many. The pool doesn't open
+        connections to reach it, or replace those the server closes.
+    :keyword float idle_timeout: Idle connections beyond *minsize*
+        are closed after this many seconds (give or take half of
+        it). One timer checks all of them. None keeps them open
+        until the server closes them.
+    :keyword float connect_timeout: The timeout for establishing a
+        new connection, including the SSL handshake. None (the
+        default) means the default socket timeout
+        (:func:`socket.getdefaulttimeout`).
+
+    The pool must be used from the thread that created it.
+    """
+
+    def __init__(self, maxsize=10, minsize=0, idle_timeout=60.0, connect_timeout=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive: %r' % (maxsize, ))
+        if minsize < 0 or minsize > maxsize:
+            raise ValueError('minsize must be between 0 and maxsize: %r' % (minsize, ))
+        self.maxsize = maxsize
+        self.minsize = minsize
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._buckets = {}
+        # The bucket of each checked-out connection
+        self._checked_out = {}
+        self._timer = None
+        self._closed = False
+
+    def get(self, address, ssl_context=None, timeout=None):
+        """
+        Check out a connection to the ``(host, port)`` *address*,
+        waiting up to *timeout* seconds for one to be returned if
+        :attr:`maxsize` of them are in use.
+
+        The connection is reused if one is idle (and still open), or
+        created otherwise. If *ssl_context* is given, the connection
+        is wrapped with its ``wrap_socket`` method, using the host as
+        the server name.
+
+        Give the connection back with :meth:`put` or :meth:`discard`.
+
+        :raises gevent.pool.PoolFull: If no connection became available
+            within *timeout*.
+        """
+        if self._closed:
+            raise ValueError('ConnectionPool is closed')
+        key = (address, ssl_context)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(key, self.maxsize)
+        if not bucket.semaphore.acquire(timeout=timeout):
+            raise PoolFull()
+        try:
+            sock = self._reuse(bucket, ssl_context is not None)
+            if sock is None:
+                sock = self._connect(bucket)
+        except:
+            bucket.semaphore.release()
+            raise
+        self._checked_out[sock] = bucket
+        return sock
+
+    def _reuse(self, bucket, ssl):
+        idle = bucket.idle
+        while idle:
+            sock = idle.pop()[1]
+            if _is_alive(sock, ssl):
+                return sock
+            bucket.size -= 1
+            sock.close()
+
+    def _connect(self, bucket):
+        address, ssl_context = bucket.key
+        # Count it now: other greenlets may check connections out
+        # while this one is connecting.
+        bucket.size += 1
+        try:
+            timeout = self.connect_timeout
+            if timeout is None:
+                timeout = _GLOBAL_DEFAULT_TIMEOUT
+            sock = create_connection(address, timeout=timeout)
+            try:
+                if ssl_context is not None:
+                    sock = ssl_context.wrap_socket(sock, server_hostname=address[0])
+                sock.settimeout(_socket.getdefaulttimeout())
+            except:
+                sock.close()
+                raise
+        except:
+            bucket.size -= 1
+            raise
+        return sock
+
+    def put(self, sock):
+        """
+        Return the connection *sock*, obtained from :meth:`get`, to
+        the pool for reuse. It must not have any unread data, or be
+        in the middle of a request.
+        """
+        bucket = self._checked_out.pop(sock)
+        if self._closed:
+            bucket.size -= 1
+            sock.close()
+        else:
+            bucket.idle.append((default_timer(), sock))
+            self._start_timer()
+        bucket.semaphore.release()
+
+    def discard(self, sock):
+        """
+        Close the connection *sock*, obtained from :meth:`get`, making
+        room for a new one.
+        """
+        bucket = self._checked_out.pop(sock)
+        bucket.size -= 1
+        try:
+            sock.close()
+        finally:
+            bucket.semaphore.release()
+
+    @contextmanager
+    def connection(self, address, ssl_context=None, timeout=None):
+        """
+        A context manager that checks out a connection with
+        :meth:`get` and returns it with :meth:`put`, or closes it
+        with :meth:`discard` if the block raises an exception.
+        """
+        sock = self.get(address, ssl_context, timeout)
+        try:
+            yield sock
+        except:
+            self.discard(sock)
+            raise
+        else:
+            self.put(sock)
+
+    def idle_count(self, address=None, ssl_context=None):
+        """
+        Return the number of idle connections to *address* and
+        *ssl_context*, or to all servers if *address* is None.
+        """
+        if address is not None:
+            bucket = self._buckets.get((address, ssl_context))
+            return len(bucket.idle) if bucket is not None else 0
+        return sum(len(bucket.idle) for bucket in self._buckets.values())
+
+    def _start_timer(self):
+        if self._timer is None and self.idle_timeout is not None:
+            interval = self.idle_timeout / 2.0
+            self._timer = get_hub().loop.timer(interval, interval, ref=False)
+            self._timer.start(self._evict)
+
+    def _stop_timer(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _evict(self):
+        # Runs in the hub.
+        cutoff = default_timer() - self.idle_timeout
+        minsize = self.minsize
+        idle_left = False
+        for key, bucket in list(self._buckets.items()):
+            idle = bucket.idle
+            expired = 0
+            # The oldest are first.
+            while (expired < len(idle) and idle[expired][0] <= cutoff
+                   and bucket.size - expired > minsize):
+                expired += 1
+            if expired:
+                for _, sock in idle[:expired]:
+                    sock.close()
+                del idle[:expired]
+                bucket.size -= expired
+            if idle:
+                idle_left = True
+            elif not bucket.size and bucket.semaphore.counter == self.maxsize:
+                del self._buckets[key]
+        if not idle_left:
+            self._stop_timer()
+
+    def close(self):
+        """
+        Close the idle connections, and each checked-out connection
+        when it's returned. The pool can't be used afterwards.
+        """
+        self._closed = True
+        self._stop_timer()
+        for bucket in self._buckets.values():
+            for _, sock in bucket.idle:
+                sock.close()
+            bucket.size -= len(bucket.idle)
+            del bucket.idle[:]
+
+    def __repr__(self):
+        return '<%s at 0x%x maxsize=%d idle=%d checked_out=%d>' % (
+            self.__class__.__name__, id(self), self.maxsize,
+            self.idle_count(), len(self._checked_out))
@@ -0,0 +1,398 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Buffered reading from sockets without allocating for each read.
+
+:class:`SocketReader` reads with ``recv_into`` directly into a
+``bytearray`` it borrows from a :class:`BufferPool` (by default, the
+one shared by every reader of the hub), so servers with many
+connections don't allocate and free a read buffer for each of them.
+It adds the operations that framed protocols need and file objects
+from :meth:`socket.makefile <gevent.socket.socket.makefile>` lack:
+reading an exact number of bytes, reading up to an arbitrary
+separator, and looking at what has been buffered through a
+:func:`memoryview` before deciding what, if anything, to copy::
+
+    from gevent.socketreader import SocketReader
+
+    with SocketReader(sock) as reader:
+        request_line = reader.readline()
+        headers = reader.readuntil(b'\\r\\n\\r\\n')
+        body = reader.readexactly(content_length)
+
+The buffer goes back to the pool whenever everything in it has been
+read, and when the reader is closed.
+
+.. versionadded:: 1.3a1
+"""
+from __future__ import absolute_import
+
+from gevent._ffi.freelist import FreeList
+from gevent.hub import get_hub
+
+__all__ = [
+    'BufferPool',
+    'IncompleteReadError',
+    'LimitOverrunError',
+    'SocketReader',
+    'get_buffer_pool',
+]
+
+
+class IncompleteReadError(EOFError):
+    """
+    The connection was closed before the requested data was read.
+    """
+
+    def __init__(self, partial, expected):
+        EOFError.__init__(self, '%d bytes read on a total of %r expected bytes'
+                          % (len(partial), expected))
+        #: The bytes read before the end of the stream.
+        self.partial = partial
+        #: The number of bytes expected, or None if reading until a
+        #: separator.
+        self.expected = expected
+
+
+class LimitOverrunError(ValueError):
+    """
+    A separator wasn't found within the reader's *limit*. The data is
+    still buffered.
+    """
+
+    def __init__(self, message, consumed):
+        ValueError.__init__(self, message)
+        #: How many bytes are buffered.
+        self.consumed = consumed
+
+
+class BufferPool(object):
+    """
+    Recycles ``bytearray`` objects of *buffer_size* bytes, keeping at
+    most *capacity* of them.
+    """
+
+    def __init__(self, buffer_size=64 * 1024, capacity=64):
+        self.buffer_size = buffer_size
+        self._free = FreeList(capacity)
+
+    def get(self):
+        """
+        Return a ``bytearray`` of :attr:`buffer_size` bytes. Its
+        contents are undefined.
+        """
+        buf = self._free.get()
+        if buf is None:
+            buf = bytearray(self.buffer_size)
+        return buf
+
+    def put(self, buf):
+        """
+        Give back a buffer obtained from :meth:`get`. The caller must
+        not use it (or any view of it) afterwards.
+        """
+        if len(buf) == self.buffer_size:
+            self._free.put(buf)
+
+    def stats(self):
+        """
+        Return a dictionary of counters: how many buffers are free,
+        and how often :meth:`get` could reuse one.
+        """
+        return self._free.stats()
+
+    def clear(self):
+        """
+        Drop all the free buffers.
+        """
+        self._free.clear()
+
+    def __repr__(self):
+        return '<%s at 0x%x buffer_size=%d %r>' % (
+            self.__class__.__name__, id(self), self.buffer_size, self._free)
+
+
+def get_buffer_pool():
+    """
+    Return the :class:`BufferPool` of the current hub.
+    """
+    return get_hub().buffer_pool
+
+
+class SocketReader(object):
+    """
+    SocketReader(sock, limit=None, pool=None)
+
+    Buffered reads from the connected socket *sock* (anything with a
+    ``recv_into`` method).
+
+    :keyword int limit: The most bytes :meth:`readline` and
+        :meth:`readuntil` will buffer while looking for their
+        separator. The default is the pool's buffer size. Reading
+        more than that at once needs a temporary, larger buffer;
+        :meth:`readexactly` does that as needed.
+    :keyword pool: The :class:`BufferPool` to borrow the buffer from.
+        Defaults to the hub's.
+
+    Buffered data lives in one linear ``bytearray`` (not a ring
+    buffer): when the space after the data runs out, the data is
+    moved back to the start of it, so a steady stream of reads smaller
+    than the buffer allocates nothing but the objects returned to the
+    caller. The :meth:`peek` and :meth:`consume` methods avoid even
+    those. Whenever everything buffered has been consumed, the buffer
+    goes back to the pool.
+
+    Only one greenlet should read from a reader at a time.
+    """
+
+    # pylint:disable=too-many-instance-attributes
+
+    def __init__(self, sock, limit=None, pool=None):
+        self.sock = sock
+        self.pool = pool if pool is not None else get_buffer_pool()
+        self.limit = limit if limit is not None else self.pool.buffer_size
+        self._buf = None
+        self._view = None
+        self._start = 0
+        self._end = 0
+        self._eof = False
+
+    @property
+    def buffered(self):
+        """The number of bytes read from the socket but not yet returned."""
+        return self._end - self._start
+
+    @property
+    def at_eof(self):
+        """Whether the socket has been read to the end and the buffer is empty."""
+        return self._eof and self._start == self._end
+
+    def _set_buffer(self, buf):
+        self._buf = buf
+        self._view = memoryview(buf)
+
+    def _release(self):
+        buf = self._buf
+        if buf is not None:
+            self._view = self._buf = None
+            self.pool.put(buf)
+
+    def _fill(self, need):
+        # Make sure there's room for at least *need* more bytes, then
+        # read once. Returns the number of bytes read.
+        if self._eof:
+            return 0
+        buf = self._buf
+        start = self._start
+        end = self._end
+        count = end - start
+        if buf is None:
+            self._set_buffer(self.pool.get())
+            if len(self._buf) < need:
+                self._grow(need)
+        elif len(buf) - end < need:
+            if count + need <= len(buf):
+                if count:
+                    view = self._view
+                    view[:count] = view[start:end]
+                self._start = 0
+                self._end = count
+            else:
+                self._grow(count + need)
+        elif not count:
+            self._start = self._end = 0
+        end = self._end
+        nbytes = self.sock.recv_into(self._view[end:])
+        if not nbytes:
+            self._eof = True
+        self._end = end + nbytes
+        return nbytes
+
+    def _grow(self, size):
+        # Replace the buffer with one big enough for *size* bytes.
+        count = self._end - self._start
+        buf = bytearray(max(size, 2 * len(self._buf)))
+        buf[:count] = self._view[self._start:self._end]
+        self._release()
+        self._set_buffer(buf)
+        self._start = 0
+        self._end = count
+
+    def _take(self, n):
+        if not n:
+            # Possibly with no buffer at all.
+            return b''
+        start = self._start
+        data = self._view[start:start + n].tobytes()
+        self._consumed(n)
+        return data
+
+    def _take_to(self, end):
+        # Like _take, for the common case that data stays buffered
+        # after *end*.
+        data = self._view[self._start:end].tobytes()
+        if end == self._end:
+            self._consumed(end - self._start)
+        else:
+            self._start = end
+        return data
+
+    def _consumed(self, n):
+        self._start += n
+        if self._start == self._end:
+            self._start = self._end = 0
+            # Nothing is buffered, so the buffer can go back to the
+            # pool (or, if it was grown for one big read, away) until
+            # the next read; a connection waiting between messages
+            # then holds none.
+            self._release()
+
+    def peek(self, n=1):
+        """
+        Return a :func:`memoryview` of the buffered data, reading from
+        the socket until at least *n* bytes are buffered or the stream
+        ends. The data stays buffered; pass the number of bytes
+        actually used to :meth:`consume`.
+
+        The view is only valid until the next call to a method of this
+        object.
+        """
+        while self._end - self._start < n and self._fill(n - (self._end - self._start)):
+            pass
+        if self._buf is None:
+            return memoryview(b'')
+        return self._view[self._start:self._end]
+
+    def consume(self, n):
+        """
+        Discard the first *n* buffered bytes, typically after looking
+        at them with :meth:`peek`.
+        """
+        if n < 0 or n > self._end - self._start:
+            raise ValueError("Can only consume buffered bytes", n)
+        if n:
+            self._consumed(n)
+
+    def readexactly(self, n):
+        """
+        Read exactly *n* bytes.
+
+        :raises IncompleteReadError: If the stream ends first.
+        """
+        while self._end - self._start < n:
+            if not self._fill(n - (self._end - self._start)):
+                partial = self._take(self._end - self._start)
+                raise IncompleteReadError(partial, n)
+        return self._take(n)
+
+    def readinto(self, b):
+        """
+        Read up to ``len(b)`` bytes into the writable buffer *b*,
+        waiting only if nothing is buffered. Returns the number of
+        bytes read, 0 at the end of the stream.
+        """
+        view = memoryview(b)
+        if self._end == self._start:
+            if len(view) >= self.pool.buffer_size:
+                # Too big to be worth going through our buffer.
+                return self.sock.recv_into(view)
+            self._fill(1)
+        n = min(len(view), self._end - self._start)
+        if n:
+            view[:n] = self._view[self._start:self._start + n]
+            self._consumed(n)
+        return n
+
+    def readuntil(self, separator=b'\n'):
+        """
+        Read up to and including *separator*.
+
+        :raises IncompleteReadError: If the stream ends before the
+            separator. The data read is discarded.
+        :raises LimitOverrunError: If the data up to the separator is
+            longer than :attr:`limit`. The data stays buffered.
+        """
+        if not separator:
+            raise ValueError("Separator should be at least one byte")
+        buf = self._buf
+        if buf is not None:
+            # The common case: it's already buffered.
+            start = self._start
+            found = buf.find(separator, start, self._end)
+            if found != -1 and found + len(separator) - start <= self.limit:
+                return self._take_to(found + len(separator))
+        return self._readuntil(separator)
+
+    def _readuntil(self, separator):
+        seplen = len(separator)
+        offset = self._start
+        while True:
+            if self._buf is not None:
+                found = self._buf.find(separator, offset, self._end)
+                if found != -1:
+                    length = found + seplen - self._start
+                    if length > self.limit:
+                        raise LimitOverrunError("Separator is found, but chunk is longer than limit",
+                                                length)
+                    return self._take(length)
+                # Don't search the same bytes again; after a read,
+                # the buffer may have moved, so keep the distance
+                # from the start instead of the index.
+                offset = max(self._start, self._end - seplen + 1)
+            buffered = self._end - self._start
+            if buffered >= self.limit:
+                # The separator, not among these bytes, can only end
+                # past the limit.
+                raise LimitOverrunError("Separator is not found, and chunk exceed the limit",
+                                        buffered)
+            offset -= self._start
+            if not self._fill(1):
+                partial = self._take(self._end - self._start)
+                raise IncompleteReadError(partial, None)
+            offset += self._start
+
+    def readline(self):
+        """
+        Read one line, including the ``\\n``. At the end of the stream,
+        return whatever is left without one, and then ``b''``.
+
+        :raises LimitOverrunError: If the line is longer than
+            :attr:`limit`.
+        """
+        buf = self._buf
+        if buf is not None:
+            start = self._start
+            found = buf.find(b'\n', start, self._end)
+            if found != -1 and found - start < self.limit:
+                return self._take_to(found + 1)
+        try:
+            return self._readuntil(b'\n')
+        except IncompleteReadError as ex:
+            return ex.partial
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+    next = __next__
+
+    def close(self):
+        """
+        Give the buffer back to the pool, discarding any buffered data.
+        The socket is not closed.
+        """
+        self._release()
+        self._start = self._end = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '<%s at 0x%x buffered=%d eof=%s sock=%r>' % (
+            self.__class__.__name__, id(self), self.buffered, self._eof, self.sock)
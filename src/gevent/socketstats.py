@@ -0,0 +1,168 @@
+# Copyright (c) 2017 gevent contributors. See LICENSE for details.
+"""
+Counters of the I/O performed by gevent sockets.
+
+A :class:`SocketStats` counts the bytes sockets move, the system
+calls that moved them, how often a call would have blocked and the
+greenlet had to wait for the event loop, and how long those waits
+took. Nothing is counted until a socket has a :class:`SocketStats`
+to count into; when none does, each operation costs one attribute
+lookup.
+
+Sockets accepted by a server whose :attr:`~gevent.baseserver.BaseServer.stats`
+is set count into that object. Every :class:`SocketStats` also adds
+what it counts to the global one returned by :func:`get_stats`, so
+the global counters aggregate all the servers. :func:`enable` makes
+every other gevent socket (clients, for example) count directly into
+the global object as well::
+
+    from gevent import socketstats
+    from gevent.server import StreamServer
+
+    server = StreamServer(('', 8000), handle)
+    server.stats = socketstats.SocketStats()
+    socketstats.enable()
+    ...
+    print(server.stats.as_dict(), socketstats.get_stats().as_dict())
+
+For SSL sockets, the bytes and calls are those of the encrypted
+channel's reads and writes, counted in plaintext bytes.
+
+.. versionadded:: 1.3a1
+"""
+from __future__ import absolute_import
+
+__all__ = [
+    'SocketStats',
+    'disable',
+    'enable',
+    'get_stats',
+]
+
+_DEFAULT = object()
+
+
+class SocketStats(object):
+    """
+    SocketStats(parent=<the global stats>)
+
+    Counters that sockets add to as they perform I/O. Whatever is
+    counted is also added to *parent*, which defaults to the object
+    returned by :func:`get_stats`; pass None to keep the counts
+    private.
+
+    Only sockets update the counters; read them directly or with
+    :meth:`as_dict`.
+    """
+
+    __slots__ = (
+        'parent',
+        'bytes_received',
+        'bytes_sent',
+        'recv_calls',
+        'send_calls',
+        'read_retries',
+        'write_retries',
+        'read_wait',
+        'write_wait',
+    )
+
+    def __init__(self, parent=_DEFAULT):
+        self.parent = _global if parent is _DEFAULT else parent
+        self.reset()
+
+    def reset(self):
+        """
+        Set all the counters back to zero. The parent isn't changed.
+        """
+        #: Bytes returned by receive calls.
+        self.bytes_received = 0
+        #: Bytes accepted by send calls.
+        self.bytes_sent = 0
+        #: Receive calls that returned data or the end of the stream.
+        self.recv_calls = 0
+        #: Send calls that accepted data.
+        self.send_calls = 0
+        #: How many times an operation would have blocked reading
+        #: (``EAGAIN``) and the greenlet waited for the socket to
+        #: become readable. Each of these is one more system call.
+        self.read_retries = 0
+        #: Like :attr:`read_retries`, waiting for the socket to become
+        #: writable.
+        self.write_retries = 0
+        #: The total seconds spent waiting for sockets to become
+        #: readable.
+        self.read_wait = 0.0
+        #: The total seconds spent waiting for sockets to become
+        #: writable.
+        self.write_wait = 0.0
+
+    def received(self, nbytes):
+        stats = self
+        while stats is not None:
+            stats.recv_calls += 1
+            stats.bytes_received += nbytes
+            stats = stats.parent
+
+    def sent(self, nbytes):
+        stats = self
+        while stats is not None:
+            stats.send_calls += 1
+            stats.bytes_sent += nbytes
+            stats = stats.parent
+
+    def waited(self, write, seconds):
+        stats = self
+        if write:
+            while stats is not None:
+                stats.write_retries += 1
+                stats.write_wait += seconds
+                stats = stats.parent
+        else:
+            while stats is not None:
+                stats.read_retries += 1
+                stats.read_wait += seconds
+                stats = stats.parent
+
+    def as_dict(self):
+        """
+        Return a dictionary of the counters.
+        """
+        return dict((name, getattr(self, name)) for name in self.__slots__[1:])
+
+    def __repr__(self):
+        return '<%s at 0x%x in=%d out=%d recv_calls=%d send_calls=%d retries=%d/%d wait=%.6f/%.6f>' % (
+            self.__class__.__name__, id(self),
+            self.bytes_received, self.bytes_sent,
+            self.recv_calls, self.send_calls,
+            self.read_retries, self.write_retries,
+            self.read_wait, self.write_wait)
+
+
+_global = SocketStats(None)
+
+
+def get_stats():
+    """
+    Return the global :class:`SocketStats`.
+    """
+    return _global
+
+
+def enable():
+    """
+    Make gevent sockets that don't have a :class:`SocketStats` of
+    their own count into the global one.
+    """
+    from gevent.socket import socket
+    socket._stats = _global
+
+
+def disable():
+    """
+    Undo :func:`enable`. Sockets with a :class:`SocketStats` of their
+    own, such as those accepted by a server with
+    :attr:`~gevent.baseserver.BaseServer.stats`, keep counting.
+    """
+    from gevent.socket import socket
+    socket._stats = None
@@ -122,6 +122,9 @@ class Timeout(BaseException):
        timer that will never be started.
     .. versionchanged:: 1.1
        Add warning about negative *seconds* values.
+    .. versionchanged:: 1.3a1
+       The timer comes from :meth:`gevent.hub.Hub.timer`, so it is
+       kept in the hub's timing wheel if one is configured.
     """
 
     def __init__(self, seconds=None, exception=None, ref=True, priority=-1, _use_timer=True):
@@ -137,7 +140,7 @@ class Timeout(BaseException):
             # Plus, in general, it should be more efficient
             self.timer = _FakeTimer
         else:
-            self.timer = get_hub().loop.timer(seconds or 0.0, ref=ref, priority=priority)
+            self.timer = get_hub().timer(seconds or 0.0, ref=ref, priority=priority)
 
     def start(self):
         """Schedule the timeout."""
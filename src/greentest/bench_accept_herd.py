@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+"""
+Count how often servers in several processes sharing one listening
+socket are woken up with nothing to accept, with and without
+``exclusive_accept``.
+"""
+from __future__ import print_function
+import os
+import resource
+import sys
+import socket
+import time
+import gevent
+from gevent.server import StreamServer
+
+WORKERS = 16
+CONNECTIONS = 1000
+
+
+def reply(sock, address):
+    sock.sendall(b'x')
+
+
+def worker(listener, exclusive, control, results):
+    # Wakeups of the process (each one a voluntary context switch),
+    # wakeups of the server that accepted nothing, connections accepted.
+    # The kernel checks that the socket is still readable before
+    # returning from epoll_wait, so when another process got the
+    # connection first, most wakeups never reach the server.
+    counts = [0, 0, 0]
+
+    class Server(StreamServer):
+        exclusive_accept = exclusive
+
+        def _do_read(self):
+            accepted = counts[2]
+            StreamServer._do_read(self)
+            if counts[2] == accepted:
+                counts[1] += 1
+
+        def do_handle(self, *args):
+            counts[2] += 1
+            StreamServer.do_handle(self, *args)
+
+    server = Server(listener, reply)
+    server.start()
+    switches = resource.getrusage(resource.RUSAGE_SELF).ru_nvcsw
+    gevent.socket.wait_read(control)
+    counts[0] = resource.getrusage(resource.RUSAGE_SELF).ru_nvcsw - switches
+    server.stop()
+    os.write(results, ('%d %d %d\n' % tuple(counts)).encode('ascii'))
+
+
+def run(exclusive):
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(128)
+    listener.setblocking(0)
+    address = listener.getsockname()
+    control_r, control_w = os.pipe()
+    results_r, results_w = os.pipe()
+
+    pids = []
+    for _ in range(WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            os.close(control_w)
+            os.close(results_r)
+            try:
+                worker(listener, exclusive, control_r, results_w)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(control_r)
+    os.close(results_w)
+    listener.close()
+    time.sleep(0.5)
+
+    start = time.time()
+    for _ in range(CONNECTIONS):
+        client = socket.create_connection(address)
+        client.recv(1)
+        client.close()
+    spent = time.time() - start
+
+    os.close(control_w)
+    output = b''
+    while True:
+        data = os.read(results_r, 4096)
+        if not data:
+            break
+        output += data
+    os.close(results_r)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    wakeups, spurious, accepts = [
+        sum(column) for column in zip(*[[int(x) for x in line.split()]
+                                        for line in output.decode('ascii').splitlines()])]
+    print('exclusive_accept=%-5s %d connections in %.2fs: '
+          '%d process wakeups (%.1f per connection), %d server wakeups with nothing to accept' % (
+              exclusive, accepts, spent, wakeups, float(wakeups) / max(accepts, 1), spurious))
+
+
+def main():
+    if not sys.platform.startswith('linux'):
+        sys.exit('EPOLLEXCLUSIVE is Linux-only')
+    run(False)
+    run(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+"""
+Measure the resident memory of idle keep-alive connections to a
+WSGIServer, with and without ``park_idle``.
+"""
+from __future__ import print_function
+import subprocess
+import sys
+
+CONNECTIONS = 5000
+
+
+def application(_environ, start_response):
+    start_response('200 OK', [('Content-Length', '2')])
+    return [b'ok']
+
+
+def rss():
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    import resource
+    return pages * resource.getpagesize()
+
+
+def measure(park):
+    import gevent
+    from gevent import socket
+    from gevent.pywsgi import WSGIServer
+
+    server = WSGIServer(('127.0.0.1', 0), application, log=None)
+    server.park_idle = park
+    server.start()
+
+    def request(sock):
+        sock.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        response = b''
+        while not response.endswith(b'ok'):
+            response += sock.recv(1024)
+
+    def connect():
+        sock = socket.create_connection(('127.0.0.1', server.server_port))
+        request(sock)
+        return sock
+
+    # Warm up allocators and caches.
+    for sock in [connect() for _ in range(100)]:
+        sock.close()
+    gevent.sleep(0.1)
+    before = rss()
+    clients = [connect() for _ in range(CONNECTIONS)]
+    gevent.sleep(0.1)
+    after = rss()
+    # The connections still work.
+    for sock in clients[:10]:
+        request(sock)
+    print('park_idle=%-5s %d idle connections: %.0f bytes each' % (
+        park, len(clients), float(after - before) / len(clients)))
+
+
+def main():
+    if len(sys.argv) > 1:
+        measure(sys.argv[1] == 'True')
+        return
+    for park in False, True:
+        subprocess.check_call([sys.executable, __file__, str(park)])
+
+
+if __name__ == '__main__':
+    main()
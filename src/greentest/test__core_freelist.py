@@ -0,0 +1,112 @@
+import gc
+
+import greentest
+from gevent import core
+from gevent._ffi.freelist import FreeList
+
+
+class TestFreeList(greentest.TestCase):
+
+    def test_bounded(self):
+        freelist = FreeList(2)
+        self.assertIsNone(freelist.get())
+        self.assertTrue(freelist.put(1))
+        self.assertTrue(freelist.put(2))
+        self.assertFalse(freelist.put(3))
+        self.assertEqual(freelist.get(), 2)
+        stats = freelist.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+
+# The Cython loop embeds its watchers' structures in the watcher
+# objects themselves; only the CFFI loops have freelists.
+@greentest.skipIf(not hasattr(core.loop, 'freelist_stats'), "Only the CFFI loops recycle objects")
+class TestLoopFreeLists(greentest.TestCase):
+
+    switch_expected = False
+
+    def setUp(self):
+        super(TestLoopFreeLists, self).setUp()
+        self.loop = core.loop(default=False)
+
+    def tearDown(self):
+        self.loop.destroy()
+        super(TestLoopFreeLists, self).tearDown()
+
+    @greentest.skipOnPyPy("Callbacks are only recycled with reference counting")
+    def test_callbacks_recycled(self):
+        called = []
+        for i in range(10):
+            self.loop.run_callback(called.append, i)
+            self.loop.run()
+        self.assertEqual(called, list(range(10)))
+        stats = self.loop.freelist_stats()['callback']
+        self.assertEqual(stats['hits'], 9)
+        self.assertEqual(stats['misses'], 1)
+
+    @greentest.skipOnPyPy("Callbacks are only recycled with reference counting")
+    def test_kept_callbacks_not_recycled(self):
+        kept = self.loop.run_callback(lambda: None)
+        self.loop.run()
+        self.assertFalse(kept)
+        other = self.loop.run_callback(lambda: None)
+        self.assertIsNot(other, kept)
+        self.assertFalse(kept)
+        self.loop.run()
+
+    @greentest.skipOnLibuv("libuv handles are closed asynchronously and not recycled")
+    def test_watchers_recycled(self):
+        fired = []
+        for i in range(5):
+            timer = self.loop.timer(0.001)
+            timer.start(fired.append, i)
+            self.loop.run()
+            del timer
+            gc.collect()
+        self.assertEqual(fired, list(range(5)))
+        stats = self.loop.freelist_stats()['timer']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 4)
+
+    @greentest.skipOnLibuv("libuv handles are closed asynchronously and not recycled")
+    def test_structure_reused(self):
+        timer = self.loop.timer(0.001)
+        structure = timer._watcher
+        timer.start(lambda: None)
+        self.loop.run()
+        del timer
+        gc.collect()
+        timer = self.loop.timer(5, 5)
+        self.assertIs(timer._watcher, structure)
+        # Initialized again.
+        self.assertEqual(timer.at, 5)
+        self.assertFalse(timer.active)
+        self.assertFalse(timer.pending)
+
+    @greentest.skipOnLibuv("libuv handles are closed asynchronously and not recycled")
+    @greentest.skipOnWindows("Stdout can't be watched on Win32")
+    def test_io_not_recycled(self):
+        io = self.loop.io(1, 2)
+        structure = io._watcher
+        io.close()
+        del io
+        gc.collect()
+        io = self.loop.io(1, 2)
+        self.assertIsNot(io._watcher, structure)
+        io.close()
+        self.assertNotIn('io', self.loop.freelist_stats())
+
+    @greentest.skipOnLibuv("libuv handles are closed asynchronously and not recycled")
+    def test_active_watchers_not_recycled(self):
+        timer = self.loop.timer(10)
+        timer.start(lambda: None)
+        self.assertEqual(self.loop.freelist_stats().get('timer', {}).get('size', 0), 0)
+        timer.stop()
+
+
+if __name__ == '__main__':
+    greentest.main()
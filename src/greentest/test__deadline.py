@@ -0,0 +1,113 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent.deadline import Deadline
+from gevent.deadline import DeadlineExceeded
+from gevent.deadline import check_deadline
+from gevent.deadline import current_deadline
+from gevent.event import AsyncResult
+from gevent.event import Event
+from gevent.pool import Pool
+from gevent.pool import WorkerPool
+from gevent.queue import Queue
+
+SHORT = 0.05
+LONG = 10
+
+
+class TestDeadline(greentest.TestCase):
+
+    def _check_raises(self, func, *args):
+        with Deadline(SHORT) as deadline:
+            with self.assertRaises(DeadlineExceeded) as exc:
+                func(*args)
+            self.assertIs(exc.exception.deadline, deadline)
+
+    def test_queue_get(self):
+        self._check_raises(Queue().get)
+
+    def test_event_wait(self):
+        self._check_raises(Event().wait)
+
+    def test_event_wait_with_timeout(self):
+        # The deadline is raised even though a timeout normally
+        # just returns False.
+        self._check_raises(Event().wait, LONG)
+
+    def test_async_result_get(self):
+        self._check_raises(AsyncResult().get)
+
+    def test_socket_recv(self):
+        server = socket.socket()
+        self._close_on_teardown(server)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        client = socket.create_connection(server.getsockname())
+        self._close_on_teardown(client)
+        self._check_raises(client.recv, 1)
+
+    def test_sleep(self):
+        self._check_raises(gevent.sleep, LONG)
+
+    def test_expired_raises_before_blocking(self):
+        with Deadline(-1):
+            self.assertRaises(DeadlineExceeded, Queue().get)
+            self.assertRaises(DeadlineExceeded, check_deadline)
+
+    def test_ready_does_not_raise(self):
+        result = AsyncResult()
+        result.set(42)
+        queue = Queue()
+        queue.put(1)
+        with Deadline(-1):
+            self.assertEqual(result.get(), 42)
+            self.assertEqual(queue.get(), 1)
+
+    def test_custom_exception(self):
+        with Deadline(SHORT, exception=ValueError):
+            self.assertRaises(ValueError, Event().wait)
+
+    def test_nesting(self):
+        self.assertIsNone(current_deadline())
+        with Deadline(LONG) as outer:
+            self.assertIs(current_deadline(), outer)
+            with Deadline(LONG * 2):
+                # The earlier one still applies.
+                self.assertIs(current_deadline(), outer)
+            with Deadline(SHORT) as inner:
+                self.assertIs(current_deadline(), inner)
+                self.assertRaises(DeadlineExceeded, Event().wait)
+            self.assertIs(current_deadline(), outer)
+            self.assertFalse(Event().wait(SHORT))
+        self.assertIsNone(current_deadline())
+
+    def test_no_deadline_after_exit(self):
+        with Deadline(SHORT):
+            pass
+        gevent.sleep(SHORT * 2)
+        self.assertFalse(Event().wait(0.001))
+
+    def test_inherited_by_spawn(self):
+        with Deadline(SHORT) as deadline:
+            g = gevent.spawn(Event().wait)
+        # The block has exited, but the greenlet keeps the deadline.
+        self.assertIsNone(current_deadline())
+        g.join()
+        self.assertIsInstance(g.exception, DeadlineExceeded)
+        self.assertIs(g.exception.deadline, deadline)
+    test_inherited_by_spawn.error_fatal = False
+
+    def test_inherited_by_pools(self):
+        for pool in Pool(2), WorkerPool(2):
+            with Deadline(SHORT):
+                result = pool.spawn(Queue().get)
+            self.assertRaises(DeadlineExceeded, result.get)
+            # Later tasks don't inherit it.
+            self.assertEqual(pool.apply(current_deadline), None)
+            self.assertEqual(pool.spawn(gevent.sleep, SHORT * 2).get(), None)
+            pool.kill()
+    test_inherited_by_pools.error_fatal = False
+
+
+if __name__ == '__main__':
+    greentest.main()
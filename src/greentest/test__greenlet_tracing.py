@@ -0,0 +1,73 @@
+from __future__ import print_function
+import time
+
+import greentest
+import gevent
+from gevent.hub import get_hub
+from gevent._tracer import get_stats
+
+
+class TestGreenletTracing(greentest.TestCase):
+
+    def setUp(self):
+        super(TestGreenletTracing, self).setUp()
+        self.tracer = get_hub().start_greenlet_tracing()
+
+    def tearDown(self):
+        get_hub().stop_greenlet_tracing()
+        super(TestGreenletTracing, self).tearDown()
+
+    def test_start_is_idempotent(self):
+        self.assertIs(get_hub().start_greenlet_tracing(), self.tracer)
+
+    def test_run_time_and_switches(self):
+        def busy():
+            end = time.time() + 0.1
+            while time.time() < end:
+                pass
+            gevent.sleep(0)
+
+        def lazy():
+            gevent.sleep(0)
+
+        busy_glet = gevent.spawn(busy)
+        lazy_glet = gevent.spawn(lazy)
+        gevent.joinall([busy_glet, lazy_glet])
+
+        stats = busy_glet.run_stats
+        self.assertIsNotNone(stats)
+        self.assertGreaterEqual(stats.run_time, 0.09)
+        self.assertEqual(stats.switch_count, 2)
+        self.assertLessEqual(stats.last_run, time.time())
+
+        self.assertLess(lazy_glet.run_stats.run_time, stats.run_time)
+
+        top = self.tracer.top(1)
+        self.assertEqual(top, [(busy_glet, stats)])
+        ours = [g for g, _ in self.tracer.top(len(self.tracer))
+                if g in (busy_glet, lazy_glet)]
+        self.assertEqual(ours, [busy_glet, lazy_glet])
+
+    def test_top_leaves_out_hub(self):
+        hub = get_hub()
+        gevent.sleep(0.05)
+        self.assertIsNotNone(get_stats(hub))
+        self.assertNotIn(hub, [g for g, _ in self.tracer.top(len(self.tracer))])
+
+    def test_not_traced(self):
+        get_hub().stop_greenlet_tracing()
+        g = gevent.spawn(lambda: None)
+        g.join()
+        self.assertIsNone(g.run_stats)
+
+    def test_reset(self):
+        g = gevent.spawn(gevent.sleep, 0)
+        g.join()
+        self.assertGreater(g.run_stats.switch_count, 0)
+        self.tracer.reset()
+        self.assertEqual(g.run_stats.switch_count, 0)
+        self.assertEqual(g.run_stats.run_time, 0.0)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,92 @@
+import gc
+
+import greentest
+import gevent
+from gevent import socket
+from gevent.hub import get_hub
+
+
+@greentest.skipOnLibuv("No prepare watchers")
+@greentest.skipOnPyPy("PyPy's collector is already incremental")
+class TestIdleGC(greentest.TestCase):
+
+    def setUp(self):
+        super(TestIdleGC, self).setUp()
+        self.thresholds = gc.get_threshold()
+
+    def tearDown(self):
+        get_hub().stop_idle_gc()
+        self.assertEqual(gc.get_threshold(), self.thresholds)
+        super(TestIdleGC, self).tearDown()
+
+    def _make_due(self, collector):
+        while gc.get_count()[2] < collector.threshold:
+            gc.collect(1)
+
+    def test_collects_when_idle(self):
+        collector = get_hub().start_idle_gc(threshold=2)
+        self.assertIs(get_hub().start_idle_gc(), collector)
+        self.assertGreater(gc.get_threshold()[2], 1000)
+
+        self._make_due(collector)
+        gevent.sleep(0.01)
+        self.assertEqual(collector.idle_collections, 1)
+        self.assertEqual(collector.forced_collections, 0)
+        self.assertEqual(collector.histogram.count, 1)
+        self.assertLess(gc.get_count()[2], collector.threshold)
+
+    def test_forced_when_busy(self):
+        collector = get_hub().start_idle_gc(threshold=2, max_deferral=0.05)
+        self._make_due(collector)
+
+        def busy():
+            while collector.collections == 0:
+                gevent.sleep(0)
+
+        # Keep one pending callback queued in every loop iteration.
+        glets = [gevent.spawn(busy) for _ in range(2)]
+        with gevent.Timeout(2):
+            gevent.joinall(glets)
+        self.assertEqual(collector.forced_collections, 1)
+        self.assertEqual(collector.idle_collections, 0)
+
+    def test_forced_when_io_pending(self):
+        collector = get_hub().start_idle_gc(threshold=2, max_deferral=0.05)
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        self._make_due(collector)
+
+        def ping_pong(sock):
+            # Every iteration of the loop has a read event.
+            while collector.collections == 0:
+                sock.sendall(b'x')
+                sock.recv(1)
+            # Let the other one see it too.
+            sock.sendall(b'x')
+
+        glets = [gevent.spawn(ping_pong, a), gevent.spawn(ping_pong, b)]
+        with gevent.Timeout(2):
+            gevent.joinall(glets)
+        self.assertEqual(collector.forced_collections, 1)
+        self.assertEqual(collector.idle_collections, 0)
+
+    def test_not_due(self):
+        collector = get_hub().start_idle_gc(threshold=1000)
+        gevent.sleep(0.01)
+        self.assertEqual(collector.collections, 0)
+
+
+@greentest.skipIf(not greentest.LIBUV, "libuv only")
+class TestLibuv(greentest.TestCase):
+
+    def test_rejected(self):
+        thresholds = gc.get_threshold()
+        with self.assertRaises(TypeError):
+            get_hub().start_idle_gc()
+        self.assertIsNone(get_hub().idle_collector)
+        self.assertEqual(gc.get_threshold(), thresholds)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,72 @@
+import time
+
+import greentest
+from gevent import core
+
+
+class TestCallbackLimits(greentest.TestCase):
+
+    switch_expected = False
+
+    def setUp(self):
+        super(TestCallbackLimits, self).setUp()
+        self.loop = core.loop(default=False)
+        self.called = []
+
+    def tearDown(self):
+        self.loop.destroy()
+        super(TestCallbackLimits, self).tearDown()
+
+    def _schedule(self, count, func=None):
+        func = func or self.called.append
+        return [self.loop.run_callback(func, i) for i in range(count)]
+
+    def test_count_limit(self):
+        self.loop.callback_count_limit = 10
+        self._schedule(25)
+        self.loop.run(once=True)
+        self.assertEqual(self.called, list(range(10)))
+        self.assertEqual(self.loop.callbacks_run, 10)
+        self.assertEqual(self.loop.callback_deferrals, 1)
+        self.assertEqual(self.loop.callbacks_deferred, 15)
+
+        self.loop.run()
+        self.assertEqual(self.called, list(range(25)))
+        self.assertEqual(self.loop.callbacks_run, 25)
+        self.assertEqual(self.loop.callback_deferrals, 2)
+        self.assertEqual(self.loop.callbacks_deferred, 20)
+
+    def test_time_budget(self):
+        self.loop.callback_time_budget = 0.015
+
+        def slow(i):
+            self.called.append(i)
+            time.sleep(0.01)
+
+        self._schedule(5, slow)
+        self.loop.run(once=True)
+        self.assertEqual(self.called, [0, 1])
+        self.assertEqual(self.loop.callback_deferrals, 1)
+
+        self.loop.run()
+        self.assertEqual(self.called, list(range(5)))
+
+    def test_callbacks_scheduled_while_running(self):
+        def add_more(i):
+            self.called.append(i)
+            if i < 3:
+                self.loop.run_callback(add_more, i + 1)
+
+        self.loop.run_callback(add_more, 0)
+        self.loop.run()
+        self.assertEqual(self.called, [0, 1, 2, 3])
+
+    def test_stopped_callbacks_do_not_keep_loop_alive(self):
+        for cb in self._schedule(3):
+            cb.stop()
+        self.loop.run()
+        self.assertEqual(self.called, [])
+
+
+if __name__ == '__main__':
+    greentest.main()
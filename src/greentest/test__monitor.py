@@ -0,0 +1,96 @@
+from __future__ import print_function
+import time
+
+import greentest
+import gevent
+from gevent import socket
+from gevent.hub import get_hub
+from gevent._monitor import BlockingMonitor
+from gevent._monitor import LoopLagHistogram
+
+
+class TestLoopLagHistogram(greentest.TestCase):
+
+    def test_buckets(self):
+        hist = LoopLagHistogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            hist.add(value)
+        self.assertEqual(hist.items(), [(0.1, 2), (1.0, 1), (float('inf'), 1)])
+        self.assertEqual(hist.count, 4)
+        self.assertEqual(hist.max, 2.0)
+        self.assertEqual(hist.percentile(50), 0.1)
+        self.assertEqual(hist.percentile(100), 2.0)
+
+        hist.reset()
+        self.assertEqual(hist.count, 0)
+        self.assertEqual(hist.percentile(99), 0.0)
+
+
+class TestBlockingMonitor(greentest.TestCase):
+
+    def setUp(self):
+        super(TestBlockingMonitor, self).setUp()
+        self.reports = []
+        self.monitor = get_hub().start_blocking_monitor(
+            0.05,
+            lambda *args: self.reports.append(args))
+
+    def tearDown(self):
+        get_hub().stop_blocking_monitor()
+        super(TestBlockingMonitor, self).tearDown()
+
+    def test_start_is_idempotent(self):
+        self.assertIs(get_hub().start_blocking_monitor(), self.monitor)
+
+    def test_reports_blocking_greenlet(self):
+        def block():
+            # A real, native sleep, keeping the hub from running.
+            time.sleep(0.3)
+
+        g = gevent.spawn(block)
+        g.join()
+        gevent.sleep(0.1)
+
+        self.assertEqual(len(self.reports), 1, self.reports)
+        greenlet, blocked_for, stack = self.reports[0]
+        self.assertIs(greenlet, g)
+        self.assertGreaterEqual(blocked_for, 0.05)
+        self.assertIn('block', ''.join(stack))
+        self.assertGreater(self.monitor.histogram.max, 0.2)
+
+    def test_reports_blocking_after_io(self):
+        # The greenlet is woken by an I/O watcher, which libuv runs
+        # inside its poll.
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+
+        def block():
+            a.recv(1)
+            time.sleep(0.3)
+
+        g = gevent.spawn(block)
+        gevent.sleep(0.1)
+        b.sendall(b'x')
+        g.join()
+        gevent.sleep(0.1)
+        self.assertEqual(len(self.reports), 1, self.reports)
+        self.assertIs(self.reports[0][0], g)
+
+    def test_idle_loop_not_reported(self):
+        gevent.sleep(0.3)
+        self.assertEqual(self.reports, [])
+        self.assertGreater(self.monitor.histogram.count, 0)
+
+
+class TestUnsupportedLoop(greentest.TestCase):
+
+    def test_start(self):
+        class Hub(object):
+            loop = object()
+        with self.assertRaises(TypeError):
+            BlockingMonitor(Hub()).start()
+
+
+if __name__ == '__main__':
+    greentest.main()
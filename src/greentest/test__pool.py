@@ -303,10 +303,11 @@ TIMEOUT1, TIMEOUT2, TIMEOUT3 = 0.082, 0.035, 0.14
 class TestPool(greentest.TestCase):
     __timeout__ = 5 if not greentest.RUNNING_ON_APPVEYOR else 20
     size = 1
+    klass = pool.Pool
 
     def setUp(self):
         greentest.TestCase.setUp(self)
-        self.pool = pool.Pool(self.size)
+        self.pool = self.klass(self.size)
 
     def cleanup(self):
         self.pool.join()
@@ -474,6 +475,20 @@ class TestPoolUnlimit(TestPool):
     size = None
 
 
+class TestWorkerPool(TestPool):
+    klass = pool.WorkerPool
+
+
+class TestWorkerPool3(TestPool):
+    klass = pool.WorkerPool
+    size = 3
+
+
+class TestWorkerPoolUnlimit(TestPool):
+    klass = pool.WorkerPool
+    size = None
+
+
 class TestPool0(greentest.TestCase):
     size = 0
 
@@ -569,13 +584,14 @@ def divide_by(x):
 
 class TestErrorInHandler(greentest.TestCase):
     error_fatal = False
+    klass = pool.Pool
 
     def test_map(self):
-        p = pool.Pool(3)
+        p = self.klass(3)
         self.assertRaises(ZeroDivisionError, p.map, divide_by, [1, 0, 2])
 
     def test_imap(self):
-        p = pool.Pool(1)
+        p = self.klass(1)
         it = p.imap(divide_by, [1, 0, 2])
         self.assertEqual(next(it), 1.0)
         self.assertRaises(ZeroDivisionError, next, it)
@@ -583,7 +599,7 @@ class TestErrorInHandler(greentest.TestCase):
         self.assertRaises(StopIteration, next, it)
 
     def test_imap_unordered(self):
-        p = pool.Pool(1)
+        p = self.klass(1)
         it = p.imap_unordered(divide_by, [1, 0, 2])
         self.assertEqual(next(it), 1.0)
         self.assertRaises(ZeroDivisionError, next, it)
@@ -591,5 +607,92 @@ class TestErrorInHandler(greentest.TestCase):
         self.assertRaises(StopIteration, next, it)
 
 
+class TestErrorInHandlerWorkerPool(TestErrorInHandler):
+    klass = pool.WorkerPool
+
+
+class TestCoroutineWorkerPool(TestCoroutinePool):
+    klass = pool.WorkerPool
+
+
+class TestWorkerPoolWorkers(greentest.TestCase):
+
+    def test_workers_reused(self):
+        p = pool.WorkerPool(2)
+        workers = set(p.map(lambda _: gevent.getcurrent(), range(100)))
+        self.assertLessEqual(len(workers), 2)
+        self.assertEqual(workers, p.workers)
+        self.assertEqual(len(p), 0)
+        p.kill()
+        self.assertEqual(p.workers, set())
+
+    def test_spawn_returns_result(self):
+        p = pool.WorkerPool(1)
+        result = p.spawn(sqr, 3)
+        self.assertIsInstance(result, pool.TaskResult)
+        self.assertEqual(len(p), 1)
+        self.assertTrue(p.full())
+        self.assertEqual(result.get(), 9)
+        self.assertTrue(result.successful())
+        self.assertTrue(p.join())
+        self.assertEqual(p.free_count(), 1)
+        p.kill()
+
+    def test_error_keeps_worker(self):
+        p = pool.WorkerPool(1)
+        result = p.spawn(divide_by, 0)
+        self.assertRaises(ZeroDivisionError, result.get)
+        self.assertIsInstance(result.exception, ZeroDivisionError)
+        worker, = p.workers
+        self.assertEqual(p.apply(divide_by, (2,)), 0.5)
+        self.assertEqual(p.workers, set([worker]))
+        p.kill()
+    test_error_keeps_worker.error_fatal = False
+
+    def test_link(self):
+        p = pool.WorkerPool(1)
+        linked = []
+        result = p.spawn(sqr, 4)
+        result.link(lambda r: linked.append(('link', r)))
+        result.link_value(lambda r: linked.append(('value', r)))
+        result.link_exception(lambda r: linked.append(('exception', r)))
+        result.get()
+        gevent.sleep(0.01)
+        self.assertEqual(sorted(linked), [('link', result), ('value', result)])
+        p.kill()
+
+    def test_kill_resolves_tasks(self):
+        p = pool.WorkerPool(2)
+        running = p.spawn(gevent.sleep, 10)
+        gevent.sleep(0)
+        queued = p.spawn(gevent.sleep, 10)
+        p.kill(ExpectedException)
+        self.assertIsInstance(running.exception, ExpectedException)
+        self.assertIsInstance(queued.exception, ExpectedException)
+        self.assertEqual(len(p), 0)
+        self.assertEqual(p.workers, set())
+
+        running = p.spawn(gevent.sleep, 10)
+        gevent.sleep(0)
+        p.kill()
+        self.assertTrue(running.successful())
+        self.assertIsInstance(running.value, gevent.GreenletExit)
+        # Still usable.
+        self.assertEqual(p.apply(sqr, (5,)), 25)
+        p.kill()
+
+    def test_task_exit_replaces_worker(self):
+        p = pool.WorkerPool(1)
+
+        def exit():
+            raise gevent.GreenletExit
+
+        first = p.spawn(exit)
+        second = p.spawn(sqr, 6)
+        self.assertIsInstance(first.get(), gevent.GreenletExit)
+        self.assertEqual(second.get(), 36)
+        p.kill()
+
+
 if __name__ == '__main__':
     greentest.main()
@@ -0,0 +1,124 @@
+from __future__ import print_function
+import os
+import signal
+
+import greentest
+import gevent
+from gevent import socket
+from gevent.server import StreamServer
+from gevent.server import SO_REUSEPORT
+
+HOST = '127.0.0.1'
+
+
+def handle(sock, _address):
+    sock.sendall(str(os.getpid()).encode('ascii'))
+    if sock.recv(100) == b'slow':
+        gevent.sleep(0.5)
+        sock.sendall(b'done')
+
+
+@greentest.skipIf(not hasattr(os, 'fork'), "Requires fork")
+class TestPrefork(greentest.TestCase):
+
+    __timeout__ = 10
+    reuse_port = False
+
+    def _make_server(self):
+        return StreamServer((HOST, 0), handle)
+
+    def setUp(self):
+        super(TestPrefork, self).setUp()
+        from gevent.prefork import Prefork
+        self.server = self._make_server()
+        self.prefork = Prefork(self.server, workers=2, reuse_port=self.reuse_port, stop_timeout=1)
+        self.prefork.restart_delay = 0.01
+        self.prefork.start()
+
+    def tearDown(self):
+        self.prefork.stop()
+        super(TestPrefork, self).tearDown()
+
+    def _connect(self):
+        return socket.create_connection((HOST, self.server.server_port))
+
+    def _worker_pid(self):
+        sock = self._connect()
+        try:
+            return int(sock.recv(100))
+        finally:
+            sock.close()
+
+    def test_workers_serve(self):
+        self.assertEqual(len(self.prefork.workers), 2)
+        pids = set(self._worker_pid() for _ in range(20))
+        self.assertTrue(pids)
+        self.assertTrue(pids.issubset(self.prefork.workers))
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_restart(self):
+        victim = list(self.prefork.workers)[0]
+        os.kill(victim, signal.SIGKILL)
+        with gevent.Timeout(5):
+            while self.prefork.restarts < 1 or len(self.prefork.workers) < 2:
+                gevent.sleep(0.05)
+        self.assertNotIn(victim, self.prefork.workers)
+        self._worker_pid()
+
+    def test_stop(self):
+        pids = list(self.prefork.workers)
+        self.prefork.stop()
+        self.assertEqual(self.prefork.workers, {})
+        self.assertTrue(self.server.closed)
+        for pid in pids:
+            with self.assertRaises(OSError):
+                os.kill(pid, 0)
+
+    def test_stop_finishes_requests(self):
+        sock = self._connect()
+        try:
+            # A worker is handling the connection once it answers.
+            int(sock.recv(100))
+            sock.sendall(b'slow')
+            gevent.sleep(0.1)
+            self.prefork.stop()
+            self.assertEqual(sock.recv(100), b'done')
+        finally:
+            sock.close()
+
+
+if SO_REUSEPORT is not None:
+
+    class TestPreforkReusePort(TestPrefork):
+
+        reuse_port = True
+
+        def _make_server(self):
+            # Each worker binds its own socket, so we need a fixed port.
+            probe = socket.socket()
+            probe.bind((HOST, 0))
+            port = probe.getsockname()[1]
+            probe.close()
+            return StreamServer((HOST, port), handle)
+
+        def _connect(self):
+            with gevent.Timeout(5):
+                while True:
+                    try:
+                        return socket.create_connection((HOST,
+                                                         self.server.server_port))
+                    except socket.error:
+                        # The workers may not have bound yet.
+                        gevent.sleep(0.05)
+
+        def test_stop(self):
+            pids = list(self.prefork.workers)
+            self.prefork.stop()
+            self.assertEqual(self.prefork.workers, {})
+            for pid in pids:
+                with self.assertRaises(OSError):
+                    os.kill(pid, 0)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -29,6 +29,7 @@ try:
 except ImportError:
     # Python 2
     from cgi import parse_qs
+import io
 import os
 import sys
 try:
@@ -543,6 +544,66 @@ class TestCloseIter(TestCase):
         # We got closed exactly once.
         self.assertEqual(self.closed, 1)
 
+class TestFileWrapper(TestCase):
+
+    validator = None
+    data = b''.join(str(i).encode('ascii') for i in range(20000))
+    reads = 0
+
+    def setUp(self):
+        import tempfile
+        fd, self.filename = tempfile.mkstemp()
+        os.write(fd, self.data)
+        os.close(fd)
+        TestCase.setUp(self)
+
+    def tearDown(self):
+        TestCase.tearDown(self)
+        os.remove(self.filename)
+
+    def application(self, env, start_response):
+        test = self
+
+        class File(io.FileIO):
+            def read(self, *args):
+                test.reads += 1
+                return io.FileIO.read(self, *args)
+
+        path = env['PATH_INFO']
+        headers = [('Content-Type', 'application/octet-stream')]
+        if path == '/length':
+            headers.append(('Content-Length', '100'))
+        start_response('200 OK', headers)
+        if path == '/bytesio':
+            f = io.BytesIO(self.data)
+        else:
+            f = self.f = File(self.filename, 'rb')
+        f.seek(10)
+        return env['wsgi.file_wrapper'](f, 4096)
+
+    def _get(self, path, **kwargs):
+        fd = self.makefile()
+        fd.write('GET %s HTTP/1.1\r\nHost: localhost\r\n\r\n' % path)
+        return read_http(fd, **kwargs)
+
+    def test_sendfile(self):
+        response = self._get('/', body=self.data[10:])
+        self.assertTrue(self.f.closed)
+        if hasattr(socket.socket, 'sendfile'):
+            response.assertHeader('Content-Length', str(len(self.data) - 10))
+            self.assertFalse(response.chunks)
+            # The data didn't come through read()
+            self.assertEqual(self.reads, 0)
+
+    def test_content_length(self):
+        response = self._get('/length', body=self.data[10:110])
+        self.assertFalse(response.chunks)
+
+    def test_not_a_file(self):
+        response = self._get('/bytesio', body=self.data[10:])
+        self.assertEqual(len(response.chunks), (len(self.data) - 10 + 4095) // 4096)
+
+
 class TestChunkedApp(TestCase):
 
     chunks = [b'this', b'is', b'chunked']
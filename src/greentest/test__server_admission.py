@@ -0,0 +1,93 @@
+import time
+from timeit import default_timer
+
+import greentest
+import gevent
+from gevent import socket
+from gevent.server import StreamServer
+from gevent.pywsgi import WSGIServer
+
+
+def application(_environ, start_response):
+    start_response('200 OK', [('Content-Length', '2')])
+    return [b'ok']
+
+
+class TestAdmissionControl(greentest.TestCase):
+
+    def _start(self, server):
+        server.max_lag = 0.01
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _connect(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_port))
+        self._close_on_teardown(sock)
+        return sock
+
+    def _overload(self, server):
+        # As measured with the loop a second behind.
+        while not server.overloaded:
+            server._admission._due = default_timer() - 1
+            server._admission._measure()
+
+    def test_lagging_loop(self):
+        handled = []
+        server = self._start(StreamServer(('127.0.0.1', 0), lambda s, a: handled.append(a)))
+        hogging = [True]
+
+        def hog():
+            while hogging:
+                time.sleep(0.03)
+                gevent.sleep(0.001)
+        hogger = gevent.spawn(hog)
+        with gevent.Timeout(2):
+            while not server.overloaded:
+                gevent.sleep(0.01)
+        self.assertEqual(server.max_accept, 1)
+        self.assertGreater(server._admission.lag, server.max_lag)
+
+        # Left in the backlog until the loop catches up.
+        self._connect(server)
+        gevent.sleep(0.2)
+        self.assertEqual(handled, [])
+        del hogging[:]
+        hogger.join()
+        with gevent.Timeout(1):
+            while not handled:
+                gevent.sleep(0.01)
+        self.assertFalse(server.overloaded)
+
+        with gevent.Timeout(1):
+            while server.max_accept < 100:
+                gevent.sleep(0.01)
+
+    def test_stop_restores(self):
+        server = self._start(StreamServer(('127.0.0.1', 0), lambda s, a: None))
+        self._overload(server)
+        server.stop()
+        self.assertFalse(server.overloaded)
+        self.assertEqual(server.max_accept, 100)
+
+    def test_reject(self):
+        server = WSGIServer(('127.0.0.1', 0), application, log=None)
+        server.reject_overload = True
+        self._start(server)
+        self._overload(server)
+
+        client = self._connect(server)
+        client.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertTrue(client.recv(1024).startswith(b'HTTP/1.1 503 '))
+        self.assertEqual(client.recv(1), b'')
+
+        server._admission._due = default_timer()
+        server._admission._measure()
+        self.assertFalse(server.overloaded)
+        client = self._connect(server)
+        client.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertTrue(client.recv(1024).startswith(b'HTTP/1.1 200 '))
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+import greentest
+import gevent
+from gevent import socket
+from gevent.event import Event
+from gevent.server import DatagramServer
+
+
+class TestDatagramServer(greentest.TestCase):
+
+    batch_size = None
+    server = None
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        self.received = []
+        self.done = Event()
+        self.expected = 0
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.close()
+        greentest.TestCase.tearDown(self)
+
+    def _start(self, handle, address='127.0.0.1:0', **kwargs):
+        self.server = DatagramServer(address, handle, **kwargs)
+        self.server.start()
+        return self.server
+
+    def _client(self, family=socket.AF_INET, host='127.0.0.1'):
+        client = socket.socket(family, socket.SOCK_DGRAM)
+        self._close_on_teardown(client)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        client.bind((host, 0))
+        return client
+
+    def _record(self, data, address):
+        self.received.append((data, address))
+        if len(self.received) >= self.expected:
+            self.done.set()
+
+    def test_single(self):
+        server = self._start(self._record)
+        client = self._client()
+        self.expected = 1
+        client.sendto(b'hello', server.address)
+        self.done.wait(5)
+        self.assertEqual(self.received, [(b'hello', client.getsockname())])
+
+    def test_batch(self):
+        batches = []
+
+        def handle(batch):
+            batches.append(batch)
+            for data, address in batch:
+                self._record(data, address)
+
+        server = self._start(handle, batch_size=8)
+        client = self._client()
+        self.expected = 50
+        messages = [('%d' % i).encode('ascii') for i in range(self.expected)]
+        for message in messages:
+            client.sendto(message, server.address)
+        self.done.wait(5)
+        self.assertEqual([data for data, _ in self.received], messages)
+        self.assertEqual(set(address for _, address in self.received),
+                         set([client.getsockname()]))
+        self.assertLess(len(batches), len(messages))
+        self.assertLessEqual(max(len(batch) for batch in batches), 8)
+
+    def test_batch_without_recvmmsg(self):
+        from gevent import _mmsg
+        recvmmsg = _mmsg.recvmmsg
+        _mmsg.recvmmsg = None
+        try:
+            self.test_batch()
+            self.assertIsNone(self.server._recvmmsg)
+        finally:
+            _mmsg.recvmmsg = recvmmsg
+
+    def test_bad_batch_size(self):
+        self.assertRaises(ValueError, DatagramServer, '127.0.0.1:0', self._record, batch_size=0)
+
+    def _check_sendto_many(self, host, family, messages_to):
+        client = self._client(family, host)
+        server = self._start(lambda *args: None, address=(host, 0))
+        address = client.getsockname()
+        messages = [(('%d' % i).encode('ascii'), messages_to(address))
+                    for i in range(200)]
+        self.expected = len(messages)
+
+        def read():
+            while len(self.received) < self.expected:
+                self._record(*client.recvfrom(100))
+        reader = gevent.spawn(read)
+        server.sendto_many(messages)
+        self.done.wait(5)
+        reader.kill()
+        self.assertEqual([data for data, _ in self.received],
+                         [data for data, _ in messages])
+
+    def test_sendto_many(self):
+        self._check_sendto_many('127.0.0.1', socket.AF_INET, lambda address: address)
+
+    def test_sendto_many_hostname(self):
+        # Falls back to sendto()
+        self._check_sendto_many('127.0.0.1', socket.AF_INET,
+                                lambda address: ('localhost', address[1]))
+
+    @unittest.skipUnless(socket.has_ipv6, "Needs IPv6")
+    def test_sendto_many_ipv6(self):
+        self._check_sendto_many('::1', socket.AF_INET6, lambda address: address)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,93 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent.pywsgi import WSGIServer
+
+
+def application(name, delay=0):
+    def app(_environ, start_response):
+        gevent.sleep(delay)
+        start_response('200 OK', [('Content-Length', str(len(name)))])
+        return [name]
+    return app
+
+
+def read_response(sock):
+    response = b''
+    while b'\r\n\r\n' not in response:
+        data = sock.recv(4096)
+        if not data:
+            break
+        response += data
+    headers, _, body = response.partition(b'\r\n\r\n')
+    length = int(headers.lower().split(b'content-length: ')[1].split(b'\r\n')[0])
+    while len(body) < length:
+        body += sock.recv(4096)
+    return headers, body
+
+
+class TestDrain(greentest.TestCase):
+
+    def _server(self, app):
+        server = WSGIServer(('127.0.0.1', 0), app, log=None)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _connect(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_port))
+        self._close_on_teardown(sock)
+        return sock
+
+    def test_drain(self):
+        server = self._server(application(b'old', 0.3))
+        idle = self._connect(server)
+        idle.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertEqual(read_response(idle)[1], b'old')
+
+        busy = self._connect(server)
+        busy.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        gevent.sleep(0.1)
+
+        stopper = gevent.spawn(server.stop, timeout=5, drain=True)
+        with gevent.Timeout(1):
+            # The kept-alive connection is closed right away...
+            self.assertEqual(idle.recv(1), b'')
+            # ...and the request in progress finishes, closing its
+            # connection after the response.
+            headers, body = read_response(busy)
+            self.assertEqual(body, b'old')
+            self.assertIn(b'Connection: close', headers)
+            self.assertEqual(busy.recv(1), b'')
+            stopper.join()
+        self.assertTrue(server.draining)
+
+    def test_handoff(self):
+        old = self._server(application(b'old'))
+        port = old.server_port
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+
+        old.send_listener(a)
+        listener = WSGIServer.receive_listener(b)
+        self.assertEqual(listener.getsockname()[1], port)
+        new = WSGIServer(listener, application(b'new'), log=None)
+        new.start()
+        self.addCleanup(new.stop)
+        old.stop(drain=True)
+
+        client = self._connect(new)
+        client.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertEqual(read_response(client)[1], b'new')
+
+    def test_receive_closed(self):
+        a, b = socket.socketpair()
+        self._close_on_teardown(b)
+        a.close()
+        with self.assertRaises(ValueError):
+            WSGIServer.receive_listener(b)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,217 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent.pool import Pool
+from gevent.server import StreamServer
+from gevent.pywsgi import WSGIServer
+
+
+class EchoServer(StreamServer):
+
+    def handle(self, sock, _address):
+        while True:
+            self.mark_idle(sock)
+            try:
+                data = sock.recv(1024)
+            finally:
+                self.mark_active(sock)
+            if not data:
+                break
+            sock.sendall(data)
+
+
+def application(environ, start_response):
+    if environ['PATH_INFO'] == '/slow':
+        gevent.sleep(0.2)
+    start_response('200 OK', [('Content-Length', '2')])
+    return [b'ok']
+
+
+def request(sock, path=b'/'):
+    sock.sendall(b'GET ' + path + b' HTTP/1.1\r\nHost: x\r\n\r\n')
+    return read_response(sock)
+
+
+def read_response(sock):
+    response = b''
+    while not response.endswith(b'ok'):
+        data = sock.recv(1024)
+        if not data:
+            break
+        response += data
+    return response
+
+
+class ServerTestCase(greentest.TestCase):
+
+    def _start(self, server):
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _connect(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_port))
+        self._close_on_teardown(sock)
+        return sock
+
+
+class TestIdle(ServerTestCase):
+
+    def _echo(self, sock):
+        sock.sendall(b'hi')
+        self.assertEqual(sock.recv(2), b'hi')
+
+    def test_idle_timeout(self):
+        server = EchoServer(('127.0.0.1', 0))
+        server.idle_timeout = 0.1
+        self._start(server)
+        client = self._connect(server)
+        for _ in range(3):
+            # Activity keeps it open.
+            self._echo(client)
+            gevent.sleep(0.05)
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+        self.assertEqual(len(server._idle), 0)
+
+    def test_max_idle(self):
+        server = EchoServer(('127.0.0.1', 0))
+        server.max_idle = 2
+        self._start(server)
+        clients = []
+        for _ in range(3):
+            client = self._connect(server)
+            self._echo(client)
+            clients.append(client)
+        with gevent.Timeout(1):
+            self.assertEqual(clients[0].recv(1), b'')
+        for client in clients[1:]:
+            self._echo(client)
+
+    def test_keepalive_requests(self):
+        server = WSGIServer(('127.0.0.1', 0), application, log=None)
+        server.max_keepalive_requests = 2
+        self._start(server)
+        client = self._connect(server)
+        responses = [request(client) for _ in range(2)]
+        self.assertNotIn(b'Connection: close', responses[0])
+        self.assertIn(b'Connection: close', responses[1])
+        self.assertEqual(client.recv(1), b'')
+
+    def test_keepalive_idle_timeout(self):
+        server = WSGIServer(('127.0.0.1', 0), application, log=None)
+        server.idle_timeout = 0.1
+        self._start(server)
+        client = self._connect(server)
+        self.assertTrue(request(client).endswith(b'ok'))
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+
+    def test_partial_request_not_idle(self):
+        server = WSGIServer(('127.0.0.1', 0), application, log=None)
+        server.idle_timeout = 0.1
+        self._start(server)
+        client = self._connect(server)
+        self.assertTrue(request(client).endswith(b'ok'))
+        # The next request started arriving, so it's no longer idle,
+        # however long the rest takes.
+        client.sendall(b'GET / HT')
+        gevent.sleep(0.01)
+        server.close_idle()
+        gevent.sleep(0.3)
+        client.sendall(b'TP/1.1\r\nHost: x\r\n\r\n')
+        with gevent.Timeout(1):
+            self.assertTrue(read_response(client).endswith(b'ok'))
+
+
+class TestPark(ServerTestCase):
+
+    def _server(self, spawn='default', idle_timeout=None):
+        server = WSGIServer(('127.0.0.1', 0), application, log=None, spawn=spawn)
+        server.park_idle = True
+        server.idle_timeout = idle_timeout
+        return self._start(server)
+
+    def test_park(self):
+        server = self._server()
+        client = self._connect(server)
+        for _ in range(3):
+            self.assertTrue(request(client).endswith(b'ok'))
+            gevent.sleep(0.01)
+            self.assertEqual(len(server._parked), 1)
+            self.assertEqual(server._handling, 0)
+        client.close()
+        gevent.sleep(0.01)
+        self.assertEqual(server._parked, {})
+
+    def test_pipelined(self):
+        server = self._server()
+        client = self._connect(server)
+        client.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n' * 2)
+        response = b''
+        while response.count(b'ok') < 2:
+            response += client.recv(1024)
+        self.assertEqual(response.count(b'200 OK'), 2)
+
+    def test_parked_idle_timeout(self):
+        server = self._server(idle_timeout=0.1)
+        client = self._connect(server)
+        request(client)
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+        self.assertEqual(server._parked, {})
+
+    def test_full_pool(self):
+        server = self._server(Pool(1))
+        parked = self._connect(server)
+        request(parked)
+        busy = self._connect(server)
+        busy.sendall(b'GET /slow HTTP/1.1\r\nHost: x\r\n\r\n')
+        gevent.sleep(0.05)
+        # Resumed once the slow request is done.
+        with gevent.Timeout(1):
+            self.assertTrue(request(parked).endswith(b'ok'))
+            self.assertTrue(read_response(busy).endswith(b'ok'))
+
+    def test_drain(self):
+        server = self._server()
+        client = self._connect(server)
+        request(client)
+        server.stop(drain=True)
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+
+    def test_stop(self):
+        server = self._server(Pool(10))
+        client = self._connect(server)
+        request(client)
+        gevent.sleep(0.01)
+        server.stop(timeout=1)
+        self.assertEqual(server._parked, {})
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+
+    def test_stop_while_waiting_for_pool(self):
+        server = self._server(Pool(1))
+        parked = self._connect(server)
+        request(parked)
+        busy = self._connect(server)
+        busy.sendall(b'GET /slow HTTP/1.1\r\nHost: x\r\n\r\n')
+        gevent.sleep(0.05)
+        # Unparked, but waiting for room in the pool.
+        parked.sendall(b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+        gevent.sleep(0.01)
+        self.assertEqual(len(server._waiting), 1)
+        server.stop(timeout=0.1)
+        self.assertEqual(len(server._waiting), 0)
+        with gevent.Timeout(1):
+            try:
+                data = parked.recv(1)
+            except socket.error:
+                # Reset, closed with the request unread.
+                data = b''
+        self.assertEqual(data, b'')
+
+
+if __name__ == '__main__':
+    greentest.main()
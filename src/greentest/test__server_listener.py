@@ -0,0 +1,120 @@
+import _socket
+import select
+
+import greentest
+import gevent
+from gevent import socket
+from gevent import server
+from gevent.server import StreamServer
+
+
+class Server(StreamServer):
+    defer_accept = 1
+    fastopen = 16
+    rcvbuf = 32768
+
+
+class TestListenerOptions(greentest.TestCase):
+
+    def _listener(self, cls=Server):
+        listener = cls.get_listener(('127.0.0.1', 0), family=socket.AF_INET)
+        self._close_on_teardown(listener)
+        return listener
+
+    def test_defaults(self):
+        listener = self._listener(StreamServer)
+        if server.TCP_DEFER_ACCEPT is not None:
+            self.assertEqual(listener.getsockopt(_socket.IPPROTO_TCP, server.TCP_DEFER_ACCEPT), 0)
+
+    def test_rcvbuf(self):
+        listener = self._listener()
+        # Linux doubles the value to account for bookkeeping.
+        self.assertIn(listener.getsockopt(_socket.SOL_SOCKET, _socket.SO_RCVBUF),
+                      (32768, 65536))
+
+    @greentest.skipIf(server.TCP_FASTOPEN is None, "Needs TCP_FASTOPEN")
+    def test_fastopen(self):
+        listener = self._listener()
+        self.assertEqual(listener.getsockopt(_socket.IPPROTO_TCP, server.TCP_FASTOPEN), 16)
+
+    @greentest.skipIf(server.TCP_DEFER_ACCEPT is None, "Needs TCP_DEFER_ACCEPT")
+    def test_defer_accept(self):
+        listener = self._listener()
+        self.assertGreaterEqual(listener.getsockopt(_socket.IPPROTO_TCP, server.TCP_DEFER_ACCEPT), 1)
+        listener.settimeout(None)
+        client = socket.create_connection(listener.getsockname())
+        self._close_on_teardown(client)
+        # Connected, but nothing to read yet: not ready to accept.
+        with gevent.Timeout(0.2, False):
+            listener.accept()
+            self.fail("Accepted a connection without data")
+        client.sendall(b'GET')
+        with gevent.Timeout(1):
+            conn, _ = listener.accept()
+        self._close_on_teardown(conn)
+        self.assertEqual(conn.recv(3), b'GET')
+
+    def test_unsupported(self):
+        orig = server.TCP_DEFER_ACCEPT
+        server.TCP_DEFER_ACCEPT = None
+        try:
+            with self.assertRaises(ValueError):
+                self._listener()
+        finally:
+            server.TCP_DEFER_ACCEPT = orig
+
+    def test_server(self):
+        received = []
+
+        def handle(sock, _address):
+            received.append(sock.recv(5))
+            sock.close()
+
+        srv = Server(('127.0.0.1', 0), handle)
+        srv.start()
+        try:
+            self.assertIn(srv.socket.getsockopt(_socket.SOL_SOCKET, _socket.SO_RCVBUF),
+                          (32768, 65536))
+            client = socket.create_connection(('127.0.0.1', srv.server_port))
+            self._close_on_teardown(client)
+            client.sendall(b'hello')
+            self.assertEqual(client.recv(1), b'')
+        finally:
+            srv.stop()
+        self.assertEqual(received, [b'hello'])
+
+
+class ExclusiveServer(StreamServer):
+    exclusive_accept = True
+
+
+@greentest.skipIf(not hasattr(select, 'epoll'), "Needs epoll")
+class TestExclusiveAccept(greentest.TestCase):
+
+    def _echo(self, srv):
+        client = socket.create_connection(('127.0.0.1', srv.server_port))
+        self._close_on_teardown(client)
+        client.sendall(b'hello')
+        self.assertEqual(client.recv(5), b'hello')
+
+    def test_serve(self):
+        def handle(sock, _address):
+            sock.sendall(sock.recv(5))
+            sock.close()
+
+        srv = ExclusiveServer(('127.0.0.1', 0), handle)
+        srv.start()
+        try:
+            for _ in range(3):
+                self._echo(srv)
+            # Stopping and starting again, as when the pool fills up.
+            srv.stop_accepting()
+            gevent.sleep(0.1)
+            srv.start_accepting()
+            self._echo(srv)
+        finally:
+            srv.stop()
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,211 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent.pool import Pool
+from gevent.server import StreamServer
+from gevent.server import Protocol
+
+
+class Recorder(Protocol):
+
+    instances = []
+
+    def __init__(self):
+        self.transport = None
+        self.received = []
+        self.lost = []
+        self.events = []
+        self.instances.append(self)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received.append(data)
+
+    def connection_lost(self, exc):
+        self.lost.append(exc)
+
+    def pause_writing(self):
+        self.events.append('pause')
+
+    def resume_writing(self):
+        self.events.append('resume')
+
+
+class Echo(Recorder):
+
+    def data_received(self, data):
+        if data == b'spawn':
+            self.transport.write(b'handing over\n')
+            self.transport.spawn()
+        elif data == b'fail':
+            raise ValueError(data)
+        else:
+            self.transport.write(data)
+
+
+class TestProtocol(greentest.TestCase):
+
+    error_fatal = False
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        del Recorder.instances[:]
+
+    def _server(self, protocol, handle=None, spawn='default', idle_timeout=None):
+        server = StreamServer(('127.0.0.1', 0), handle, spawn=spawn, protocol=protocol)
+        server.idle_timeout = idle_timeout
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _connect(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_port))
+        self._close_on_teardown(sock)
+        return sock
+
+    def _protocol(self, index=0):
+        with gevent.Timeout(1):
+            while len(Recorder.instances) <= index:
+                gevent.sleep(0.01)
+        return Recorder.instances[index]
+
+    def _wait_lost(self, protocol):
+        with gevent.Timeout(1):
+            while not protocol.lost:
+                gevent.sleep(0.01)
+
+    def test_echo(self):
+        server = self._server(Echo)
+        client = self._connect(server)
+        for _ in range(3):
+            client.sendall(b'hello')
+            self.assertEqual(client.recv(5), b'hello')
+        self.assertEqual(len(server._transports), 1)
+        client.close()
+        protocol = self._protocol()
+        self._wait_lost(protocol)
+        self.assertEqual(protocol.lost, [None])
+        self.assertEqual(server._transports, set())
+
+    def test_pause_reading(self):
+        server = self._server(Recorder)
+        client = self._connect(server)
+        protocol = self._protocol()
+        protocol.transport.pause_reading()
+        client.sendall(b'hello')
+        gevent.sleep(0.1)
+        self.assertEqual(protocol.received, [])
+        protocol.transport.resume_reading()
+        with gevent.Timeout(1):
+            while not protocol.received:
+                gevent.sleep(0.01)
+        self.assertEqual(protocol.received, [b'hello'])
+
+    def test_write_buffer(self):
+        server = self._server(Recorder)
+        client = self._connect(server)
+        transport = self._protocol().transport
+        data = b'x' * (4 * 1024 * 1024)
+        transport.write(data)
+        # More than the socket buffers hold.
+        self.assertGreater(transport.get_write_buffer_size(), transport.write_high_water)
+        self.assertEqual(self._protocol().events, ['pause'])
+        transport.close()
+        self.assertTrue(transport.is_closing())
+        # Ignored once closing.
+        transport.write(b'more')
+        received = []
+        with gevent.Timeout(5):
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                received.append(chunk)
+        self.assertEqual(len(b''.join(received)), len(data))
+        self.assertEqual(self._protocol().events, ['pause', 'resume'])
+        self._wait_lost(self._protocol())
+        self.assertEqual(server._transports, set())
+
+    def test_spawn(self):
+        def handle(sock, _address):
+            sock.sendall(sock.recv(5).upper())
+
+        server = self._server(Echo, handle, Pool(1))
+        clients = [self._connect(server) for _ in range(2)]
+        for client in clients:
+            client.sendall(b'spawn')
+        with gevent.Timeout(1):
+            for client in clients:
+                self.assertEqual(client.recv(13), b'handing over\n')
+        self.assertEqual(server._transports, set())
+        # The second waits for the first to finish, as the pool is full.
+        gevent.sleep(0.1)
+        self.assertEqual(len(server._waiting), 1)
+        for client in clients:
+            client.sendall(b'hello')
+        with gevent.Timeout(1):
+            for client in clients:
+                self.assertEqual(client.recv(5), b'HELLO')
+                self.assertEqual(client.recv(1), b'')
+        self.assertEqual(self._protocol().lost, [])
+
+    def test_error(self):
+        server = self._server(Echo)
+        client = self._connect(server)
+        client.sendall(b'fail')
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+        protocol = self._protocol()
+        self._wait_lost(protocol)
+        self.assertIsInstance(protocol.lost[0], ValueError)
+        self.assertEqual(server._transports, set())
+
+    def test_idle_timeout(self):
+        server = self._server(Echo, idle_timeout=0.2)
+        client = self._connect(server)
+        for _ in range(3):
+            client.sendall(b'hello')
+            self.assertEqual(client.recv(5), b'hello')
+            gevent.sleep(0.1)
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(1), b'')
+        self.assertEqual(server._idle, {})
+
+    def test_drain(self):
+        server = self._server(Recorder)
+        client = self._connect(server)
+        self._protocol().transport.write(b'bye')
+        server.stop(drain=True)
+        with gevent.Timeout(1):
+            self.assertEqual(client.recv(3), b'bye')
+            self.assertEqual(client.recv(1), b'')
+
+    def test_stop(self):
+        server = self._server(Recorder)
+        client = self._connect(server)
+        protocol = self._protocol()
+        # Discarded, not waited for.
+        protocol.transport.write(b'x' * (4 * 1024 * 1024))
+        server.stop()
+        self.assertEqual(server._transports, set())
+        self._wait_lost(protocol)
+        self.assertEqual(protocol.lost, [None])
+        with gevent.Timeout(1):
+            try:
+                while client.recv(65536):
+                    pass
+            except socket.error:
+                # Reset, closed with data unread.
+                pass
+
+    def test_ssl(self):
+        server = StreamServer(('127.0.0.1', 0), protocol=Recorder, keyfile='key', certfile='cert')
+        with self.assertRaises(ValueError):
+            server.start()
+        server.close()
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -7,6 +7,7 @@ import traceback
 import time
 import unittest
 import greentest
+import gevent
 from functools import wraps
 import _six as six
 
@@ -396,6 +397,83 @@ class TestCreateConnection(greentest.TestCase):
             gsocket.socket = orig_socket
             gsocket.getaddrinfo = orig_getaddrinfo
 
+    happy_eyeballs_delay = 0.05
+
+    def _mock_happy_eyeballs(self, behaviors):
+        # Each address connects (or fails) after the given delay.
+
+        class MockSocket(object):
+
+            created = []
+            closed = False
+
+            def __init__(self, family, *_):
+                self.family = family
+                MockSocket.created.append(self)
+
+            def settimeout(self, _):
+                pass
+
+            def connect(self, sa):
+                delay, fail = dict((a, (d, f)) for a, d, f in behaviors)[sa]
+                gevent.sleep(delay)
+                if fail:
+                    raise socket.error('refused')
+
+            def close(self):
+                self.closed = True
+
+        addrs = [(socket.AF_INET6 if sa.startswith('v6') else socket.AF_INET, 1, 6, '', sa)
+                 for sa, _, _ in behaviors]
+
+        import gevent.socket as gsocket
+        orig_socket = gsocket.socket
+        orig_getaddrinfo = gsocket.getaddrinfo
+        gsocket.socket = MockSocket
+        gsocket.getaddrinfo = lambda *_: addrs
+
+        def restore():
+            gsocket.socket = orig_socket
+            gsocket.getaddrinfo = orig_getaddrinfo
+        self.addCleanup(restore)
+        hub = gevent.get_hub()
+        hub.happy_eyeballs_delay = self.happy_eyeballs_delay
+        self.addCleanup(delattr, hub, 'happy_eyeballs_delay')
+        return MockSocket
+
+    @greentest.ignores_leakcheck
+    def test_happy_eyeballs_blackhole(self):
+        MockSocket = self._mock_happy_eyeballs([
+            ('v6-a', 30, False),
+            ('v6-b', 30, False),
+            ('v4-a', 0, False),
+        ])
+        start = time.time()
+        sock = socket.create_connection(('host', 80))
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(sock.family, socket.AF_INET)
+        # Families alternate: v6-a, then v4-a, which wins.
+        self.assertEqual(len(MockSocket.created), 2)
+        self.assertTrue(MockSocket.created[0].closed)
+        self.assertFalse(sock.closed)
+
+    @greentest.ignores_leakcheck
+    def test_happy_eyeballs_failures(self):
+        MockSocket = self._mock_happy_eyeballs([
+            ('v4-a', 0, True),
+            ('v6-a', 0.01, True),
+        ])
+        with self.assertRaises(socket.error):
+            socket.create_connection(('host', 80))
+        self.assertEqual(len(MockSocket.created), 2)
+
+    def test_interleave_families(self):
+        from gevent.socket import _interleave_families
+        addrs = [(6, 'a'), (6, 'b'), (6, 'c'), (4, 'd'), (4, 'e')]
+        self.assertEqual([sa for _, sa in _interleave_families(addrs)],
+                         ['a', 'd', 'b', 'e', 'c'])
+
+
 class TestFunctions(greentest.TestCase):
 
     @greentest.ignores_leakcheck
@@ -0,0 +1,159 @@
+import errno
+
+import greentest
+import gevent
+from gevent import socket
+from gevent import _socketcommon
+
+
+def _read_all(sock):
+    result = bytearray()
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        result += data
+    return bytes(result)
+
+
+class TestCork(greentest.TestCase):
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        self.a, self.b = socket.socketpair()
+        self._close_on_teardown(self.a)
+        self._close_on_teardown(self.b)
+        self.writes = []
+        orig = self.a.sendall_vectored
+
+        def sendall_vectored(buffers, flags=0):
+            self.writes.append(list(buffers))
+            return orig(buffers, flags)
+        self.a.sendall_vectored = sendall_vectored
+        orig_nowait = self.a._send_vectored_nowait
+
+        def send_vectored_nowait(buffers):
+            self.writes.append(list(buffers))
+            return orig_nowait(buffers)
+        self.a._send_vectored_nowait = send_vectored_nowait
+
+    def _finish(self):
+        reader = gevent.spawn(_read_all, self.b)
+        self.a.close()
+        return reader.get()
+
+    def test_coalesces_one_iteration(self):
+        self.a.cork()
+        self.a.sendall(b'one ')
+        self.a.sendall(bytearray(b'two '))
+        self.a.sendall(memoryview(b'three'))
+        self.assertEqual(self.writes, [])
+        gevent.sleep(0.01)
+        self.assertEqual(self.writes, [[b'one ', b'two ', b'three']])
+        self.a.sendall(b'four')
+        gevent.sleep(0.01)
+        self.assertEqual(len(self.writes), 2)
+        self.assertEqual(self._finish(), b'one two threefour')
+
+    def test_written_by_the_hub(self):
+        spawned = []
+        spawn_raw = _socketcommon.spawn_raw
+
+        def counting_spawn_raw(*args):
+            spawned.append(args)
+            return spawn_raw(*args)
+        _socketcommon.spawn_raw = counting_spawn_raw
+        try:
+            self.a.cork()
+            self.a.sendall(b'one ')
+            self.a.sendall(b'two')
+            gevent.sleep(0.01)
+        finally:
+            _socketcommon.spawn_raw = spawn_raw
+        self.assertEqual(self.writes, [[b'one ', b'two']])
+        self.assertEqual(spawned, [])
+        self.assertEqual(self._finish(), b'one two')
+
+    def test_partial_write_finishes_in_background(self):
+        self.a.cork(threshold=1 << 30)
+        chunk = b'x' * 8192
+        # More than the socket can take at once.
+        for _ in range(512):
+            self.a.sendall(chunk)
+        gevent.sleep(0.01)
+        # The hub's write, then the rest from another greenlet,
+        # which waits for the reader to make room.
+        self.assertEqual(len(self.writes), 2)
+        self.assertEqual(len(self.writes[0]), 512)
+        self.assertLess(len(self.writes[1]), 512)
+        self.assertEqual(self._finish(), chunk * 512)
+
+    def test_buffers_are_copied(self):
+        self.a.cork()
+        data = bytearray(b'abc')
+        self.a.sendall(data)
+        data[:] = b'xyz'
+        self.a.flush()
+        self.assertEqual(self._finish(), b'abc')
+
+    def test_threshold(self):
+        self.a.cork(threshold=10)
+        self.a.sendall(b'12345')
+        self.a.sendall(b'67890')
+        # Sent right away.
+        self.assertEqual(self.writes, [[b'12345', b'67890']])
+        self.a.sendall(b'a')
+        # A large write goes after the buffer.
+        self.a.sendall(b'b' * 100)
+        self.assertEqual(self.writes[1], [b'a'])
+        self.assertEqual(self._finish(), b'1234567890a' + b'b' * 100)
+
+    def test_flush_and_uncork(self):
+        self.a.cork()
+        self.a.sendall(b'x')
+        self.a.flush()
+        self.assertEqual(self.writes, [[b'x']])
+        self.a.sendall(b'y')
+        self.a.uncork()
+        self.assertEqual(self.writes, [[b'x'], [b'y']])
+        self.a.sendall(b'z')
+        self.assertEqual(len(self.writes), 2)
+        # Flushing an uncorked socket does nothing.
+        self.a.flush()
+        self.assertEqual(self._finish(), b'xyz')
+
+    def test_close_flushes(self):
+        self.a.cork()
+        self.a.sendall(b'last words')
+        self.assertEqual(self._finish(), b'last words')
+
+    def test_background_error(self):
+        self.a.cork()
+        self.b.close()
+        self.a.sendall(b'x')
+        gevent.sleep(0.01)
+        with self.assertRaises(socket.error) as exc:
+            self.a.sendall(b'y')
+        self.assertIn(exc.exception.args[0], (errno.EPIPE, errno.ECONNRESET))
+        # Reported once; after that, the socket's own errors.
+        self.a.sendall(b'z')
+        with self.assertRaises(socket.error):
+            self.a.flush()
+
+    def test_many_greenlets(self):
+        self.a.cork()
+
+        def write(i):
+            for j in range(10):
+                self.a.sendall(('%d-%d;' % (i, j)).encode('ascii'))
+                gevent.sleep(0)
+        gevent.joinall([gevent.spawn(write, i) for i in range(5)])
+        data = self._finish().decode('ascii').split(';')[:-1]
+        self.assertEqual(len(data), 50)
+        for i in range(5):
+            self.assertEqual([x for x in data if x.startswith('%d-' % i)],
+                             ['%d-%d' % (i, j) for j in range(10)])
+
+
+if __name__ == '__main__':
+    greentest.main()
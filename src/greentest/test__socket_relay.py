@@ -0,0 +1,140 @@
+import fcntl
+import os
+
+import greentest
+import gevent
+from gevent import socket
+from gevent import _splice
+
+
+def _read_all(sock):
+    chunks = []
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+def _nonblocking_pipe():
+    r, w = os.pipe()
+    for fd in r, w:
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+    return r, w
+
+
+class TestRelay(greentest.TestCase):
+
+    data = b''.join(str(i).encode('ascii') for i in range(200000))
+
+    def _pair(self):
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        return a, b
+
+    def test_socket_to_socket(self):
+        source_w, source = self._pair()
+        dest, dest_r = self._pair()
+
+        def write():
+            source_w.sendall(self.data)
+            source_w.close()
+
+        writer = gevent.spawn(write)
+        reader = gevent.spawn(_read_all, dest_r)
+        self.assertEqual(socket.relay(source, dest), len(self.data))
+        dest.close()
+        writer.join()
+        self.assertEqual(reader.get(), self.data)
+
+    def test_pipe_to_socket(self):
+        r, w = _nonblocking_pipe()
+        self.addCleanup(os.close, r)
+        dest, dest_r = self._pair()
+        os.write(w, b'from a pipe')
+        os.close(w)
+        self.assertEqual(socket.relay(r, dest), 11)
+        dest.close()
+        self.assertEqual(_read_all(dest_r), b'from a pipe')
+
+    def test_socket_to_pipe(self):
+        source_w, source = self._pair()
+        r, w = _nonblocking_pipe()
+        self.addCleanup(os.close, r)
+
+        def read():
+            chunks = []
+            while True:
+                try:
+                    data = os.read(r, 65536)
+                except OSError:
+                    gevent.sleep(0.001)
+                    continue
+                if not data:
+                    return b''.join(chunks)
+                chunks.append(data)
+
+        reader = gevent.spawn(read)
+        writer = gevent.spawn(lambda: (source_w.sendall(self.data), source_w.close()))
+        self.assertEqual(socket.relay(source, w), len(self.data))
+        os.close(w)
+        writer.join()
+        self.assertEqual(reader.get(), self.data)
+
+    def test_timeout(self):
+        _, source = self._pair()
+        dest, _ = self._pair()
+        source.settimeout(0.05)
+        with self.assertRaises(socket.timeout):
+            socket.relay(source, dest)
+
+    def test_relay_pair(self):
+        client, a = self._pair()
+        b, server = self._pair()
+
+        def serve():
+            request = _read_all(server)
+            server.sendall(request[::-1])
+            server.shutdown(socket.SHUT_WR)
+            return request
+
+        server_glet = gevent.spawn(serve)
+        relaying = gevent.spawn(socket.relay_pair, a, b)
+        client.sendall(self.data)
+        client.shutdown(socket.SHUT_WR)
+        self.assertEqual(_read_all(client), self.data[::-1])
+        self.assertEqual(server_glet.get(), self.data)
+        self.assertEqual(relaying.get(), (len(self.data), len(self.data)))
+
+    def test_relay_pair_reverse_fails(self):
+        # Nothing ever comes from the client, but the failure copying
+        # the other way stops that direction too.
+        _client, a = self._pair()
+        b, _server = self._pair()
+        b.settimeout(0.05)
+        with gevent.Timeout(1):
+            with self.assertRaises(socket.timeout):
+                socket.relay_pair(a, b)
+
+    def test_relay_pair_forward_fails(self):
+        a, _client = self._pair()
+        _server, b = self._pair()
+        a.settimeout(0.05)
+        with gevent.Timeout(1):
+            with self.assertRaises(socket.timeout):
+                socket.relay_pair(a, b)
+
+
+@greentest.skipIf(_splice.splice is None, "Needs splice")
+class TestRelayNoSplice(TestRelay):
+
+    def setUp(self):
+        TestRelay.setUp(self)
+        splice = _splice.splice
+        _splice.splice = None
+        self.addCleanup(setattr, _splice, 'splice', splice)
+
+
+if __name__ == '__main__':
+    greentest.main()
@@ -0,0 +1,115 @@
+import array
+import os
+import time
+
+import greentest
+import gevent
+from gevent import socket
+from gevent import ssl
+
+CERTFILE = os.path.join(os.path.dirname(__file__), 'test_server.crt')
+KEYFILE = os.path.join(os.path.dirname(__file__), 'test_server.key')
+
+
+def _read_all(sock, count):
+    result = bytearray()
+    while len(result) < count:
+        data = sock.recv(65536)
+        if not data:
+            break
+        result += data
+    return bytes(result)
+
+
+class TestSendallVectored(greentest.TestCase):
+
+    def _pair(self):
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        return a, b
+
+    def _check(self, buffers, expected):
+        a, b = self._pair()
+        reader = gevent.spawn(_read_all, b, len(expected))
+        a.sendall_vectored(buffers)
+        self.assertEqual(reader.get(), expected)
+
+    def test_small(self):
+        self._check([b'GET / HTTP/1.1\r\n', b'Host: x\r\n', b'', b'\r\n'],
+                    b'GET / HTTP/1.1\r\nHost: x\r\n\r\n')
+
+    def test_empty(self):
+        a, _ = self._pair()
+        self.assertIsNone(a.sendall_vectored([]))
+        self.assertIsNone(a.sendall_vectored([b'', bytearray()]))
+
+    def test_partial_writes(self):
+        # Much more than the socket buffers hold, so the writes are
+        # partial and must resume in the middle of a buffer.
+        buffers = [str(i % 10).encode('ascii') * (i * 997 % 65536 + 1) for i in range(200)]
+        self._check(buffers, b''.join(buffers))
+
+    def test_many_buffers(self):
+        # More than IOV_MAX.
+        buffers = [('%05d' % i).encode('ascii') for i in range(5000)]
+        self._check(buffers, b''.join(buffers))
+
+    def test_buffer_types(self):
+        ints = array.array('i', [1, 2, 3])
+        buffers = [bytearray(b'abc'), memoryview(b'defgh')[1:4], ints]
+        tobytes = getattr(ints, 'tobytes', None) or ints.tostring
+        self._check(buffers, b'abcefg' + tobytes())
+
+    def test_timeout(self):
+        a, _ = self._pair()
+        a.settimeout(0.1)
+        with self.assertRaises(socket.timeout):
+            a.sendall_vectored([b'x' * 1024 * 1024] * 10)
+
+    def test_timeout_bounds_whole_call(self):
+        a, b = self._pair()
+        a.settimeout(0.5)
+
+        def drain_once():
+            gevent.sleep(0.4)
+            b.recv(65536)
+        reader = gevent.spawn(drain_once)
+        start = time.time()
+        with self.assertRaises(socket.timeout):
+            a.sendall_vectored([b'x' * 1024 * 1024] * 10)
+        # The wait begun after the reader made room only gets what
+        # was left of the timeout.
+        self.assertLess(time.time() - start, 0.8)
+        reader.join()
+
+
+class TestSSLSendallVectored(greentest.TestCase):
+
+    def test_ssl(self):
+        listener = socket.socket()
+        self._close_on_teardown(listener)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+
+        buffers = [b'head\r\n'] * 1000 + [b'b' * 1024 * 1024, b'tail']
+        expected = b''.join(buffers)
+
+        def server():
+            conn, _ = listener.accept()
+            conn = ssl.wrap_socket(conn, server_side=True,
+                                   keyfile=KEYFILE, certfile=CERTFILE)
+            try:
+                return _read_all(conn, len(expected))
+            finally:
+                conn.close()
+
+        reader = gevent.spawn(server)
+        client = ssl.wrap_socket(socket.create_connection(listener.getsockname()))
+        self._close_on_teardown(client)
+        client.sendall_vectored(buffers)
+        self.assertEqual(reader.get(), expected)
+
+
+if __name__ == '__main__':
+    greentest.main()
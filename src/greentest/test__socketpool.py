@@ -0,0 +1,140 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent import socketpool
+from gevent.pool import PoolFull
+from gevent.server import StreamServer
+from gevent.socketpool import ConnectionPool
+
+
+class TestConnectionPool(greentest.TestCase):
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        self.connections = []
+        self.server = StreamServer(('127.0.0.1', 0), self._handle)
+        self.server.start()
+        self.address = ('127.0.0.1', self.server.server_port)
+
+    def tearDown(self):
+        self.server.stop()
+        greentest.TestCase.tearDown(self)
+
+    def _handle(self, sock, _address):
+        self.connections.append(sock)
+        while True:
+            data = sock.recv(100)
+            if not data or data == b'quit':
+                sock.close()
+                break
+            sock.sendall(data)
+
+    def _pool(self, **kwargs):
+        pool = ConnectionPool(**kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def _echo(self, sock, data=b'ping'):
+        sock.sendall(data)
+        self.assertEqual(sock.recv(100), data)
+
+    def test_reuse_lifo(self):
+        pool = self._pool()
+        a = pool.get(self.address)
+        b = pool.get(self.address)
+        self._echo(a)
+        self._echo(b)
+        pool.put(a)
+        pool.put(b)
+        self.assertEqual(pool.idle_count(self.address), 2)
+        self.assertIs(pool.get(self.address), b)
+        self.assertIs(pool.get(self.address), a)
+        self.assertEqual(len(self.connections), 2)
+
+    def test_maxsize(self):
+        pool = self._pool(maxsize=1)
+        a = pool.get(self.address)
+        with self.assertRaises(PoolFull):
+            pool.get(self.address, timeout=0.05)
+        waiter = gevent.spawn(pool.get, self.address)
+        gevent.sleep(0.01)
+        pool.put(a)
+        self.assertIs(waiter.get(timeout=1), a)
+
+    def test_closed_by_server(self):
+        pool = self._pool()
+        a = pool.get(self.address)
+        a.sendall(b'quit')
+        pool.put(a)
+        gevent.sleep(0.05)
+        b = pool.get(self.address)
+        self.assertIsNot(b, a)
+        self._echo(b)
+
+    def test_idle_timeout(self):
+        pool = self._pool(idle_timeout=0.1)
+        socks = [pool.get(self.address) for _ in range(3)]
+        for sock in socks:
+            pool.put(sock)
+        self.assertEqual(pool.idle_count(), 3)
+        gevent.sleep(0.3)
+        self.assertEqual(pool.idle_count(), 0)
+        self.assertIsNone(pool._timer)
+        self.assertEqual(pool._buckets, {})
+
+    def test_minsize(self):
+        pool = self._pool(idle_timeout=0.1, minsize=2)
+        socks = [pool.get(self.address) for _ in range(3)]
+        for sock in socks:
+            pool.put(sock)
+        gevent.sleep(0.3)
+        self.assertEqual(pool.idle_count(self.address), 2)
+
+    def test_connect_timeout(self):
+        timeouts = []
+        create_connection = socketpool.create_connection
+
+        def recording_create_connection(address, timeout):
+            timeouts.append(timeout)
+            return create_connection(address, timeout)
+        socketpool.create_connection = recording_create_connection
+        self.addCleanup(setattr, socketpool, 'create_connection', create_connection)
+
+        for connect_timeout in (None, 5):
+            pool = self._pool(connect_timeout=connect_timeout)
+            pool.discard(pool.get(self.address))
+        self.assertEqual(timeouts, [socket._GLOBAL_DEFAULT_TIMEOUT, 5])
+
+    def test_connection_discards_on_error(self):
+        pool = self._pool(maxsize=1)
+        with self.assertRaises(ZeroDivisionError):
+            with pool.connection(self.address) as sock:
+                raise ZeroDivisionError
+        self.assertEqual(pool.idle_count(), 0)
+        with pool.connection(self.address, timeout=0.1) as sock2:
+            self._echo(sock2)
+        self.assertEqual(pool.idle_count(), 1)
+
+    def test_connect_error(self):
+        pool = self._pool(maxsize=1)
+        self.server.close()
+        with self.assertRaises(Exception):
+            pool.get(self.address)
+        # The slot was given back.
+        self.assertEqual(pool._buckets[(self.address, None)].semaphore.counter, 1)
+
+    def test_close(self):
+        pool = self._pool()
+        a = pool.get(self.address)
+        b = pool.get(self.address)
+        pool.put(a)
+        pool.close()
+        self.assertEqual(pool.idle_count(), 0)
+        pool.put(b)
+        self.assertEqual(pool.idle_count(), 0)
+        with self.assertRaises(ValueError):
+            pool.get(self.address)
+
+
+if __name__ == '__main__':
+    greentest.main()
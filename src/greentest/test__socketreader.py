@@ -0,0 +1,185 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent.hub import get_hub
+from gevent.socketreader import BufferPool
+from gevent.socketreader import IncompleteReadError
+from gevent.socketreader import LimitOverrunError
+from gevent.socketreader import SocketReader
+from gevent.socketreader import get_buffer_pool
+
+
+class TestSocketReader(greentest.TestCase):
+
+    buffer_size = 64
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        self.pool = BufferPool(self.buffer_size, 4)
+        self.writer, sock = socket.socketpair()
+        self._close_on_teardown(self.writer)
+        self._close_on_teardown(sock)
+        self.reader = SocketReader(sock, pool=self.pool)
+
+    def _send(self, data, close=True):
+        self.writer.sendall(data)
+        if close:
+            self.writer.close()
+
+    def _send_slowly(self, *chunks):
+        def send():
+            for chunk in chunks:
+                gevent.sleep(0.001)
+                self.writer.sendall(chunk)
+            self.writer.close()
+        return gevent.spawn(send)
+
+    def test_readline(self):
+        self._send(b'one\ntwo\r\nthree')
+        self.assertEqual(self.reader.readline(), b'one\n')
+        self.assertEqual(self.reader.readline(), b'two\r\n')
+        self.assertEqual(self.reader.readline(), b'three')
+        self.assertEqual(self.reader.readline(), b'')
+        self.assertTrue(self.reader.at_eof)
+
+    def test_iter(self):
+        self._send(b'a\nb\nc\n')
+        self.assertEqual(list(self.reader), [b'a\n', b'b\n', b'c\n'])
+
+    def test_readuntil_split_separator(self):
+        # The separator arrives in pieces.
+        self._send_slowly(b'header: 1\r', b'\n\r', b'\nbody')
+        self.assertEqual(self.reader.readuntil(b'\r\n\r\n'), b'header: 1\r\n\r\n')
+        self.assertEqual(self.reader.readexactly(4), b'body')
+
+    def test_readuntil_eof(self):
+        self._send(b'no separator')
+        with self.assertRaises(IncompleteReadError) as exc:
+            self.reader.readuntil(b'\n')
+        self.assertEqual(exc.exception.partial, b'no separator')
+        self.assertIsNone(exc.exception.expected)
+
+    def test_readuntil_limit(self):
+        self.reader.limit = 10
+        self._send(b'x' * 20 + b'\n')
+        with self.assertRaises(LimitOverrunError) as exc:
+            self.reader.readuntil(b'\n')
+        # The data is kept.
+        self.assertEqual(self.reader.buffered, exc.exception.consumed)
+        self.assertEqual(self.reader.readexactly(21), b'x' * 20 + b'\n')
+
+    def test_readexactly(self):
+        self._send_slowly(b'ab', b'cdef', b'g')
+        self.assertEqual(self.reader.readexactly(3), b'abc')
+        self.assertEqual(self.reader.readexactly(0), b'')
+        self.assertEqual(self.reader.readexactly(3), b'def')
+        with self.assertRaises(IncompleteReadError) as exc:
+            self.reader.readexactly(3)
+        self.assertEqual(exc.exception.partial, b'g')
+        self.assertEqual(exc.exception.expected, 3)
+
+    def test_readexactly_larger_than_buffer(self):
+        data = bytes(bytearray(range(256))) * 10
+        sender = gevent.spawn(self._send, data)
+        self.assertEqual(self.reader.readexactly(len(data)), data)
+        sender.join()
+        # The grown buffer isn't kept or pooled, but the original
+        # one went back to the pool.
+        self.assertIsNone(self.reader._buf)
+        self.assertEqual(self.pool.stats()['size'], 1)
+
+    def test_wraps_around(self):
+        # Many more lines than fit in the buffer, so the unread data
+        # must be moved back to the front of it.
+        lines = [('line %d\n' % i).encode('ascii') for i in range(500)]
+        sender = gevent.spawn(self._send, b''.join(lines))
+        for line in lines:
+            self.assertEqual(self.reader.readline(), line)
+        self.assertEqual(self.reader.readline(), b'')
+        sender.join()
+
+    def test_peek_consume(self):
+        self._send_slowly(b'\x00\x05', b'hello', b'rest')
+        header = self.reader.peek(2)
+        self.assertGreaterEqual(len(header), 2)
+        length = bytearray(header[:2])[1]
+        self.reader.consume(2)
+        body = self.reader.peek(length)
+        self.assertEqual(body[:length].tobytes(), b'hello')
+        self.reader.consume(length)
+        self.assertEqual(self.reader.readexactly(4), b'rest')
+        self.assertEqual(len(self.reader.peek()), 0)
+        self.assertRaises(ValueError, self.reader.consume, 1)
+
+    def test_readinto(self):
+        self._send(b'abcdef')
+        buf = bytearray(4)
+        self.assertEqual(self.reader.readinto(buf), 4)
+        self.assertEqual(buf, b'abcd')
+        self.assertEqual(self.reader.readinto(buf), 2)
+        self.assertEqual(buf[:2], b'ef')
+        self.assertEqual(self.reader.readinto(buf), 0)
+        self.assertEqual(self.reader.readinto(buf), 0)
+
+    def test_close_returns_buffer(self):
+        self._send(b'data\nmore')
+        self.reader.readline()
+        buf = self.reader._buf
+        self.reader.close()
+        self.assertEqual(self.pool.stats()['size'], 1)
+        # The next reader reuses it.
+        other = SocketReader(self.writer, pool=self.pool)
+        self.assertIs(self.pool.get(), buf)
+        other.close()
+
+    def test_drained_returns_buffer(self):
+        self._send_slowly(b'one\n', b'two\n')
+        self.assertEqual(self.reader.readline(), b'one\n')
+        self.assertIsNone(self.reader._buf)
+        self.assertEqual(self.pool.stats()['size'], 1)
+        self.assertEqual(self.reader.readline(), b'two\n')
+        self.assertEqual(self.pool.stats()['hits'], 1)
+
+    def test_readuntil_limit_does_not_grow(self):
+        self.reader.limit = self.buffer_size
+        self._send(b'x' * (2 * self.buffer_size))
+        with self.assertRaises(LimitOverrunError) as exc:
+            self.reader.readuntil(b'\n')
+        self.assertEqual(exc.exception.consumed, self.buffer_size)
+        self.assertEqual(len(self.reader._buf), self.buffer_size)
+
+    def test_context_manager(self):
+        self._send(b'x\n')
+        with self.reader as reader:
+            self.assertEqual(reader.readline(), b'x\n')
+        self.assertIsNone(self.reader._buf)
+
+
+class TestBufferPool(greentest.TestCase):
+
+    def test_reuse(self):
+        pool = BufferPool(16, 1)
+        buf = pool.get()
+        self.assertEqual(len(buf), 16)
+        pool.put(buf)
+        self.assertIs(pool.get(), buf)
+        pool.put(buf)
+        pool.put(bytearray(16))
+        self.assertEqual(pool.stats()['dropped'], 1)
+        # Buffers of the wrong size aren't kept.
+        pool.clear()
+        pool.put(bytearray(8))
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_hub_pool(self):
+        pool = get_buffer_pool()
+        self.assertIsInstance(pool, BufferPool)
+        self.assertIs(get_hub().buffer_pool, pool)
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        self.assertIs(SocketReader(a).pool, pool)
+
+
+if __name__ == '__main__':
+    greentest.main()
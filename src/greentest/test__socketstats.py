@@ -0,0 +1,98 @@
+import greentest
+import gevent
+from gevent import socket
+from gevent import socketstats
+from gevent.socketstats import SocketStats
+from gevent.server import StreamServer
+
+
+class TestSocketStats(greentest.TestCase):
+
+    def _pair(self, stats):
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        a._stats = b._stats = stats
+        return a, b
+
+    def test_counts(self):
+        stats = SocketStats(None)
+        a, b = self._pair(stats)
+        a.sendall(b'hello')
+        self.assertEqual(b.recv(10), b'hello')
+        buf = bytearray(10)
+        a.send(b'abc')
+        self.assertEqual(b.recv_into(buf), 3)
+        self.assertEqual(stats.bytes_sent, 8)
+        self.assertEqual(stats.bytes_received, 8)
+        self.assertEqual(stats.send_calls, 2)
+        self.assertEqual(stats.recv_calls, 2)
+        self.assertEqual(stats.read_retries, 0)
+
+        stats.reset()
+        self.assertEqual(stats.as_dict(), dict.fromkeys(stats.as_dict(), 0))
+
+    def test_wait(self):
+        stats = SocketStats(None)
+        a, b = self._pair(stats)
+
+        def write():
+            gevent.sleep(0.1)
+            a.sendall(b'x')
+
+        writer = gevent.spawn(write)
+        self.assertEqual(b.recv(1), b'x')
+        writer.join()
+        self.assertEqual(stats.read_retries, 1)
+        self.assertGreaterEqual(stats.read_wait, 0.05)
+        self.assertEqual(stats.write_retries, 0)
+        self.assertEqual(stats.write_wait, 0.0)
+
+    def test_parent(self):
+        parent = SocketStats(None)
+        a, b = self._pair(SocketStats(parent))
+        a.sendall(b'abc')
+        b.recv(3)
+        self.assertEqual(parent.bytes_sent, 3)
+        self.assertEqual(parent.bytes_received, 3)
+        self.assertIs(SocketStats().parent, socketstats.get_stats())
+
+    def test_enable(self):
+        stats = socketstats.get_stats()
+        a, b = socket.socketpair()
+        self._close_on_teardown(a)
+        self._close_on_teardown(b)
+        before = stats.bytes_sent
+        a.sendall(b'abc')
+        self.assertEqual(stats.bytes_sent, before)
+        socketstats.enable()
+        try:
+            a.sendall(b'abc')
+        finally:
+            socketstats.disable()
+        self.assertEqual(stats.bytes_sent, before + 3)
+        a.sendall(b'abc')
+        self.assertEqual(stats.bytes_sent, before + 3)
+
+    def test_server(self):
+        def handle(sock, _address):
+            sock.sendall(sock.recv(5))
+            sock.close()
+
+        server = StreamServer(('127.0.0.1', 0), handle)
+        server.stats = SocketStats(None)
+        server.start()
+        try:
+            client = socket.create_connection(('127.0.0.1', server.server_port))
+            self._close_on_teardown(client)
+            client.sendall(b'hello')
+            self.assertEqual(client.recv(5), b'hello')
+            self.assertEqual(client.recv(5), b'')
+        finally:
+            server.stop()
+        self.assertEqual(server.stats.bytes_received, 5)
+        self.assertEqual(server.stats.bytes_sent, 5)
+
+
+if __name__ == '__main__':
+    greentest.main()
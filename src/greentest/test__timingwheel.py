@@ -0,0 +1,194 @@
+import time
+
+import greentest
+import gevent
+from gevent import core
+from gevent.hub import get_hub
+from gevent._timingwheel import TimingWheel
+from gevent._timingwheel import WheelTimer
+
+
+class _CountingLoop(object):
+    # Counts the loop timers created through it.
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.timers = 0
+
+    def timer(self, *args, **kwargs):
+        self.timers += 1
+        return self.loop.timer(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.loop, name)
+
+
+class TestTimingWheel(greentest.TestCase):
+
+    switch_expected = False
+
+    def setUp(self):
+        super(TestTimingWheel, self).setUp()
+        self.loop = core.loop(default=False)
+        # Small levels so that the tests move timers between them.
+        self.wheel = TimingWheel(self.loop, 0.005, slots=(4, 4))
+        self.fired = []
+
+    def tearDown(self):
+        self.wheel.close()
+        self.loop.destroy()
+        super(TestTimingWheel, self).tearDown()
+
+    def _start(self, seconds, ref=True):
+        timer = self.wheel.timer(seconds, ref=ref)
+        timer.start(self.fired.append, seconds)
+        return timer
+
+    def test_fires_in_order_not_early(self):
+        delays = [0.1, 0.0, 0.03, 0.011, 0.2, 0.05]
+        begin = time.time()
+        for seconds in delays:
+            self._start(seconds)
+        self.assertEqual(len(self.wheel), len(delays))
+        self.loop.run()
+        self.assertGreaterEqual(time.time() - begin, 0.2)
+        self.assertEqual(self.fired, sorted(delays))
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        kept = self._start(0.02)
+        cancelled = self._start(0.01)
+        self.assertTrue(cancelled.active)
+        cancelled.stop()
+        self.assertFalse(cancelled.active)
+        self.loop.run()
+        self.assertEqual(self.fired, [0.02])
+        self.assertFalse(kept.active)
+
+    def test_overflow(self):
+        # Beyond the 16 ticks the two levels hold.
+        self._start(0.15)
+        self._start(0.01)
+        self.loop.run()
+        self.assertEqual(self.fired, [0.01, 0.15])
+
+    def test_unref_does_not_keep_loop_alive(self):
+        self._start(0.01)
+        self._start(10, ref=False)
+        self.loop.run()
+        self.assertEqual(self.fired, [0.01])
+        self.assertEqual(len(self.wheel), 1)
+
+    def test_wakes_only_when_needed(self):
+        advances = []
+        advance = self.wheel._advance
+        def counting_advance():
+            advances.append(1)
+            advance()
+        self.wheel._advance = counting_advance
+        # 40 ticks away, beyond both levels: it waits in the overflow
+        # and moves down a level at a time. The wheel only wakes
+        # every tick when something is due within the next 4.
+        self._start(0.2)
+        self.loop.run()
+        self.assertEqual(self.fired, [0.2])
+        self.assertLess(len(advances), 25)
+
+    def test_reuses_loop_timers(self):
+        loop = _CountingLoop(self.loop)
+        wheel = TimingWheel(loop, 0.005, slots=(4, 4))
+        try:
+            for _ in range(50):
+                for seconds in 0.01, 1:
+                    timer = wheel.timer(seconds)
+                    timer.start(self.fired.append, seconds)
+                    timer.stop()
+            # One that fires every tick, one that fires less often.
+            self.assertEqual(loop.timers, 2)
+            timer = wheel.timer(0.01)
+            timer.start(self.fired.append, 'fired')
+            self.loop.run()
+            self.assertEqual(self.fired, ['fired'])
+            self.assertEqual(loop.timers, 2)
+        finally:
+            wheel.close()
+
+    def test_earlier_timer_rearms(self):
+        self._start(0.2)
+        begin = time.time()
+        fired_at = []
+        timer = self.wheel.timer(0.01)
+        timer.start(lambda: fired_at.append(time.time() - begin))
+        self.loop.run()
+        self.assertEqual(self.fired, [0.2])
+        self.assertLess(fired_at[0], 0.1)
+
+    def test_restart(self):
+        timer = self._start(0.01)
+        timer.start(self.fired.append, 'again')
+        self.assertEqual(len(self.wheel), 1)
+        self.loop.run()
+        self.assertEqual(self.fired, ['again'])
+
+
+class TestHubTimingWheel(greentest.TestCase):
+
+    def setUp(self):
+        super(TestHubTimingWheel, self).setUp()
+        hub = get_hub()
+        hub.timer_wheel = TimingWheel(hub.loop, 0.01)
+
+    def tearDown(self):
+        hub = get_hub()
+        hub.timer_wheel.close()
+        hub.timer_wheel = None
+        for wheel in hub._timer_wheels.values():
+            wheel.close()
+        hub._timer_wheels.clear()
+        super(TestHubTimingWheel, self).tearDown()
+
+    def _timeout_wheel(self):
+        # Timeouts have priority -1 by default.
+        hub = get_hub()
+        hub.timer(1, priority=-1)
+        return hub._timer_wheels[-1]
+
+    def test_sleep_and_timeout(self):
+        wheel = get_hub().timer_wheel
+        timeout_wheel = self._timeout_wheel()
+        # The test case's own timeout may be in the wheel.
+        before = len(timeout_wheel)
+        begin = time.time()
+        gevent.sleep(0.05)
+        self.assertGreaterEqual(time.time() - begin, 0.05)
+        self.assertEqual(len(wheel), 0)
+
+        with self.assertRaises(gevent.Timeout):
+            with gevent.Timeout(0.02):
+                self.assertEqual(len(timeout_wheel), before + 1)
+                gevent.sleep(1)
+        self.assertEqual(len(timeout_wheel), before)
+
+        with gevent.Timeout(1) as timeout:
+            self.assertTrue(timeout.pending)
+        self.assertFalse(timeout.pending)
+        self.assertEqual(len(timeout_wheel), before)
+
+    def test_priority(self):
+        hub = get_hub()
+        timer = hub.timer(1, priority=-1)
+        self.assertIsInstance(timer, WheelTimer)
+        self.assertIsNot(timer.wheel, hub.timer_wheel)
+        self.assertEqual(timer.wheel.priority, -1)
+        self.assertIs(hub.timer(1, priority=-1).wheel, timer.wheel)
+        self.assertIs(hub.timer(1).wheel, hub.timer_wheel)
+        # The loop timer running them has their priority.
+        timer.start(lambda: None)
+        if not greentest.LIBUV:
+            # libuv has no priorities.
+            self.assertEqual(timer.wheel._driver.priority, -1)
+        timer.stop()
+
+
+if __name__ == '__main__':
+    greentest.main()